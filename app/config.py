@@ -23,6 +23,21 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Connection pool, per gunicorn worker: each worker may open up to
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connections. Turned into
+    # SQLALCHEMY_ENGINE_OPTIONS by app/utils/db_engine.py.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    # Seconds before a pooled connection is replaced; keep below any server/proxy idle timeout
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    # Test connections on checkout so a Postgres restart doesn't surface as 500s
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    # Per-statement limit in milliseconds; 0 disables
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))
+    # Set when DATABASE_URL points at PgBouncer in transaction pooling mode
+    DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', 'false').lower() == 'true'
+
     # Cloudinary
     CLOUDINARY_CLOUD_NAME = os.environ.get('CLOUDINARY_CLOUD_NAME')
     CLOUDINARY_API_KEY = os.environ.get('CLOUDINARY_API_KEY')
@@ -30,3 +45,114 @@ class Config:
 
     # SendGrid
     SENDGRID_API_KEY = os.environ.get('SENDGRID_API_KEY')
+
+    # Prometheus metrics at /metrics (needs prometheus_client). With gunicorn,
+    # PROMETHEUS_MULTIPROC_DIR (set in gunicorn.conf.py) aggregates all workers.
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    # Scrapes must send 'Authorization: Bearer <token>'. Without a token /metrics
+    # answers 403, unless in debug/testing or METRICS_PUBLIC is set (local use only)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_PUBLIC = os.environ.get('METRICS_PUBLIC', 'false').lower() == 'true'
+
+    # Slow query log: statements slower than this (ms) are written as JSON lines
+    # to SLOW_QUERY_LOG_FILE and shown at /admin/slow-queries; 0 disables.
+    # All workers append to the one file; rotate it with logrotate.
+    SLOW_QUERY_THRESHOLD_MS = int(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 500))
+    SLOW_QUERY_LOG_FILE = os.environ.get('SLOW_QUERY_LOG_FILE', os.path.join(basedir, '..', 'logs', 'slow_queries.jsonl'))
+    # PostgreSQL only: re-run slow reads under EXPLAIN (ANALYZE, BUFFERS) in a
+    # background thread, at most once per statement per interval
+    SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'false').lower() == 'true'
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = int(os.environ.get('SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS', 300))
+
+    # On-demand profiling: admins add an X-Profile header or ?_profile=1 to any
+    # request; the cProfile dump and SQL timeline are kept under PROFILE_DIR
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'true').lower() == 'true'
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(basedir, '..', 'logs', 'profiles'))
+    PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', 50))
+    PROFILE_TOP_FUNCTIONS = int(os.environ.get('PROFILE_TOP_FUNCTIONS', 40))
+
+    # Tracing: spans for requests, SQL, emails, uploads and activity logging,
+    # exported as JSON lines to TRACING_FILE or as OTLP/HTTP JSON to
+    # TRACING_OTLP_ENDPOINT (TRACING_EXPORTER = jsonl | otlp)
+    TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'false').lower() == 'true'
+    TRACING_EXPORTER = os.environ.get('TRACING_EXPORTER', 'jsonl')
+    TRACING_FILE = os.environ.get('TRACING_FILE', os.path.join(basedir, '..', 'logs', 'traces.jsonl'))
+    TRACING_OTLP_ENDPOINT = os.environ.get('TRACING_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+    TRACING_SERVICE_NAME = os.environ.get('TRACING_SERVICE_NAME', 'projectx-api')
+    TRACING_SAMPLE_RATE = float(os.environ.get('TRACING_SAMPLE_RATE', 1.0))
+    TRACING_BATCH_SIZE = int(os.environ.get('TRACING_BATCH_SIZE', 512))
+    TRACING_FLUSH_INTERVAL = float(os.environ.get('TRACING_FLUSH_INTERVAL', 2.0))
+
+    # Swagger UI at /apidocs; false skips loading flasgger at startup
+    SWAGGER_ENABLED = os.environ.get('SWAGGER_ENABLED', 'true').lower() == 'true'
+
+    # Two-Factor Authentication
+    # 'database' shares pending codes across gunicorn workers; 'memory' is for tests/single-process dev
+    TWO_FA_CODE_STORE = os.environ.get('TWO_FA_CODE_STORE', 'database')
+    TWO_FA_CODE_TTL_MINUTES = int(os.environ.get('TWO_FA_CODE_TTL_MINUTES', 10))
+    TWO_FA_SWEEP_INTERVAL_SECONDS = int(os.environ.get('TWO_FA_SWEEP_INTERVAL_SECONDS', 300))
+    TOTP_ISSUER = os.environ.get('TOTP_ISSUER', 'Moringa Project Planner')
+    # Number of 30s steps accepted either side of the current one to absorb clock drift
+    TOTP_VALID_WINDOW = int(os.environ.get('TOTP_VALID_WINDOW', 1))
+
+    # JWT / sessions
+    JWT_ACCESS_TOKEN_MINUTES = int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 15))
+    REFRESH_TOKEN_DAYS = int(os.environ.get('REFRESH_TOKEN_DAYS', 14))
+
+    # Password hashing
+    # Algorithm: 'scrypt' (Werkzeug default) or 'pbkdf2:sha256'.
+    # Iterations: PBKDF2 rounds, or the scrypt cost factor N. Unset uses Werkzeug's defaults.
+    # Hashes made with other parameters are upgraded transparently on the next successful login.
+    PASSWORD_HASH_ALGORITHM = os.environ.get('PASSWORD_HASH_ALGORITHM', 'scrypt')
+    PASSWORD_HASH_ITERATIONS = int(os.environ['PASSWORD_HASH_ITERATIONS']) if os.environ.get('PASSWORD_HASH_ITERATIONS') else None
+    PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH', 16))
+    # Most password verifications one worker runs at once (0 = unbounded). Only matters with
+    # GUNICORN_THREADS > 1: defaults to the thread count, capped at the CPU count
+    PASSWORD_VERIFY_THREADS = int(os.environ.get(
+        'PASSWORD_VERIFY_THREADS', min(int(os.environ.get('GUNICORN_THREADS', 1)), os.cpu_count() or 1)
+    ))
+
+    # Soft delete: deleted users/projects/cohorts vanish from reads at once and are
+    # purged with their dependents by a per-worker background job (0 disables it;
+    # run `flask deleted purge` from cron instead)
+    SOFT_DELETE_PURGE_INTERVAL_SECONDS = int(os.environ.get('SOFT_DELETE_PURGE_INTERVAL_SECONDS', 300))
+    SOFT_DELETE_PURGE_DELAY_SECONDS = int(os.environ.get('SOFT_DELETE_PURGE_DELAY_SECONDS', 0))
+    SOFT_DELETE_PURGE_CHUNK_SIZE = int(os.environ.get('SOFT_DELETE_PURGE_CHUNK_SIZE', 1000))
+
+    # Bulk user import (POST /users/import). It runs inside the request, so unless
+    # USER_IMPORT_MAX_ROWS is set the row limit is what the hashing pool can get
+    # through in USER_IMPORT_TIME_BUDGET_SECONDS (half of gunicorn's timeout), at most 5000
+    USER_IMPORT_MAX_ROWS = int(os.environ['USER_IMPORT_MAX_ROWS']) if os.environ.get('USER_IMPORT_MAX_ROWS') else None
+    USER_IMPORT_TIME_BUDGET_SECONDS = float(os.environ.get(
+        'USER_IMPORT_TIME_BUDGET_SECONDS', int(os.environ.get('GUNICORN_TIMEOUT', 30)) / 2
+    ))
+    USER_IMPORT_BATCH_SIZE = int(os.environ.get('USER_IMPORT_BATCH_SIZE', 500))
+    # Processes in each worker's (reused) hashing pool; 0 hashes in the request thread
+    USER_IMPORT_HASH_WORKERS = int(os.environ.get('USER_IMPORT_HASH_WORKERS', os.cpu_count() or 1))
+
+    # Rate limiting (token buckets, checked before any password hashing or email work)
+    # 'database' shares buckets across gunicorn workers; 'memory' is per process
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_STORAGE = os.environ.get('RATE_LIMIT_STORAGE', 'database')
+    # Only enable behind a proxy that appends the client address to X-Forwarded-For
+    RATE_LIMIT_TRUST_PROXY = os.environ.get('RATE_LIMIT_TRUST_PROXY', 'false').lower() == 'true'
+    # Per route, per key type: "<requests>/<second|minute|hour>"
+    RATE_LIMITS = {
+        'login': {
+            'ip': os.environ.get('RATE_LIMIT_LOGIN_IP', '30/minute'),
+            'account': os.environ.get('RATE_LIMIT_LOGIN_ACCOUNT', '10/minute'),
+        },
+        'verify_2fa': {
+            'ip': os.environ.get('RATE_LIMIT_VERIFY_2FA_IP', '30/minute'),
+            'account': os.environ.get('RATE_LIMIT_VERIFY_2FA_ACCOUNT', '5/minute'),
+        },
+    }
+
+    # Activity log
+    # 'buffered' batches rows per worker into multi-row INSERTs; 'sync' inserts and commits per call
+    ACTIVITY_LOG_MODE = os.environ.get('ACTIVITY_LOG_MODE', 'buffered')
+    ACTIVITY_LOG_BUFFER_SIZE = int(os.environ.get('ACTIVITY_LOG_BUFFER_SIZE', 100))
+    ACTIVITY_LOG_FLUSH_INTERVAL = float(os.environ.get('ACTIVITY_LOG_FLUSH_INTERVAL', 2.0))
+    # Months kept online; older monthly partitions are archived by `flask activity-logs archive`
+    ACTIVITY_LOG_RETENTION_MONTHS = int(os.environ.get('ACTIVITY_LOG_RETENTION_MONTHS', 12))
+    ACTIVITY_LOG_ARCHIVE_DIR = os.environ.get('ACTIVITY_LOG_ARCHIVE_DIR', os.path.join(basedir, '..', 'archive', 'activity_logs'))
@@ -1,9 +1,17 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.passwords import hash_password, verify_password, needs_rehash
 from datetime import datetime, timezone
 
 db = SQLAlchemy()
 
+# -----------------------------
+# Soft delete
+# -----------------------------
+class SoftDeleteMixin:
+    # Set by soft_delete(); such rows are hidden from ORM reads (see
+    # app/utils/soft_delete.py) until the purge job removes them
+    deleted_at = db.Column(db.DateTime(timezone=True), nullable=True, index=True)
+
 # -----------------------------
 # Association table for Project Members
 # -----------------------------
@@ -24,10 +32,21 @@ class ProjectMember(db.Model):
 # -----------------------------
 class ActivityLog(db.Model):
     __tablename__ = 'activity_logs'
+    __table_args__ = (
+        # Per-entity timelines: WHERE entity_type = ? AND entity_id = ? ORDER BY created_at
+        db.Index('ix_activity_logs_entity', 'entity_type', 'entity_id', 'created_at'),
+        # Admin feed filtered by actor: WHERE user_id = ? ORDER BY created_at
+        db.Index('ix_activity_logs_user_created', 'user_id', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
-    action = db.Column(db.String(255), nullable=False)
-    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))  # who performed the action
+    action = db.Column(db.String(255), nullable=False)  # human-readable summary
+    entity_type = db.Column(db.String(50), nullable=True)  # project, cohort, user
+    entity_id = db.Column(db.Integer, nullable=True)
+    verb = db.Column(db.String(50), nullable=True)  # created, updated, deleted, invited, ...
+    details = db.Column(db.JSON, nullable=True)
+    # Partition key on PostgreSQL (monthly ranges, see app/utils/activity_partitions.py)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, index=True, default=lambda: datetime.now(timezone.utc))
 
 # -----------------------------
 # Classes / Specializations
@@ -43,8 +62,10 @@ class Class(db.Model):
 # -----------------------------
 # Users
 # -----------------------------
-class User(db.Model):
+class User(SoftDeleteMixin, db.Model):
     __tablename__ = 'users'
+    # Search indexes on lower(name)/lower(email) (pg_trgm GIN on PostgreSQL) are
+    # expression indexes created in migration 7c2f4e9a1d35, not declared here
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False)
     email = db.Column(db.String(150), unique=True, nullable=False)
@@ -52,13 +73,15 @@ class User(db.Model):
     role = db.Column(db.String(50), default='Student')
     created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
-    cohort_id = db.Column(db.Integer, db.ForeignKey('cohorts.id'), nullable=True)
+    cohort_id = db.Column(db.Integer, db.ForeignKey('cohorts.id'), nullable=True, index=True)
     cohort = db.relationship('Cohort', backref='students')
 
-    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=True)
+    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=True, index=True)
 
     two_factor_enabled = db.Column(db.Boolean, default=False)
     two_factor_secret = db.Column(db.String(255), nullable=True)
+    two_factor_method = db.Column(db.String(20), nullable=True)  # email, totp (NULL means email)
+    totp_last_step = db.Column(db.BigInteger, nullable=True)  # last accepted TOTP time step, blocks replays
 
     owned_projects = db.relationship('Project', backref='owner', lazy=True)
     project_memberships = db.relationship('ProjectMember', back_populates='user', cascade="all, delete-orphan")
@@ -67,15 +90,51 @@ class User(db.Model):
     class_model = db.relationship('Class', back_populates='students') 
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return needs_rehash(self.password_hash)
+
+# -----------------------------
+# Pending 2FA codes (shared across workers)
+# -----------------------------
+class TwoFactorCode(db.Model):
+    __tablename__ = 'two_factor_codes'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    code_hash = db.Column(db.String(64), nullable=False)  # HMAC-SHA256 hex digest, never the raw code
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False, index=True)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+# -----------------------------
+# Rate limit token buckets (shared across workers)
+# -----------------------------
+class RateLimitBucket(db.Model):
+    __tablename__ = 'rate_limit_buckets'
+    key = db.Column(db.String(255), primary_key=True)  # e.g. login:ip:203.0.113.7
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False, index=True)  # epoch seconds of last refill
+
+# -----------------------------
+# Refresh tokens (rotating, stored hashed)
+# -----------------------------
+class RefreshToken(db.Model):
+    __tablename__ = 'refresh_tokens'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    token_hash = db.Column(db.String(64), nullable=False, unique=True)  # SHA-256 hex digest of the token
+    family_id = db.Column(db.String(32), nullable=False, index=True)  # shared by every rotation of one login
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    revoked_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
 # -----------------------------
 # Projects
 # -----------------------------
-class Project(db.Model):
+class Project(SoftDeleteMixin, db.Model):
     __tablename__ = 'projects'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False)
@@ -112,7 +171,7 @@ class Task(db.Model):
 # -----------------------------
 # Cohorts
 # -----------------------------
-class Cohort(db.Model):
+class Cohort(SoftDeleteMixin, db.Model):
     __tablename__ = 'cohorts'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False)
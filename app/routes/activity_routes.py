@@ -1,7 +1,10 @@
 from flask import Blueprint, jsonify, request
-from app.models import ActivityLog
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime, timezone
+from app.models import db, ActivityLog, User
 from app.utils.auth import token_required, role_required
 from app.utils.pagination import paginate
+from app.utils.activity_log import serialize_activity
 import logging
 
 activity_routes = Blueprint('activity_routes', __name__)
@@ -12,6 +15,16 @@ activity_routes = Blueprint('activity_routes', __name__)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+def parse_datetime_arg(name):
+    """
+    Parses an ISO date/datetime query arg as UTC. Returns None if absent, raises ValueError if malformed.
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
 # -----------------------------
 # List activity logs (Admin only)
 # -----------------------------
@@ -19,16 +32,46 @@ logger.setLevel(logging.INFO)
 @token_required
 @role_required(['Admin'])
 def list_activities(current_user):
+    """
+    Filters (all optional, applied in SQL): user_id, since, until (ISO 8601),
+    action (prefix of the action text), verb, entity_type.
+    """
+    try:
+        since = parse_datetime_arg('since')
+        until = parse_datetime_arg('until')
+    except ValueError:
+        return jsonify({'message': 'since/until must be ISO 8601 dates'}), 400
+
+    user_id = request.args.get('user_id')
+    if user_id is not None:
+        try:
+            user_id = int(user_id)
+        except ValueError:
+            return jsonify({'message': 'user_id must be an integer'}), 400
+
     try:
-        activities_paginated = paginate(ActivityLog.query.order_by(ActivityLog.created_at.desc()), request)
+        # Outer join so the actor's name comes back in the same query
+        query = db.session.query(ActivityLog, User.name).outerjoin(User, User.id == ActivityLog.user_id)
+
+        if user_id is not None:
+            query = query.filter(ActivityLog.user_id == user_id)
+        # Range filters on created_at let PostgreSQL skip monthly partitions outside
+        # the window (bound parameters are pruned at planning or execution time)
+        if since:
+            query = query.filter(ActivityLog.created_at >= since)
+        if until:
+            query = query.filter(ActivityLog.created_at < until)
+        if request.args.get('action'):
+            query = query.filter(ActivityLog.action.startswith(request.args['action'], autoescape=True))
+        if request.args.get('verb'):
+            query = query.filter(ActivityLog.verb == request.args['verb'])
+        if request.args.get('entity_type'):
+            query = query.filter(ActivityLog.entity_type == request.args['entity_type'])
+
+        activities_paginated = paginate(query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()), request)
         result = [
-            {
-                'id': a.id,
-                'user_id': a.user_id,
-                'action': a.action,
-                'created_at': a.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            }
-            for a in activities_paginated['items']
+            dict(serialize_activity(a), user_name=user_name)
+            for a, user_name in activities_paginated['items']
         ]
 
         return jsonify({
@@ -38,6 +81,6 @@ def list_activities(current_user):
             'total_items': activities_paginated['total_items']
         }), 200
 
-    except Exception as e:
+    except SQLAlchemyError as e:
         logger.error(f"Failed to fetch activities: {str(e)}")
         return jsonify({'message': 'Failed to fetch activities', 'error': str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,67 @@
+from flask import Blueprint, jsonify, request, current_app, send_file
+from app.utils.auth import token_required, role_required
+from app.utils.slow_queries import read_slow_queries
+from app.utils.profiling import list_profiles, load_profile, profile_path
+import logging
+
+admin_routes = Blueprint('admin_routes', __name__, url_prefix='/admin')
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# -----------------------------
+# Recent slow queries (Admin only)
+# -----------------------------
+@admin_routes.route('/slow-queries', methods=['GET'])
+@token_required
+@role_required(['Admin'])
+def list_slow_queries(current_user):
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+    except ValueError:
+        return jsonify({'message': 'limit must be an integer'}), 400
+
+    threshold = current_app.config.get('SLOW_QUERY_THRESHOLD_MS', 0)
+    queries = read_slow_queries(current_app.config.get('SLOW_QUERY_LOG_FILE'), limit)
+    return jsonify({
+        'threshold_ms': threshold,
+        'enabled': threshold > 0,
+        'queries': queries
+    }), 200
+
+# -----------------------------
+# Stored request profiles (Admin only)
+# -----------------------------
+@admin_routes.route('/profiles', methods=['GET'])
+@token_required
+@role_required(['Admin'])
+def get_profiles(current_user):
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+    except ValueError:
+        return jsonify({'message': 'limit must be an integer'}), 400
+    return jsonify({'profiles': list_profiles(current_app.config.get('PROFILE_DIR'), limit)}), 200
+
+
+# -----------------------------
+# One request profile: JSON summary, or the raw pstats dump with ?format=pstats
+# -----------------------------
+@admin_routes.route('/profiles/<profile_id>', methods=['GET'])
+@token_required
+@role_required(['Admin'])
+def get_profile(current_user, profile_id):
+    directory = current_app.config.get('PROFILE_DIR')
+    if request.args.get('format') == 'pstats':
+        path = profile_path(directory, profile_id, '.prof')
+        if path is None:
+            return jsonify({'message': 'Profile not found'}), 404
+        return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                         download_name=f'{profile_id}.prof')
+
+    profile = load_profile(directory, profile_id)
+    if profile is None:
+        return jsonify({'message': 'Profile not found'}), 404
+    return jsonify(profile), 200
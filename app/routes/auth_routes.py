@@ -1,10 +1,14 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, Response
 from app.models import db, User
-from app.utils.auth import generate_jwt
+from app.utils.auth import generate_jwt, token_required
+from app.utils.rate_limit import rate_limit
 from app.utils.email_utils import send_2fa_code_email
-import random
+from app.utils.two_fa_store import get_code_store, CODE_OK, CODE_MISSING, CODE_EXPIRED
+from app.utils.refresh_tokens import issue_refresh_token, rotate_refresh_token, revoke_refresh_token, RefreshTokenError
+from app.utils.totp import generate_totp_secret, get_provisioning_uri, render_qr_png, verify_totp
+import base64
+import secrets
 import string
-from datetime import datetime, timedelta
 import logging
 
 auth_routes = Blueprint('auth_routes', __name__)
@@ -15,12 +19,9 @@ auth_routes = Blueprint('auth_routes', __name__)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-# Temporary storage for 2FA codes (in production, use Redis or database)
-two_fa_codes = {}
-
 def generate_2fa_code():
     """Generate a random 6-digit 2FA code"""
-    return ''.join(random.choices(string.digits, k=6))
+    return ''.join(secrets.choice(string.digits) for _ in range(6))
 
 # -----------------------------
 # Register new user
@@ -37,13 +38,13 @@ def register():
     if not all([name, email, password]):
         return jsonify({'message': 'Name, email, and password are required'}), 400
 
-    if User.query.filter_by(email=email).first():
+    if User.query.filter_by(email=email).execution_options(include_deleted=True).first():
         return jsonify({'message': 'Email already registered'}), 400
 
     user = User(name=name, email=email, role=role)
     user.set_password(password)
     db.session.add(user)
-    db.session.commit()
+    db.session.flush()
 
     logger.info(f"New user registered: {email}")
     return jsonify({'message': 'User registered successfully.'}), 201
@@ -52,6 +53,7 @@ def register():
 # Login endpoint
 # -----------------------------
 @auth_routes.route('/auth/login', methods=['POST'])
+@rate_limit('login', account_field='email')
 def login():
     # FIX: ensure data is always a dict
     data = request.get_json(silent=True) or {}
@@ -66,12 +68,29 @@ def login():
     if not user or not user.check_password(password):
         return jsonify({'message': 'Invalid credentials'}), 401
 
-    # 2FA flow
+    # Upgrade hashes made under an older hashing policy while we have the plaintext
+    if user.password_needs_rehash():
+        try:
+            user.set_password(password)
+            db.session.flush()
+            logger.info(f"Rehashed password for user {user.id} with current policy")
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Password rehash failed for user {user.id}: {str(e)}")
+
+    # 2FA flow (authenticator app): verified locally, nothing to send
+    if user.two_factor_enabled and user.two_factor_method == 'totp':
+        return jsonify({
+            'message': 'Enter the code from your authenticator app',
+            'user_id': user.id,
+            'two_factor_enabled': True,
+            'two_factor_method': 'totp'
+        }), 200
+
+    # 2FA flow (email)
     if user.two_factor_enabled:
         code = generate_2fa_code()
-        expiry = datetime.now() + timedelta(minutes=10)
-
-        two_fa_codes[user.id] = { 'code': code, 'expiry': expiry }
+        get_code_store().save(user.id, code, current_app.config.get('TWO_FA_CODE_TTL_MINUTES', 10))
 
         try:
             send_2fa_code_email(user.email, code, user.name)
@@ -91,12 +110,16 @@ def login():
     # Normal login → generate JWT
     try:
         token = generate_jwt(user.id, user.role)
+        refresh_token = issue_refresh_token(user.id)
+        db.session.flush()
     except Exception as e:
+        db.session.rollback()
         logger.error(f"JWT generation failed for user {user.id}: {str(e)}")
         return jsonify({'message': 'Login failed'}), 500
 
     return jsonify({
         'token': token,
+        'refresh_token': refresh_token,
         'user': {
             'id': user.id,
             'name': user.name,
@@ -111,6 +134,7 @@ def login():
 # Verify 2FA code
 # -----------------------------
 @auth_routes.route('/auth/verify-2fa', methods=['POST'])
+@rate_limit('verify_2fa', account_field='user_id')
 def verify_2fa():
     data = request.get_json(silent=True) or {}
 
@@ -129,29 +153,35 @@ def verify_2fa():
     if not user or not user.two_factor_enabled:
         return jsonify({'message': '2FA not enabled for this user'}), 400
 
-    if user_id not in two_fa_codes:
-        logger.warning(f"No 2FA code found for user_id: {user_id}. Available keys: {list(two_fa_codes.keys())}")
-        return jsonify({'message': 'No 2FA code found. Please request a new code.'}), 400
+    if user.two_factor_method == 'totp':
+        if not verify_totp(user, code):
+            return jsonify({'message': 'Invalid 2FA code'}), 401
+        result = CODE_OK
+    else:
+        result = get_code_store().consume(user_id, str(code))
 
-    stored_data = two_fa_codes[user_id]
+    if result == CODE_MISSING:
+        logger.warning(f"No 2FA code found for user_id: {user_id}")
+        return jsonify({'message': 'No 2FA code found. Please request a new code.'}), 400
 
-    if datetime.now() > stored_data['expiry']:
-        del two_fa_codes[user_id]
+    if result == CODE_EXPIRED:
         return jsonify({'message': '2FA code expired. Please login again.'}), 400
 
-    if code != stored_data['code']:
+    if result != CODE_OK:
         return jsonify({'message': 'Invalid 2FA code'}), 401
 
-    del two_fa_codes[user_id]
-
     try:
         token = generate_jwt(user.id, user.role)
+        refresh_token = issue_refresh_token(user.id)
+        db.session.flush()
     except Exception as e:
+        db.session.rollback()
         logger.error(f"JWT generation failed for user {user.id}: {str(e)}")
         return jsonify({'message': '2FA verification failed'}), 500
 
     return jsonify({
         'token': token,
+        'refresh_token': refresh_token,
         'user': {
             'id': user.id,
             'name': user.name,
@@ -163,6 +193,48 @@ def verify_2fa():
         }
     }), 200
 
+# -----------------------------
+# Refresh access token (no password check)
+# -----------------------------
+@auth_routes.route('/auth/refresh', methods=['POST'])
+def refresh():
+    data = request.get_json(silent=True) or {}
+    refresh_token = data.get('refresh_token')
+
+    if not refresh_token:
+        return jsonify({'message': 'Refresh token is required'}), 400
+
+    try:
+        user_id, new_refresh_token = rotate_refresh_token(refresh_token)
+    except RefreshTokenError as e:
+        return jsonify({'message': str(e)}), 401
+
+    user = db.session.get(User, user_id)
+    if not user:
+        return jsonify({'message': 'Invalid or expired refresh token'}), 401
+
+    try:
+        token = generate_jwt(user.id, user.role)
+    except Exception as e:
+        logger.error(f"JWT generation failed for user {user.id}: {str(e)}")
+        return jsonify({'message': 'Token refresh failed'}), 500
+
+    return jsonify({'token': token, 'refresh_token': new_refresh_token}), 200
+
+# -----------------------------
+# Logout (revoke refresh token)
+# -----------------------------
+@auth_routes.route('/auth/logout', methods=['POST'])
+def logout():
+    data = request.get_json(silent=True) or {}
+    refresh_token = data.get('refresh_token')
+
+    if not refresh_token:
+        return jsonify({'message': 'Refresh token is required'}), 400
+
+    revoke_refresh_token(refresh_token)
+    return jsonify({'message': 'Logged out'}), 200
+
 # -----------------------------
 # Enable 2FA
 # -----------------------------
@@ -183,7 +255,8 @@ def enable_2fa():
 
     user.two_factor_enabled = True
     user.two_factor_secret = 'email-based-2fa'
-    db.session.commit()
+    user.two_factor_method = 'email'
+    db.session.flush()
 
     logger.info(f"2FA enabled for user {user.email}")
     return jsonify({'message': '2FA enabled successfully. You will receive a code via email when logging in.'}), 200
@@ -205,7 +278,68 @@ def disable_2fa():
 
     user.two_factor_enabled = False
     user.two_factor_secret = None
-    db.session.commit()
+    user.two_factor_method = None
+    user.totp_last_step = None
+    db.session.flush()
     logger.info(f"2FA disabled for user {user.email}")
 
     return jsonify({'message': '2FA disabled'}), 200
+
+
+# -----------------------------
+# Provision authenticator app (TOTP) 2FA
+# -----------------------------
+@auth_routes.route('/auth/2fa/totp/setup', methods=['POST'])
+@token_required
+def setup_totp(current_user):
+    """
+    Generates a new TOTP secret and returns it as a QR code PNG.
+    Pass ?format=json to get the secret, URI and base64 PNG instead.
+    2FA is only switched to TOTP once /auth/2fa/totp/confirm succeeds.
+    """
+    if current_user.two_factor_enabled and current_user.two_factor_method == 'totp':
+        return jsonify({'message': 'Authenticator app 2FA already enabled'}), 400
+
+    secret = generate_totp_secret()
+    current_user.two_factor_secret = secret
+    current_user.totp_last_step = None
+    db.session.flush()
+
+    uri = get_provisioning_uri(current_user, secret)
+    png = render_qr_png(uri)
+    logger.info(f"TOTP secret provisioned for user {current_user.email}")
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'secret': secret,
+            'provisioning_uri': uri,
+            'qr_code': base64.b64encode(png).decode()
+        }), 200
+
+    return Response(png, mimetype='image/png', headers={'Cache-Control': 'no-store'})
+
+# -----------------------------
+# Confirm authenticator app (TOTP) 2FA
+# -----------------------------
+@auth_routes.route('/auth/2fa/totp/confirm', methods=['POST'])
+@token_required
+def confirm_totp(current_user):
+    data = request.get_json(silent=True) or {}
+    code = data.get('code')
+
+    if not code:
+        return jsonify({'message': '2FA code is required'}), 400
+
+    secret = current_user.two_factor_secret
+    if not secret or secret == 'email-based-2fa':
+        return jsonify({'message': 'Authenticator app not set up. Please start setup again.'}), 400
+
+    if not verify_totp(current_user, code, secret=secret):
+        return jsonify({'message': 'Invalid 2FA code'}), 401
+
+    current_user.two_factor_enabled = True
+    current_user.two_factor_method = 'totp'
+    db.session.flush()
+
+    logger.info(f"Authenticator app 2FA enabled for user {current_user.email}")
+    return jsonify({'message': 'Authenticator app 2FA enabled successfully.'}), 200
@@ -1,8 +1,15 @@
 from flask import Blueprint, request, jsonify
 from app.models import db, Class, User
+from app.utils.auth import token_required, role_required
+from app.utils.rosters import roster_page, roster_counts, RosterSortError
+from app.utils.bulk_assign import selection_criteria, assign_users, BulkAssignError
 
 class_bp = Blueprint('class_bp', __name__, url_prefix='/classes')
 
+# Deprecated: GET /classes/<id> still embeds `students` for one release,
+# capped to the first students by name. Page through /classes/<id>/students instead.
+EMBEDDED_ROSTER_LIMIT = 100
+
 # -----------------------------
 # CREATE a new class
 # -----------------------------
@@ -23,7 +30,7 @@ def create_class():
 
     new_class = Class(name=name)
     db.session.add(new_class)
-    db.session.commit()
+    db.session.flush()
 
     return jsonify({
         'message': 'Class created successfully',
@@ -41,17 +48,19 @@ def create_class():
 def get_classes():
     query = db.select(Class)
     classes = db.session.execute(query).scalars().all()
+    counts = roster_counts('class_id', [cls.id for cls in classes])
     result = [{
         'id': cls.id,
         'name': cls.name,
-        'created_at': cls.created_at.isoformat()
+        'created_at': cls.created_at.isoformat(),
+        'student_count': counts[cls.id]
     } for cls in classes]
 
     return jsonify(result), 200
 
 
 # -----------------------------
-# READ single class by ID (with students)
+# READ single class by ID (full roster via /classes/<id>/students)
 # -----------------------------
 @class_bp.route('/<int:class_id>', methods=['GET'])
 def get_class(class_id):
@@ -59,18 +68,20 @@ def get_class(class_id):
     if not cls:
         return jsonify({'error': 'Class not found'}), 404
 
-    students = [{
-        'id': s.id,
-        'name': s.name,
-        'email': s.email,
-        'role': s.role
-    } for s in cls.students]
+    students = db.session.execute(
+        db.select(User.id, User.name, User.email, User.role)
+        .where(User.class_id == cls.id)
+        .order_by(User.name, User.id)
+        .limit(EMBEDDED_ROSTER_LIMIT)
+    ).all()
 
     return jsonify({
         'id': cls.id,
         'name': cls.name,
         'created_at': cls.created_at.isoformat(),
-        'students': students
+        'student_count': roster_counts('class_id', [cls.id])[cls.id],
+        # Deprecated, see EMBEDDED_ROSTER_LIMIT; complete only when student_count <= its length
+        'students': [{'id': s.id, 'name': s.name, 'email': s.email, 'role': s.role} for s in students]
     }), 200
 
 
@@ -94,7 +105,7 @@ def update_class(class_id):
             return jsonify({'error': 'Another class with this name already exists'}), 409
         cls.name = name
 
-    db.session.commit()
+    db.session.flush()
     return jsonify({'message': 'Class updated successfully'}), 200
 
 
@@ -108,12 +119,12 @@ def delete_class(class_id):
         return jsonify({'error': 'Class not found'}), 404
 
     db.session.delete(cls)
-    db.session.commit()
+    db.session.flush()
     return jsonify({'message': 'Class deleted successfully'}), 200
 
 
 # -----------------------------
-# LIST all students in a class
+# LIST students in a class (paginated, ?sort=name|email|id|created_at, '-' for desc)
 # -----------------------------
 @class_bp.route('/<int:class_id>/students', methods=['GET'])
 def get_class_students(class_id):
@@ -121,11 +132,35 @@ def get_class_students(class_id):
     if not cls:
         return jsonify({'error': 'Class not found'}), 404
 
-    students = [{
-        'id': s.id,
-        'name': s.name,
-        'email': s.email,
-        'role': s.role
-    } for s in cls.students]
+    try:
+        roster = roster_page('class_id', cls.id, request)
+    except RosterSortError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'class': {'id': cls.id, 'name': cls.name, 'student_count': roster['total_items']},
+        'students': roster['items'],
+        'page': roster['page'],
+        'total_pages': roster['total_pages'],
+        'total_items': roster['total_items']
+    }), 200
+
+
+# -----------------------------
+# Bulk assign users to a class (Admin only)
+# -----------------------------
+@class_bp.route('/<int:class_id>/assign', methods=['POST'])
+@token_required
+@role_required(['Admin'])
+def assign_class(current_user, class_id):
+    cls = db.session.get(Class, class_id)
+    if not cls:
+        return jsonify({'error': 'Class not found'}), 404
+
+    try:
+        criteria = selection_criteria(request.get_json(silent=True))
+    except BulkAssignError as e:
+        return jsonify({'error': str(e)}), 400
 
-    return jsonify({'class': {'id': cls.id, 'name': cls.name}, 'students': students}), 200
+    moved = assign_users('class_id', cls.id, criteria, current_user.id, 'assigned_class', f"class: {cls.name}")
+    return jsonify({'message': f'{len(moved)} users assigned to {cls.name}', 'updated': len(moved), 'user_ids': moved}), 200
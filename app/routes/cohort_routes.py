@@ -1,8 +1,12 @@
 from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy.exc import SQLAlchemyError
 from app.models import db, Cohort
 from app.utils.auth import token_required, role_required
 from app.utils.pagination import paginate
 from app.utils.activity_log import log_activity
+from app.utils.soft_delete import soft_delete
+from app.utils.rosters import roster_page, roster_counts, RosterSortError
+from app.utils.bulk_assign import selection_criteria, assign_users, BulkAssignError
 import logging
 
 cohort_routes = Blueprint('cohort_routes', __name__)
@@ -32,8 +36,8 @@ def add_cohort(current_user):
 
     try:
         db.session.add(cohort)
-        db.session.commit()
-        log_activity(current_user.id, f"Created cohort: {cohort.name}")
+        db.session.flush()
+        log_activity(current_user.id, f"Created cohort: {cohort.name}", 'cohort', cohort.id, 'created')
         logger.info(f"Admin {current_user.email} created cohort {cohort.name}")
         return jsonify({'message': 'Cohort created', 'id': cohort.id}), 201
     except Exception as e:
@@ -49,6 +53,7 @@ def add_cohort(current_user):
 def list_cohorts(current_user):
     try:
         cohorts_paginated = paginate(Cohort.query, request)
+        counts = roster_counts('cohort_id', [c.id for c in cohorts_paginated['items']])
         items = []
         for c in cohorts_paginated['items']:
             items.append({
@@ -56,7 +61,8 @@ def list_cohorts(current_user):
                 'name': c.name,
                 'start_date': c.start_date.isoformat() if c.start_date else None,
                 'end_date': c.end_date.isoformat() if c.end_date else None,
-                'created_at': c.created_at.isoformat()
+                'created_at': c.created_at.isoformat(),
+                'student_count': counts[c.id]
             })
         return jsonify({
             'items': items,
@@ -64,10 +70,33 @@ def list_cohorts(current_user):
             'total_pages': cohorts_paginated['total_pages'],
             'total_items': cohorts_paginated['total_items']
         }), 200
-    except Exception as e:
+    except SQLAlchemyError as e:
         logger.error(f"Failed to list cohorts: {str(e)}")
         return jsonify({'message': 'Failed to fetch cohorts', 'error': str(e)}), 500
 
+# -----------------------------
+# Cohort roster (paginated, ?sort=name|email|id|created_at, '-' for desc)
+# -----------------------------
+@cohort_routes.route('/cohorts/<int:cohort_id>/students', methods=['GET'])
+@token_required
+def list_cohort_students(current_user, cohort_id):
+    cohort = db.session.get(Cohort, cohort_id)
+    if not cohort:
+        return jsonify({'message': 'Cohort not found'}), 404
+
+    try:
+        roster = roster_page('cohort_id', cohort.id, request)
+    except RosterSortError as e:
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify({
+        'cohort': {'id': cohort.id, 'name': cohort.name, 'student_count': roster['total_items']},
+        'items': roster['items'],
+        'page': roster['page'],
+        'total_pages': roster['total_pages'],
+        'total_items': roster['total_items']
+    }), 200
+
 # -----------------------------
 # Edit cohort (Admin only)
 # -----------------------------
@@ -85,8 +114,8 @@ def edit_cohort(current_user, cohort_id):
     cohort.end_date = data.get('end_date', cohort.end_date)
 
     try:
-        db.session.commit()
-        log_activity(current_user.id, f"Edited cohort: {cohort.name}")
+        db.session.flush()
+        log_activity(current_user.id, f"Edited cohort: {cohort.name}", 'cohort', cohort.id, 'updated')
         logger.info(f"Admin {current_user.email} edited cohort {cohort.name}")
         return jsonify({'message': 'Cohort updated'}), 200
     except Exception as e:
@@ -104,9 +133,9 @@ def remove_cohort(current_user, cohort_id):
     cohort = Cohort.query.get_or_404(cohort_id)
 
     try:
-        db.session.delete(cohort)
-        db.session.commit()
-        log_activity(current_user.id, f"Deleted cohort: {cohort.name}")
+        soft_delete(cohort)
+        log_activity(current_user.id, f"Deleted cohort: {cohort.name}", 'cohort', cohort.id, 'deleted', atomic=True)
+        db.session.flush()
         logger.info(f"Admin {current_user.email} deleted cohort {cohort.name}")
         return jsonify({'message': 'Cohort deleted'}), 200
     except Exception as e:
@@ -114,7 +143,30 @@ def remove_cohort(current_user, cohort_id):
         logger.error(f"Failed to delete cohort: {str(e)}")
         return jsonify({'message': 'Failed to delete cohort', 'error': str(e)}), 500
 
+# -----------------------------
+# Bulk assign users to a cohort (Admin only)
+# -----------------------------
+@cohort_routes.route('/cohorts/<int:cohort_id>/assign', methods=['POST'])
+@token_required
+@role_required(['Admin'])
+def assign_cohort(current_user, cohort_id):
+    """
+    Body: {"user_ids": [...]} or {"filter": {"role": ..., "cohort_id": ..., "class_id": ...}}
+    """
+    cohort = db.session.get(Cohort, cohort_id)
+    if not cohort:
+        return jsonify({'message': 'Cohort not found'}), 404
+
+    try:
+        criteria = selection_criteria(request.get_json(silent=True))
+    except BulkAssignError as e:
+        return jsonify({'message': str(e)}), 400
 
+    moved = assign_users('cohort_id', cohort.id, criteria, current_user.id, 'assigned_cohort', f"cohort: {cohort.name}")
+    logger.info(f"Admin {current_user.email} assigned {len(moved)} users to cohort {cohort.name}")
+    return jsonify({'message': f'{len(moved)} users assigned to {cohort.name}', 'updated': len(moved), 'user_ids': moved}), 200
+
+# -----------------------------
 # Student joins a cohort
 # -----------------------------
 @cohort_routes.route('/cohorts/<int:cohort_id>/join', methods=['POST'])
@@ -133,8 +185,9 @@ def join_cohort(current_user, cohort_id):
     # Assign the student to the cohort
     current_user.cohort_id = cohort.id
     try:
-        db.session.commit()
-        log_activity(current_user.id, f"Joined cohort: {cohort.name}")
+        db.session.flush()
+        log_activity(current_user.id, f"Joined cohort: {cohort.name}", 'user', current_user.id, 'joined_cohort',
+                     {'cohort_id': cohort.id})
         logger.info(f"Student {current_user.email} joined cohort {cohort.name}")
         return jsonify({
             "message": f"{current_user.name} has joined {cohort.name}",
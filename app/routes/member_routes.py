@@ -3,7 +3,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from app.models import db, Project, ProjectMember, User
 from app.utils.auth import token_required
 from app.utils.activity_log import log_activity
-from app.utils.email_utils import send_invitation_email
+from app.utils.email_utils import queue_invitation_email
 
 member_routes = Blueprint('member_routes', __name__)
 
@@ -37,32 +37,16 @@ def invite_member(current_user, project_id):
     try:
         invitation = ProjectMember(project_id=project_id, user_id=user.id, status='pending', role=role)
         db.session.add(invitation)
-        db.session.commit()
-        log_activity(current_user.id, f"Invited {user.email} as {role} to project {project.name}")
-
-        # Attempt to send email notification
-        email_sent = False
-        email_error = None
-        try:
-            send_invitation_email(user.email, project.name, current_user.name, project.id, user.id)
-            email_sent = True
-        except ValueError as ve:
-            # Invalid API key or configuration error
-            email_error = str(ve)
-        except Exception as e:
-            # SendGrid API error or other issues
-            email_error = f"Email service error: {str(e)}"
-
-        response_message = f'Invitation created as {role}'
-        if email_sent:
-            response_message += ' and email notification sent'
-        else:
-            response_message += f' but email notification failed: {email_error}'
+        db.session.flush()
+        log_activity(current_user.id, f"Invited {user.email} as {role} to project {project.name}", 'project', project.id,
+                     'member_invited', {'user_id': user.id, 'role': role})
+
+        # The email goes out once the invitation is committed
+        queue_invitation_email(user.email, project.name, current_user.name, project.id, user.id)
 
         return jsonify({
-            'message': response_message,
-            'email_sent': email_sent,
-            'email_error': email_error
+            'message': f'Invitation created as {role}; email notification queued',
+            'email_queued': True
         }), 201
     except SQLAlchemyError as e:
         db.session.rollback()
@@ -91,8 +75,9 @@ def remove_member(current_user, project_id):
 
     try:
         db.session.delete(member)
-        db.session.commit()
-        log_activity(current_user.id, f"Removed user {user_id} from project {project.name}")
+        db.session.flush()
+        log_activity(current_user.id, f"Removed user {user_id} from project {project.name}", 'project', project.id,
+                     'member_removed', {'user_id': user_id})
         return jsonify({'message': 'Member removed'}), 200
     except SQLAlchemyError as e:
         db.session.rollback()
@@ -151,8 +136,10 @@ def respond_invitation(current_user, project_id):
         else:
             invitation.status = 'accepted'
 
-        db.session.commit()
-        log_activity(current_user.id, f"{action.title()}ed invitation for project {project_id}")
+        db.session.flush()
+        log_activity(current_user.id, f"{action.title()}ed invitation for project {project_id}", 'project', project_id,
+                     'invitation_accepted' if action == 'accept' else 'invitation_declined',
+                     {'user_id': current_user.id})
         return jsonify({'message': f'Invitation {action}ed', 'role': invitation.role if action == 'accept' else None, 'status': invitation.status if action == 'accept' else 'removed'}), 200
     except SQLAlchemyError as e:
         db.session.rollback()
@@ -202,8 +189,9 @@ def respond_invitation_email(project_id, user_id, action):
         if action == 'reject':
             # Remove the member if they reject
             db.session.delete(invitation)
-            db.session.commit()
-            log_activity(user_id, f"Rejected invitation for project {project.name}")
+            db.session.flush()
+            log_activity(user_id, f"Rejected invitation for project {project.name}", 'project', project.id,
+                         'invitation_declined', {'user_id': user_id})
 
             return render_template_string("""
                 <!DOCTYPE html>
@@ -219,8 +207,9 @@ def respond_invitation_email(project_id, user_id, action):
         else:
             # Accept the invitation
             invitation.status = 'accepted'
-            db.session.commit()
-            log_activity(user_id, f"Accepted invitation for project {project.name}")
+            db.session.flush()
+            log_activity(user_id, f"Accepted invitation for project {project.name}", 'project', project.id,
+                         'invitation_accepted', {'user_id': user_id})
 
             return render_template_string("""
                 <!DOCTYPE html>
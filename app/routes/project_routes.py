@@ -4,7 +4,10 @@ from sqlalchemy.exc import SQLAlchemyError
 from app.models import db, Project, ProjectMember, User, Class
 from app.utils.auth import token_required
 from app.utils.pagination import paginate
-from app.utils.activity_log import log_activity
+from app.utils.activity_log import log_activity, entity_timeline_query, serialize_activity
+from app.utils.unit_of_work import savepoint
+from app.utils.email_utils import queue_invitation_email
+from app.utils.soft_delete import soft_delete
 from functools import wraps
 
 project_routes = Blueprint('project_routes', __name__)
@@ -60,8 +63,8 @@ def add_project(current_user):
 
     try:
         db.session.add(project)
-        db.session.commit()
-        log_activity(current_user.id, f"Created project: {project.name}")
+        db.session.flush()
+        log_activity(current_user.id, f"Created project: {project.name}", 'project', project.id, 'created')
         logger.info(f"Project {project.id} created by user {current_user.id}")
         return jsonify({'message': 'Project created', 'id': project.id}), 201
     except SQLAlchemyError as e:
@@ -208,6 +211,22 @@ def get_project(current_user, project_id):
         }
     })
 
+# -----------------------------
+# Project activity timeline
+# -----------------------------
+@project_routes.route('/projects/<int:project_id>/activity', methods=['GET'])
+@token_required
+def get_project_activity(current_user, project_id):
+    # Everyone can view any project, so its history is visible too.
+    # Deleted projects keep their timeline, so no existence check.
+    activities_paginated = paginate(entity_timeline_query('project', project_id), request)
+    return jsonify({
+        'items': [serialize_activity(a) for a in activities_paginated['items']],
+        'page': activities_paginated['page'],
+        'total_pages': activities_paginated['total_pages'],
+        'total_items': activities_paginated['total_items']
+    }), 200
+
 # -----------------------------
 # Update project (owner or admin)
 # -----------------------------
@@ -234,8 +253,6 @@ def edit_project(current_user, project_id):
     members_invited = []
     members_errors = []
     if 'members' in data and isinstance(data['members'], list):
-        from app.utils.email_utils import send_invitation_email
-
         for member_email in data['members']:
             if not member_email or not isinstance(member_email, str):
                 continue
@@ -251,29 +268,28 @@ def edit_project(current_user, project_id):
             if existing:
                 continue  # Skip if already invited
 
-            # Create invitation
+            # Create invitation (savepoint: a failed invite doesn't undo the others)
             try:
-                invitation = ProjectMember(
-                    project_id=project_id,
-                    user_id=user.id,
-                    status='pending',
-                    role='collaborator'
-                )
-                db.session.add(invitation)
-                members_invited.append(member_email)
-
-                # Try to send email notification
-                try:
-                    send_invitation_email(user.email, project.name, current_user.name, project.id, user.id)
-                except Exception as email_error:
-                    logger.warning(f"Failed to send invitation email to {user.email}: {str(email_error)}")
-
-            except Exception as e:
+                with savepoint():
+                    invitation = ProjectMember(
+                        project_id=project_id,
+                        user_id=user.id,
+                        status='pending',
+                        role='collaborator'
+                    )
+                    db.session.add(invitation)
+            except SQLAlchemyError as e:
                 members_errors.append(f"Failed to invite {member_email}: {str(e)}")
+                continue
+
+            members_invited.append(member_email)
+
+            queue_invitation_email(user.email, project.name, current_user.name, project.id, user.id)
 
     try:
-        db.session.commit()
-        log_activity(current_user.id, f"Updated project: {project.name}")
+        db.session.flush()
+        log_activity(current_user.id, f"Updated project: {project.name}", 'project', project.id, 'updated',
+                     {'members_invited': members_invited} if members_invited else None)
         logger.info(f"Project {project.id} updated by user {current_user.id}")
 
         response_data = {'message': 'Project updated'}
@@ -300,9 +316,10 @@ def remove_project(current_user, project_id):
         return jsonify({'message': 'Project not found'}), 404
 
     try:
-        db.session.delete(project)
-        db.session.commit()
-        log_activity(current_user.id, f"Deleted project: {project.name}")
+        # Tasks and memberships are purged in the background
+        soft_delete(project)
+        log_activity(current_user.id, f"Deleted project: {project.name}", 'project', project.id, 'deleted', atomic=True)
+        db.session.flush()
         logger.info(f"Project {project.id} deleted by user {current_user.id}")
         return jsonify({'message': 'Project deleted'})
     except SQLAlchemyError as e:
@@ -330,8 +347,9 @@ def change_project_status(current_user, project_id):
 
     project.status = status
     try:
-        db.session.commit()
-        log_activity(current_user.id, f"Changed status of project {project.name} to {status}")
+        db.session.flush()
+        log_activity(current_user.id, f"Changed status of project {project.name} to {status}", 'project', project.id,
+                     'status_changed', {'status': status})
         logger.info(f"Project {project.id} status changed to {status} by user {current_user.id}")
         return jsonify({'message': 'Project status updated'})
     except SQLAlchemyError as e:
@@ -11,12 +11,27 @@ task_bp = Blueprint('tasks', __name__, url_prefix='/tasks')
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+
+def visible_tasks():
+    """
+    SELECT of tasks whose project isn't soft-deleted: the soft-delete filter
+    lands in the join's ON clause, so a deleted project joins as NULL
+    """
+    return (
+        db.select(Task).outerjoin(Task.project)
+        .where(db.or_(Task.project_id.is_(None), Project.id.is_not(None)))
+    )
+
+
+def get_visible_task(task_id):
+    return db.session.execute(visible_tasks().where(Task.id == task_id)).scalar_one_or_none()
+
 # -----------------------------
 # Get all tasks
 # -----------------------------
 @task_bp.route('/', methods=['GET'])
 def get_tasks():
-    tasks = db.session.query(Task).all()
+    tasks = db.session.execute(visible_tasks()).scalars().all()
     return jsonify([
         {
             'id': t.id,
@@ -34,7 +49,7 @@ def get_tasks():
 # -----------------------------
 @task_bp.route('/<int:task_id>', methods=['GET'])
 def get_task(task_id):
-    task = db.session.get(Task, task_id)
+    task = get_visible_task(task_id)
     if not task:
         abort(404, description="Task not found")
     return jsonify({
@@ -77,7 +92,7 @@ def create_task():
     )
 
     db.session.add(new_task)
-    db.session.commit()
+    db.session.flush()
     logger.info(f"Task {new_task.id} created for project {project.id}")
     return jsonify({'message': 'Task created successfully', 'task_id': new_task.id}), 201
 
@@ -86,7 +101,7 @@ def create_task():
 # -----------------------------
 @task_bp.route('/<int:task_id>', methods=['PUT'])
 def update_task(task_id):
-    task = db.session.get(Task, task_id)
+    task = get_visible_task(task_id)
     if not task:
         abort(404, description="Task not found")
 
@@ -104,7 +119,7 @@ def update_task(task_id):
             return jsonify({'error': 'Assignee not found'}), 404
         task.assignee_id = assignee.id
 
-    db.session.commit()
+    db.session.flush()
     logger.info(f"Task {task.id} updated")
     return jsonify({'message': 'Task updated successfully'}), 200
 
@@ -113,11 +128,11 @@ def update_task(task_id):
 # -----------------------------
 @task_bp.route('/<int:task_id>', methods=['DELETE'])
 def delete_task(task_id):
-    task = db.session.get(Task, task_id)
+    task = get_visible_task(task_id)
     if not task:
         abort(404, description="Task not found")
     db.session.delete(task)
-    db.session.commit()
+    db.session.flush()
     logger.info(f"Task {task.id} deleted")
     return jsonify({'message': 'Task deleted successfully'}), 200
 
@@ -126,7 +141,7 @@ def delete_task(task_id):
 # -----------------------------
 @task_bp.route('/project/<int:project_id>', methods=['GET'])
 def get_tasks_by_project(project_id):
-    tasks = db.session.query(Task).filter_by(project_id=project_id).all()
+    tasks = db.session.execute(visible_tasks().where(Task.project_id == project_id)).scalars().all()
     return jsonify({
         'tasks': [
             {
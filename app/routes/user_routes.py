@@ -1,19 +1,62 @@
 from flask import Blueprint, request, jsonify
 from app.models import db, User
 from app.utils.auth import token_required, role_required
+from app.utils.activity_log import log_activity, entity_timeline_query, serialize_activity
+from app.utils.pagination import paginate, paginate_select
+from app.utils.soft_delete import soft_delete
+from app.utils.user_import import parse_import_rows, import_users, max_import_rows, UserImportError
 
 user_routes = Blueprint('user_routes', __name__)
 
 # -----------------------------
-# List all users (Admin only)
+# List users (Admin only)
 # -----------------------------
 @user_routes.route('/users/', methods=['GET'])
 @token_required
 @role_required(['Admin'])
 def list_users(current_user):
-    users = db.session.execute(db.select(User)).scalars().all()
-    result = [{'id': u.id, 'name': u.name, 'email': u.email, 'role': u.role} for u in users]
-    return jsonify(result), 200
+    # Column projection: never loads password hashes or builds User entities
+    query = db.select(User.id, User.name, User.email, User.role, User.cohort_id, User.class_id)
+
+    search = request.args.get('q', '').strip().lower()
+    if search:
+        match = request.args.get('match', 'prefix')
+        if match not in ('prefix', 'contains'):
+            return jsonify({'message': "match must be 'prefix' or 'contains'"}), 400
+        # Served by the lower(name)/lower(email) trigram or prefix indexes
+        if match == 'prefix':
+            name_filter = db.func.lower(User.name).startswith(search, autoescape=True)
+            email_filter = db.func.lower(User.email).startswith(search, autoescape=True)
+        else:
+            name_filter = db.func.lower(User.name).contains(search, autoescape=True)
+            email_filter = db.func.lower(User.email).contains(search, autoescape=True)
+        query = query.where(db.or_(name_filter, email_filter))
+
+    if request.args.get('role'):
+        query = query.where(User.role == request.args['role'])
+    for field in ('cohort_id', 'class_id'):
+        value = request.args.get(field)
+        if value is None:
+            continue
+        try:
+            query = query.where(getattr(User, field) == int(value))
+        except ValueError:
+            return jsonify({'message': f'{field} must be an integer'}), 400
+
+    users_paginated = paginate_select(db.session, query.order_by(User.name, User.id), request)
+    return jsonify({
+        'items': [{
+            'id': u.id,
+            'name': u.name,
+            'email': u.email,
+            'role': u.role,
+            'cohort_id': u.cohort_id,
+            'class_id': u.class_id
+        } for u in users_paginated['items']],
+        'page': users_paginated['page'],
+        'total_pages': users_paginated['total_pages'],
+        'total_items': users_paginated['total_items']
+    }), 200
 
 # -----------------------------
 # Get single user (Admin or self)
@@ -46,9 +89,32 @@ def create_user(current_user):
     )
     user.set_password(data['password'])
     db.session.add(user)
-    db.session.commit()
+    db.session.flush()
+    log_activity(current_user.id, f"Created user: {user.email}", 'user', user.id, 'created', {'role': user.role})
     return jsonify({'message': 'User created successfully', 'id': user.id}), 201
 
+# -----------------------------
+# Bulk import users from CSV/JSON (Admin only)
+# -----------------------------
+@user_routes.route('/users/import', methods=['POST'])
+@token_required
+@role_required(['Admin'])
+def import_users_route(current_user):
+    try:
+        rows = parse_import_rows(request)
+    except UserImportError as e:
+        return jsonify({'message': str(e)}), 400
+
+    if not rows:
+        return jsonify({'message': 'No users to import'}), 400
+    max_rows = max_import_rows()
+    if len(rows) > max_rows:
+        return jsonify({'message': f'Too many rows; the limit is {max_rows}'}), 413
+
+    report = import_users(rows, current_user.id)
+    summary = {status: sum(1 for r in report if r['status'] == status) for status in ('created', 'skipped', 'error')}
+    return jsonify({'message': 'Import finished', 'summary': summary, 'results': report}), 200
+
 # -----------------------------
 # Update user (Admin or self)
 # -----------------------------
@@ -71,7 +137,8 @@ def update_user(current_user, user_id):
         user.role = data.get('role', user.role)
     if data.get('password'):
         user.set_password(data['password'])
-    db.session.commit()
+    db.session.flush()
+    log_activity(current_user.id, f"Updated user: {user.email}", 'user', user.id, 'updated', {'fields': sorted(data)})
     return jsonify({'message': 'User updated successfully'})
 
 # -----------------------------
@@ -88,6 +155,26 @@ def delete_user(current_user, user_id):
     if current_user.id != user.id and current_user.role != 'Admin':
         return jsonify({'message': 'Not authorized'}), 403
 
-    db.session.delete(user)
-    db.session.commit()
+    # Hidden at once; tasks, memberships and tokens are purged in the background
+    soft_delete(user)
+    log_activity(current_user.id, f"Deleted user: {user.email}", 'user', user.id, 'deleted', atomic=True)
+    db.session.flush()
     return jsonify({'message': 'User deleted successfully'})
+
+
+# -----------------------------
+# User activity timeline (Admin or self)
+# -----------------------------
+@user_routes.route('/users/<int:user_id>/activity', methods=['GET'])
+@token_required
+def get_user_activity(current_user, user_id):
+    if current_user.id != user_id and current_user.role != 'Admin':
+        return jsonify({'message': 'You are not authorized to access this resource.'}), 403
+
+    activities_paginated = paginate(entity_timeline_query('user', user_id), request)
+    return jsonify({
+        'items': [serialize_activity(a) for a in activities_paginated['items']],
+        'page': activities_paginated['page'],
+        'total_pages': activities_paginated['total_pages'],
+        'total_items': activities_paginated['total_items']
+    }), 200
@@ -1,9 +1,201 @@
+import atexit
+import os
+import threading
+import logging
+from datetime import datetime, timezone
+from flask import current_app
 from app.models import db, ActivityLog
+from app.utils.tracing import traced
+from app.utils.unit_of_work import on_commit
 
-def log_activity(user_id, action):
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class ActivityLogWriter:
+    """
+    Buffers activity rows in-process and writes them with one multi-row INSERT
+    when the buffer reaches `buffer_size` rows or `flush_interval` seconds pass.
+    Writes go through their own connection, never the request's session.
+    """
+    def __init__(self, app, buffer_size=100, flush_interval=2.0, max_buffer=10000):
+        self.app = app
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._rows = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='activity-log-writer', daemon=True)
+        self._thread.start()
+
+    def add(self, row):
+        row = dict(row, created_at=datetime.now(timezone.utc))
+        with self._lock:
+            self._rows.append(row)
+            full = len(self._rows) >= self.buffer_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        Writes everything buffered so far. Returns the number of rows written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            try:
+                with self.app.app_context():
+                    with db.engine.begin() as conn:
+                        conn.execute(db.insert(ActivityLog), rows)
+                return len(rows)
+            except Exception as e:
+                logger.error(f"Failed to flush {len(rows)} activity logs: {str(e)}")
+                with self._lock:
+                    # Keep the rows for the next attempt, but never grow without bound
+                    self._rows = (rows + self._rows)[-self.max_buffer:]
+                return 0
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_activity_log_writer():
+    """
+    Returns this process's buffered writer, starting it on first use
+    """
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                config = current_app.config
+                _writer = ActivityLogWriter(
+                    current_app._get_current_object(),
+                    buffer_size=config.get('ACTIVITY_LOG_BUFFER_SIZE', 100),
+                    flush_interval=config.get('ACTIVITY_LOG_FLUSH_INTERVAL', 2.0)
+                )
+                atexit.register(_writer.stop)
+    return _writer
+
+
+def flush_activity_logs():
     """
-    Logs any action performed by a user
+    Flushes buffered activity logs now (e.g. from gunicorn's worker_exit hook)
     """
-    log = ActivityLog(user_id=user_id, action=action)
+    if _writer is not None:
+        return _writer.flush()
+    return 0
+
+
+def _reset_writer_after_fork():
+    # The writer thread doesn't survive fork(); each worker starts its own on first use
+    global _writer, _writer_lock
+    _writer = None
+    _writer_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_writer_after_fork)
+
+
+@traced('activity_log.write')
+def log_activity(user_id, action, entity_type=None, entity_id=None, verb=None, details=None, atomic=False):
+    """
+    Logs any action performed by a user.
+    entity_type/entity_id/verb/details record what was changed in structured form,
+    e.g. log_activity(user.id, "Created project: X", 'project', 42, 'created').
+    atomic=True adds the row to the current session so it commits (or rolls back)
+    together with the caller's change; the caller is responsible for committing.
+    Otherwise the row goes through ACTIVITY_LOG_MODE: 'buffered' (default,
+    handed to the writer once the session commits, dropped on rollback) or
+    'sync' (inserted now, committed with the request's unit of work).
+    """
+    row = {
+        'user_id': user_id,
+        'action': action[:255],
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'verb': verb,
+        'details': details
+    }
+
+    if atomic:
+        db.session.add(ActivityLog(**row))
+        return
+
+    if current_app.config.get('ACTIVITY_LOG_MODE', 'buffered') == 'buffered':
+        writer = get_activity_log_writer()
+        on_commit(lambda: writer.add(row))
+        return
+
+    log = ActivityLog(**row)
     db.session.add(log)
-    db.session.commit()
\ No newline at end of file
+    db.session.flush()
+
+
+@traced('activity_log.write_many')
+def log_activities(user_id, entries, atomic=False):
+    """
+    Logs many actions by one user with a single multi-row INSERT.
+    entries are dicts with log_activity's fields: action, and optionally
+    entity_type, entity_id, verb, details. atomic/mode behave as in log_activity.
+    """
+    rows = [{
+        'user_id': user_id,
+        'action': entry['action'][:255],
+        'entity_type': entry.get('entity_type'),
+        'entity_id': entry.get('entity_id'),
+        'verb': entry.get('verb'),
+        'details': entry.get('details')
+    } for entry in entries]
+    if not rows:
+        return
+
+    if not atomic and current_app.config.get('ACTIVITY_LOG_MODE', 'buffered') == 'buffered':
+        writer = get_activity_log_writer()
+        on_commit(lambda: [writer.add(row) for row in rows])
+        return
+
+    now = datetime.now(timezone.utc)
+    db.session.execute(db.insert(ActivityLog), [dict(row, created_at=now) for row in rows])
+
+
+def entity_timeline_query(entity_type, entity_id):
+    """
+    Newest-first activity for one entity; served by ix_activity_logs_entity
+    """
+    return ActivityLog.query.filter_by(entity_type=entity_type, entity_id=entity_id).order_by(
+        ActivityLog.created_at.desc(), ActivityLog.id.desc()
+    )
+
+
+def serialize_activity(a):
+    return {
+        'id': a.id,
+        'user_id': a.user_id,
+        'action': a.action,
+        'entity_type': a.entity_type,
+        'entity_id': a.entity_id,
+        'verb': a.verb,
+        'details': a.details,
+        'created_at': a.created_at.strftime('%Y-%m-%d %H:%M:%S')
+    }
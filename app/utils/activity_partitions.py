@@ -0,0 +1,235 @@
+import csv
+import gzip
+import json
+import os
+import logging
+from datetime import date, datetime, time, timezone
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.models import db, ActivityLog
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+PARENT_TABLE = 'activity_logs'
+# Every activity_logs column, in table order
+ARCHIVE_COLUMNS = ['id', 'user_id', 'action', 'entity_type', 'entity_id', 'verb', 'details', 'created_at']
+
+
+def is_partitioned():
+    """
+    True when activity_logs is a partitioned table (PostgreSQL after migration a1386ea02592)
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return False
+    return bool(db.session.execute(db.text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :name"
+    ), {'name': PARENT_TABLE}).scalar())
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def ensure_partitions(months_ahead=3):
+    """
+    Creates monthly partitions from the current month through months_ahead.
+    Scheduled daily (render.yaml cron job) and run on every deploy so rows
+    don't land in the DEFAULT partition; any that already have are moved
+    into the new month's partition. Returns the names of partitions created.
+    """
+    if not is_partitioned():
+        return []
+
+    created = []
+    current = month_start(datetime.now(timezone.utc))
+    for offset in range(months_ahead + 1):
+        start = add_months(current, offset)
+        name = partition_name(start)
+        exists = db.session.execute(db.text("SELECT to_regclass(:name)"), {'name': name}).scalar()
+        if exists:
+            continue
+        _create_partition(name, start, add_months(start, 1))
+        db.session.commit()
+        created.append(name)
+    return created
+
+
+def _create_partition(name, start, end):
+    # PostgreSQL refuses to create a partition while the DEFAULT partition holds
+    # rows for its range, so those rows are set aside and re-inserted through the
+    # parent in the same transaction
+    bounds = {'start': start, 'end': end}
+    in_range = "created_at >= :start AND created_at < :end"
+    db.session.execute(db.text(f"LOCK TABLE {PARENT_TABLE}_default IN EXCLUSIVE MODE"))
+    stranded = db.session.execute(db.text(
+        f"SELECT count(*) FROM {PARENT_TABLE}_default WHERE {in_range}"
+    ), bounds).scalar()
+
+    if stranded:
+        db.session.execute(db.text(
+            f"CREATE TEMP TABLE activity_logs_stranded ON COMMIT DROP AS "
+            f"SELECT * FROM {PARENT_TABLE}_default WHERE {in_range}"
+        ), bounds)
+        db.session.execute(db.text(f"DELETE FROM {PARENT_TABLE}_default WHERE {in_range}"), bounds)
+
+    db.session.execute(db.text(
+        f'CREATE TABLE "{name}" PARTITION OF {PARENT_TABLE} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+
+    if stranded:
+        db.session.execute(db.text(f"INSERT INTO {PARENT_TABLE} SELECT * FROM activity_logs_stranded"))
+        logger.info(f"Moved {stranded} rows from {PARENT_TABLE}_default into {name}")
+
+
+def list_partitions():
+    """
+    Returns [(name, month_start)] for every monthly partition, oldest first
+    """
+    rows = db.session.execute(db.text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :parent"
+    ), {'parent': PARENT_TABLE}).scalars().all()
+
+    partitions = []
+    for name in rows:
+        suffix = name[len(PARENT_TABLE) + 1:]
+        if len(suffix) == 8 and suffix[0] == 'y' and suffix[5] == 'm':
+            partitions.append((name, date(int(suffix[1:5]), int(suffix[6:8]), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def _archive_path(archive_dir, month):
+    os.makedirs(archive_dir, exist_ok=True)
+    return os.path.join(archive_dir, f"{partition_name(month)}.csv.gz")
+
+
+def archive_partitions(retention_months, archive_dir):
+    """
+    Writes every monthly partition entirely older than the retention window to
+    <archive_dir>/<partition>.csv.gz, then detaches and drops it. Export,
+    detach and drop share one transaction, so a failed export leaves the
+    partition in place. Falls back to export-and-delete on an unpartitioned table.
+    Returns a list of (archive_path, row_count).
+    """
+    cutoff = add_months(month_start(datetime.now(timezone.utc)), -retention_months)
+
+    if not is_partitioned():
+        return _archive_plain_table(cutoff, archive_dir)
+
+    archived = []
+    for name, start in list_partitions():
+        if add_months(start, 1) > cutoff:
+            break
+
+        path = _archive_path(archive_dir, start)
+        try:
+            # The session's own connection, so locks it already holds can't block the DETACH
+            cursor = db.session.connection().connection.cursor()
+            # Blocks late writes to the month until it is dropped
+            cursor.execute(f'LOCK TABLE "{name}" IN SHARE MODE')
+            with gzip.open(path, 'wt', newline='') as fh:
+                fh.write(','.join(ARCHIVE_COLUMNS) + '\n')
+                cursor.copy_expert(
+                    f'COPY (SELECT {", ".join(ARCHIVE_COLUMNS)} FROM "{name}" ORDER BY created_at) TO STDOUT WITH CSV',
+                    fh
+                )
+            cursor.execute(f'SELECT count(*) FROM "{name}"')
+            count = cursor.fetchone()[0]
+            cursor.execute(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"')
+            cursor.execute(f'DROP TABLE "{name}"')
+            cursor.close()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        logger.info(f"Archived partition {name} ({count} rows) to {path}")
+        archived.append((path, count))
+    return archived
+
+
+def _archive_plain_table(cutoff, archive_dir):
+    cutoff_at = datetime.combine(cutoff, time.min, tzinfo=timezone.utc)
+    query = (
+        db.select(*(getattr(ActivityLog, column) for column in ARCHIVE_COLUMNS))
+        .where(ActivityLog.created_at < cutoff_at)
+        .order_by(ActivityLog.created_at)
+    )
+
+    archived = []
+    handles = {}
+    counts = {}
+    try:
+        for row in db.session.execute(query.execution_options(yield_per=5000)):
+            month = month_start(row.created_at)
+            if month not in handles:
+                handles[month] = gzip.open(_archive_path(archive_dir, month), 'wt', newline='')
+                handles[month].write(','.join(ARCHIVE_COLUMNS) + '\n')
+                counts[month] = 0
+            csv.writer(handles[month]).writerow([
+                row.id, row.user_id, row.action, row.entity_type, row.entity_id, row.verb,
+                json.dumps(row.details) if row.details is not None else None, row.created_at.isoformat()
+            ])
+            counts[month] += 1
+    finally:
+        for fh in handles.values():
+            fh.close()
+
+    db.session.execute(
+        db.delete(ActivityLog).where(ActivityLog.created_at < cutoff_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    for month in sorted(counts):
+        path = _archive_path(archive_dir, month)
+        logger.info(f"Archived {counts[month]} activity logs to {path}")
+        archived.append((path, counts[month]))
+    return archived
+
+# -----------------------------
+# CLI: flask activity-logs ...
+# -----------------------------
+@click.group('activity-logs')
+def activity_logs_cli():
+    """Maintain activity_logs partitions and retention."""
+
+
+@activity_logs_cli.command('ensure-partitions')
+@click.option('--months-ahead', default=3, show_default=True, help='Future months to pre-create.')
+@with_appcontext
+def ensure_partitions_command(months_ahead):
+    """Pre-create upcoming monthly partitions (PostgreSQL)."""
+    created = ensure_partitions(months_ahead)
+    click.echo(f"Created {len(created)} partition(s): {', '.join(created) or '-'}")
+
+
+@activity_logs_cli.command('archive')
+@click.option('--retention-months', type=int, default=None, help='Defaults to ACTIVITY_LOG_RETENTION_MONTHS.')
+@click.option('--archive-dir', default=None, help='Defaults to ACTIVITY_LOG_ARCHIVE_DIR.')
+@with_appcontext
+def archive_command(retention_months, archive_dir):
+    """Archive months past retention to .csv.gz files and drop them."""
+    retention_months = retention_months or current_app.config.get('ACTIVITY_LOG_RETENTION_MONTHS', 12)
+    archive_dir = archive_dir or current_app.config.get('ACTIVITY_LOG_ARCHIVE_DIR', 'archive/activity_logs')
+    archived = archive_partitions(retention_months, archive_dir)
+    for path, count in archived:
+        click.echo(f"{path}: {count} rows")
+    click.echo(f"Archived {len(archived)} month(s) older than {retention_months} months")
@@ -16,20 +16,25 @@ logger.setLevel(logging.INFO)
 # -----------------------------
 # Generate JWT Access Token
 # -----------------------------
-def generate_jwt(user_id, role, expires_hours=1):
+def generate_jwt(user_id, role, expires_hours=None):
     """
     Generates a JWT access token with user_id and role.
-    Default expiration: 1 hour
+    Default expiration: JWT_ACCESS_TOKEN_MINUTES (15 minutes); use a refresh token to renew
     """
     secret_key = current_app.config.get("SECRET_KEY") or os.environ.get("SECRET_KEY")
     if not secret_key:
         raise RuntimeError("SECRET_KEY not configured in environment or Flask config")
 
+    if expires_hours is None:
+        lifetime = timedelta(minutes=current_app.config.get("JWT_ACCESS_TOKEN_MINUTES", 15))
+    else:
+        lifetime = timedelta(hours=expires_hours)
+
     payload = {
         "user_id": user_id,
         "role": role,
         # Use timezone-aware datetime to avoid DeprecationWarning
-        "exp": datetime.now(timezone.utc) + timedelta(hours=expires_hours)
+        "exp": datetime.now(timezone.utc) + lifetime
     }
     token = jwt.encode(payload, secret_key, algorithm="HS256")
     return token
@@ -81,6 +86,23 @@ def token_required(f):
 
     return decorated
 
+# -----------------------------
+# Resolve the user behind an Authorization header
+# -----------------------------
+def decode_user(auth_header):
+    """
+    Returns the User for a valid 'Bearer <jwt>' header, or None.
+    For code outside a route that can't use token_required.
+    """
+    if not auth_header.startswith("Bearer "):
+        return None
+    try:
+        secret_key = current_app.config.get("SECRET_KEY") or os.environ.get("SECRET_KEY")
+        data = jwt.decode(auth_header.split(" ")[1], secret_key, algorithms=["HS256"])
+    except jwt.InvalidTokenError:
+        return None
+    return db.session.get(User, data.get("user_id"))
+
 # -----------------------------
 # Role verification decorator
 # -----------------------------
@@ -0,0 +1,86 @@
+import logging
+from app.models import db, User
+from app.utils.activity_log import log_activities
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+FILTER_FIELDS = ('role', 'cohort_id', 'class_id')
+
+
+class BulkAssignError(ValueError):
+    """Raised when the request doesn't say which users to move"""
+
+
+def selection_criteria(data):
+    """
+    Builds the WHERE clause for a bulk assignment body: either
+    {"user_ids": [...]} or {"filter": {"role": ..., "cohort_id": ..., "class_id": ...}}.
+    A null cohort_id/class_id in the filter matches unassigned users.
+    """
+    if not isinstance(data, dict):
+        raise BulkAssignError('Request body must be a JSON object')
+
+    if 'user_ids' in data:
+        user_ids = data['user_ids']
+        if not isinstance(user_ids, list) or not user_ids:
+            raise BulkAssignError('user_ids must be a non-empty list')
+        try:
+            return [User.id.in_({int(user_id) for user_id in user_ids})]
+        except (TypeError, ValueError):
+            raise BulkAssignError('user_ids must be integers')
+
+    filters = data.get('filter')
+    if not isinstance(filters, dict) or not filters:
+        raise BulkAssignError('Provide user_ids or a non-empty filter')
+    unknown = set(filters) - set(FILTER_FIELDS)
+    if unknown:
+        raise BulkAssignError(f"Unknown filter field(s): {', '.join(sorted(unknown))}")
+
+    criteria = []
+    for field, value in filters.items():
+        column = getattr(User, field)
+        if value is None:
+            criteria.append(column.is_(None))
+            continue
+        if field == 'role':
+            if not isinstance(value, str):
+                raise BulkAssignError('filter.role must be a string')
+        else:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise BulkAssignError(f'filter.{field} must be an integer or null')
+        criteria.append(column == value)
+    return criteria
+
+
+def assign_users(field, target_id, criteria, actor_id, verb, target_name):
+    """
+    Sets User.<field> = target_id for every selected user with one
+    UPDATE ... RETURNING, then logs the moves with one batched activity write.
+    Users already in the target are left alone. Does not commit.
+    Returns the ids of the users that moved.
+    """
+    column = getattr(User, field)
+    moved = db.session.execute(
+        db.update(User)
+        .where(*criteria, User.deleted_at.is_(None))
+        .where(db.or_(column.is_(None), column != target_id))
+        .values({field: target_id})
+        .returning(User.id)
+    ).scalars().all()
+
+    log_activities(actor_id, [{
+        'action': f"Assigned user {user_id} to {target_name}",
+        'entity_type': 'user',
+        'entity_id': user_id,
+        'verb': verb,
+        'details': {field: target_id, 'bulk': True}
+    } for user_id in moved])
+
+    logger.info(f"Moved {len(moved)} users to {target_name}")
+    return moved
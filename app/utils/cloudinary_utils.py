@@ -1,6 +1,8 @@
-import cloudinary
-import cloudinary.uploader
 from flask import current_app, has_app_context
+from app.utils.tracing import traced, record_exception, current_traceparent
+
+# The cloudinary SDK is imported inside the functions so workers that never
+# upload images don't pay for it at boot
 
 def configure_cloudinary(app=None):
     """
@@ -12,12 +14,14 @@ def configure_cloudinary(app=None):
     if not config_source:
         raise RuntimeError("No Flask app context or app provided to configure Cloudinary.")
 
+    import cloudinary
     cloudinary.config(
         cloud_name=config_source.get('CLOUDINARY_CLOUD_NAME'),
         api_key=config_source.get('CLOUDINARY_API_KEY'),
         api_secret=config_source.get('CLOUDINARY_API_SECRET')
     )
 
+@traced('cloudinary.upload_image', 'client', **{'peer.service': 'cloudinary'})
 def upload_image(file, folder="project_covers"):
     """
     Upload an image to Cloudinary and return the secure URL.
@@ -25,18 +29,25 @@ def upload_image(file, folder="project_covers"):
     Returns None on failure.
     """
     try:
+        import cloudinary
+        import cloudinary.uploader
+
         # Ensure Cloudinary is configured
         if not cloudinary.config().cloud_name:
             configure_cloudinary()
 
+        # Continue the request's trace on Cloudinary's side
+        traceparent = current_traceparent()
         result = cloudinary.uploader.upload(
             file,
             folder=folder,
             overwrite=True,
-            resource_type="image"
+            resource_type="image",
+            extra_headers={'traceparent': traceparent} if traceparent else None
         )
         return result.get('secure_url')
     except Exception as e:
+        record_exception(e)
         # Log the error (replace print with your logger if needed)
         print(f"[Cloudinary] Upload failed: {e}")
         return None
\ No newline at end of file
@@ -0,0 +1,79 @@
+import os
+import weakref
+import logging
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Engines to reset in forked children (gunicorn workers with preload_app)
+_engines = weakref.WeakSet()
+
+
+def _is_postgres(uri):
+    return uri.startswith(('postgresql', 'postgres://'))
+
+
+def build_engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS from the DB_* settings. With DB_PGBOUNCER the
+    app keeps no pool of its own (PgBouncer does the pooling) and sends no
+    startup parameters, which PgBouncer rejects in transaction mode.
+    """
+    uri = config.get('SQLALCHEMY_DATABASE_URI') or ''
+    statement_timeout = config.get('DB_STATEMENT_TIMEOUT_MS', 0)
+
+    if config.get('DB_PGBOUNCER'):
+        # statement_timeout is applied per transaction instead, see init_engine()
+        return {'poolclass': NullPool}
+
+    options = {
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+    }
+    if not uri.startswith('sqlite:///:memory:') and uri != 'sqlite://':
+        options.update(
+            pool_size=config.get('DB_POOL_SIZE', 5),
+            max_overflow=config.get('DB_MAX_OVERFLOW', 10),
+            pool_timeout=config.get('DB_POOL_TIMEOUT', 30),
+        )
+    if statement_timeout and _is_postgres(uri):
+        options['connect_args'] = {'options': f'-c statement_timeout={int(statement_timeout)}'}
+    return options
+
+
+def init_engine(app, db):
+    """
+    Registers the app's engines for disposal after fork and, in PgBouncer
+    mode, sets statement_timeout at the start of every transaction.
+    Call after db.init_app(app).
+    """
+    statement_timeout = app.config.get('DB_STATEMENT_TIMEOUT_MS', 0)
+    with app.app_context():
+        for engine in db.engines.values():
+            _engines.add(engine)
+            if app.config.get('DB_PGBOUNCER') and statement_timeout and engine.dialect.name == 'postgresql':
+                _set_local_statement_timeout(engine, int(statement_timeout))
+
+
+def _set_local_statement_timeout(engine, statement_timeout):
+    # SET LOCAL lasts for the transaction only, so it never leaks onto
+    # a server connection PgBouncer hands to another client
+    @event.listens_for(engine, 'begin')
+    def set_statement_timeout(conn):
+        conn.exec_driver_sql(f'SET LOCAL statement_timeout = {statement_timeout}')
+
+
+def _dispose_engines_after_fork():
+    # Connections opened in the parent (e.g. during preload) must not be
+    # shared with workers; close=False leaves them open for the parent
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_engines_after_fork)
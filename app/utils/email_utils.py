@@ -1,10 +1,30 @@
 import os
-import sendgrid
-from sendgrid.helpers.mail import Mail, Email, To, Content
 import logging
+from functools import partial
+from app.utils.tracing import traced, current_traceparent
+from app.utils.unit_of_work import on_commit
 
 logger = logging.getLogger(__name__)
 
+def _sendgrid():
+    """
+    Imports the SendGrid SDK on first send rather than at worker boot
+    """
+    import sendgrid
+    from sendgrid.helpers.mail import Mail, Email, To, Content
+    return sendgrid, Mail, Email, To, Content
+
+def _sendgrid_client(sendgrid, api_key):
+    """
+    SendGrid client whose API calls carry the current span's traceparent
+    """
+    sg = sendgrid.SendGridAPIClient(api_key=api_key)
+    traceparent = current_traceparent()
+    if traceparent:
+        sg.client.request_headers['traceparent'] = traceparent
+    return sg
+
+@traced('email.send_verification', 'client', **{'peer.service': 'sendgrid'})
 def send_verification_email(to_email, token, user_name=None):
     """
     Sends a verification email with a clickable link
@@ -19,7 +39,8 @@ def send_verification_email(to_email, token, user_name=None):
             logger.error(f"Invalid SendGrid API key format (length: {len(api_key)})")
             raise ValueError("SendGrid API key appears to be invalid. Valid keys start with 'SG.' and are 69+ characters long")
 
-        sg = sendgrid.SendGridAPIClient(api_key=api_key)
+        sendgrid, Mail, Email, To, Content = _sendgrid()
+        sg = _sendgrid_client(sendgrid, api_key)
         # Use configured sender email from environment
         sender_email = os.environ.get('SENDGRID_SENDER_EMAIL', 'no-reply@projectx.com')
         from_email = Email(sender_email)
@@ -47,6 +68,7 @@ def send_verification_email(to_email, token, user_name=None):
         logger.error(f"Failed to send verification email to {to_email}: {str(e)}")
         raise
 
+@traced('email.send_invitation', 'client', **{'peer.service': 'sendgrid'})
 def send_invitation_email(to_email, project_name, inviter_name=None, project_id=None, user_id=None):
     """
     Sends a project invitation email notifying user to log in
@@ -61,7 +83,8 @@ def send_invitation_email(to_email, project_name, inviter_name=None, project_id=
             logger.error(f"Invalid SendGrid API key format (length: {len(api_key)})")
             raise ValueError("SendGrid API key appears to be invalid. Valid keys start with 'SG.' and are 69+ characters long")
 
-        sg = sendgrid.SendGridAPIClient(api_key=api_key)
+        sendgrid, Mail, Email, To, Content = _sendgrid()
+        sg = _sendgrid_client(sendgrid, api_key)
         # Use configured sender email from environment
         sender_email = os.environ.get('SENDGRID_SENDER_EMAIL', 'no-reply@projectx.com')
         frontend_url = os.environ.get('FRONTEND_URL', 'http://127.0.0.1:5173')
@@ -121,6 +144,21 @@ def send_invitation_email(to_email, project_name, inviter_name=None, project_id=
         logger.error(f"Failed to send invitation email to {to_email} for project '{project_name}': {str(e)}")
         raise
 
+def _send_invitation_email_logged(to_email, project_name, inviter_name, project_id, user_id):
+    try:
+        send_invitation_email(to_email, project_name, inviter_name, project_id, user_id)
+    except Exception as e:
+        logger.warning(f"Failed to send invitation email to {to_email}: {str(e)}")
+
+def queue_invitation_email(to_email, project_name, inviter_name=None, project_id=None, user_id=None):
+    """
+    Sends the invitation email once the current transaction commits, so nobody
+    is emailed about an invitation that was rolled back. A failed send is
+    logged; the invitation stands.
+    """
+    on_commit(partial(_send_invitation_email_logged, to_email, project_name, inviter_name, project_id, user_id))
+
+@traced('email.send_2fa_code', 'client', **{'peer.service': 'sendgrid'})
 def send_2fa_code_email(to_email, code, user_name=None):
     """
     Sends a 2FA verification code email
@@ -135,7 +173,8 @@ def send_2fa_code_email(to_email, code, user_name=None):
             logger.error(f"Invalid SendGrid API key format (length: {len(api_key)})")
             raise ValueError("SendGrid API key appears to be invalid. Valid keys start with 'SG.' and are 69+ characters long")
 
-        sg = sendgrid.SendGridAPIClient(api_key=api_key)
+        sendgrid, Mail, Email, To, Content = _sendgrid()
+        sg = _sendgrid_client(sendgrid, api_key)
         sender_email = os.environ.get('SENDGRID_SENDER_EMAIL', 'no-reply@projectx.com')
         from_email = Email(sender_email)
         subject = "Your 2FA Verification Code"
@@ -0,0 +1,135 @@
+import hmac
+import os
+import time
+import logging
+from flask import Response, g, request, has_request_context, current_app
+from app.utils.sql_timing import subscribe_to_statements
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+_metrics = None
+
+
+def _create_metrics():
+    # prometheus_client picks file-backed values when PROMETHEUS_MULTIPROC_DIR is
+    # set (gunicorn.conf.py does it), so /metrics aggregates every worker
+    from prometheus_client import Counter, Histogram
+
+    return {
+        'requests': Counter(
+            'http_requests_total', 'HTTP requests', ['method', 'endpoint', 'status']
+        ),
+        'latency': Histogram(
+            'http_request_duration_seconds', 'HTTP request latency', ['method', 'endpoint'],
+            buckets=LATENCY_BUCKETS
+        ),
+        'response_size': Histogram(
+            'http_response_size_bytes', 'HTTP response body size', ['method', 'endpoint'],
+            buckets=SIZE_BUCKETS
+        ),
+        'request_statements': Histogram(
+            'http_request_sql_statements', 'SQL statements executed per request', ['endpoint'],
+            buckets=SQL_COUNT_BUCKETS
+        ),
+        'statements': Counter(
+            'db_statements_total', 'SQL statements executed', ['endpoint']
+        ),
+        'statement_latency': Histogram(
+            'db_statement_duration_seconds', 'SQL statement latency', ['endpoint'],
+            buckets=SQL_LATENCY_BUCKETS
+        ),
+    }
+
+
+def _endpoint():
+    # Endpoint names, not URLs, keep label cardinality bounded
+    if has_request_context():
+        return request.endpoint or 'unmatched'
+    return 'none'
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany, start, elapsed, error):
+    endpoint = _endpoint()
+    _metrics['statements'].labels(endpoint).inc()
+    _metrics['statement_latency'].labels(endpoint).observe(elapsed)
+    if has_request_context():
+        g.metrics_sql_count = g.get('metrics_sql_count', 0) + 1
+
+
+def init_metrics(app, db):
+    """
+    Records per-endpoint request counts, latency, response size and SQL
+    statement counts/latency, and serves them at /metrics in Prometheus text
+    format. Needs prometheus_client; without it metrics are disabled.
+    """
+    global _metrics
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    try:
+        if _metrics is None:
+            _metrics = _create_metrics()
+    except ImportError:
+        logger.warning("prometheus_client is not installed; /metrics disabled")
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            subscribe_to_statements(engine, _record_statement)
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_sql_count = 0
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop('metrics_start', None)
+        if start is None or request.endpoint == 'metrics':
+            return response
+        endpoint = _endpoint()
+        method = request.method
+        _metrics['requests'].labels(method, endpoint, str(response.status_code)).inc()
+        _metrics['latency'].labels(method, endpoint).observe(time.perf_counter() - start)
+        size = response.calculate_content_length()
+        if size is not None:
+            _metrics['response_size'].labels(method, endpoint).observe(size)
+        _metrics['request_statements'].labels(endpoint).observe(g.get('metrics_sql_count', 0))
+        return response
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+
+
+def metrics_view():
+    """
+    Prometheus scrape endpoint, behind 'Authorization: Bearer <METRICS_TOKEN>'.
+    Without a token configured it is only served in debug/testing or with
+    METRICS_PUBLIC, so a production deploy never exposes it by accident.
+    """
+    from prometheus_client import CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST, REGISTRY
+    from prometheus_client import multiprocess
+
+    config = current_app.config
+    token = config.get('METRICS_TOKEN')
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    elif not (config.get('METRICS_PUBLIC', False) or current_app.debug or current_app.testing):
+        return Response('Set METRICS_TOKEN to enable /metrics\n', status=403, mimetype='text/plain')
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Multiprocess mode: merge the value files written by every worker
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
@@ -1,13 +1,55 @@
+from flask import jsonify
+from sqlalchemy import func, select
+
+
+class PaginationError(ValueError):
+    """Raised when ?page or ?per_page is not an integer"""
+
+
+def _page_args(request):
+    try:
+        return int(request.args.get('page', 1)), int(request.args.get('per_page', 10))
+    except ValueError:
+        raise PaginationError('page and per_page must be integers') from None
+
+
+def init_pagination(app):
+    """
+    Answers a PaginationError raised anywhere in a request with a 400
+    """
+    app.register_error_handler(PaginationError, lambda e: (jsonify({'message': str(e)}), 400))
+
+
 def paginate(query, request):
     """
     Simple pagination helper
     """
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
+    page, per_page = _page_args(request)
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     return {
         'items': pagination.items,
         'page': pagination.page,
         'total_pages': pagination.pages,
         'total_items': pagination.total
-    }
\ No newline at end of file
+    }
+
+
+def paginate_select(session, stmt, request, max_per_page=100):
+    """
+    Pagination for column-projected select() statements.
+    Items are Row objects, so no ORM entities are materialized.
+    """
+    page, per_page = _page_args(request)
+    page = max(page, 1)
+    per_page = min(max(per_page, 1), max_per_page)
+
+    total = session.execute(
+        select(func.count()).select_from(stmt.order_by(None).subquery())
+    ).scalar()
+    items = session.execute(stmt.limit(per_page).offset((page - 1) * per_page)).all()
+    return {
+        'items': items,
+        'page': page,
+        'total_pages': -(-total // per_page),
+        'total_items': total
+    }
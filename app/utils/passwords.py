@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_SCRYPT_N = 32768
+DEFAULT_PBKDF2_ITERATIONS = 600000
+
+# Caps concurrent verifications in this worker: (size, BoundedSemaphore)
+_verify_slots = None
+_verify_slots_lock = threading.Lock()
+# Process pool for bulk hashing, started on first use and kept for the life of the worker
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+_hash_seconds = {}
+
+
+def _config():
+    return current_app.config if has_app_context() else {}
+
+
+def get_password_hash_method(config=None):
+    """
+    Builds the full Werkzeug method string (e.g. 'scrypt:32768:8:1',
+    'pbkdf2:sha256:600000') from PASSWORD_HASH_ALGORITHM / PASSWORD_HASH_ITERATIONS
+    """
+    config = _config() if config is None else config
+    algorithm = config.get('PASSWORD_HASH_ALGORITHM') or 'scrypt'
+    iterations = config.get('PASSWORD_HASH_ITERATIONS')
+
+    if algorithm == 'scrypt':
+        n = iterations or DEFAULT_SCRYPT_N
+        # scrypt's cost factor N must be a power of two > 1
+        if n < 2 or n & (n - 1):
+            raise ValueError(f"PASSWORD_HASH_ITERATIONS must be a power of two for scrypt, got {n}")
+        return f"scrypt:{n}:8:1"
+    if algorithm.startswith('pbkdf2'):
+        hash_name = algorithm.split(':')[1] if ':' in algorithm else 'sha256'
+        return f"pbkdf2:{hash_name}:{iterations or DEFAULT_PBKDF2_ITERATIONS}"
+    raise ValueError(f"Unsupported PASSWORD_HASH_ALGORITHM: {algorithm}")
+
+
+def hash_password(password, method=None):
+    """
+    Hashes a password with the configured policy
+    """
+    salt_length = _config().get('PASSWORD_SALT_LENGTH', 16)
+    return generate_password_hash(password, method=method or get_password_hash_method(), salt_length=salt_length)
+
+
+def _hash_one(password, method, salt_length):
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+def hash_passwords(passwords, workers=0):
+    """
+    Hashes many passwords with the configured policy, preserving order.
+    With workers > 1 the hashes are computed in this process's hashing pool,
+    since each one is pure CPU and a bulk import would otherwise hash serially.
+    """
+    passwords = list(passwords)
+    method = get_password_hash_method()
+    salt_length = _config().get('PASSWORD_SALT_LENGTH', 16)
+    workers = min(workers or 0, os.cpu_count() or 1)
+    # Handing work to the pool costs more than a handful of hashes
+    if workers <= 1 or len(passwords) < workers * 4:
+        return [_hash_one(p, method, salt_length) for p in passwords]
+
+    chunksize = max(len(passwords) // (workers * 4), 1)
+    try:
+        return list(_get_hash_pool(workers).map(
+            _hash_one, passwords, repeat(method), repeat(salt_length), chunksize=chunksize
+        ))
+    except BrokenProcessPool:
+        # A pool process died (e.g. OOM-killed); start a fresh pool next time
+        _discard_hash_pool()
+        return [_hash_one(p, method, salt_length) for p in passwords]
+
+
+def password_hash_seconds():
+    """
+    Seconds one hash takes with the configured policy, measured once per process
+    """
+    method = get_password_hash_method()
+    if method not in _hash_seconds:
+        start = time.perf_counter()
+        _hash_one('password-hash-timing', method, _config().get('PASSWORD_SALT_LENGTH', 16))
+        _hash_seconds[method] = time.perf_counter() - start
+    return _hash_seconds[method]
+
+
+def _get_hash_pool(workers):
+    global _hash_pool
+    if _hash_pool is None:
+        with _hash_pool_lock:
+            if _hash_pool is None:
+                # spawn, not fork: forking a threaded server process can deadlock on locks held by other threads
+                _hash_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return _hash_pool
+
+
+def _discard_hash_pool():
+    global _hash_pool
+    with _hash_pool_lock:
+        pool, _hash_pool = _hash_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def needs_rehash(password_hash):
+    """
+    True when a stored hash was made with a different algorithm or cost than configured
+    """
+    return password_hash.split('$', 1)[0] != get_password_hash_method()
+
+
+def _get_verify_slots(size):
+    global _verify_slots
+    if _verify_slots is None or _verify_slots[0] != size:
+        with _verify_slots_lock:
+            if _verify_slots is None or _verify_slots[0] != size:
+                _verify_slots = (size, threading.BoundedSemaphore(size))
+    return _verify_slots[1]
+
+
+def _reset_pool_after_fork():
+    # Pool processes belong to the parent, and a semaphore could be inherited
+    # mid-acquire; each gunicorn worker builds its own
+    global _hash_pool, _hash_pool_lock, _verify_slots, _verify_slots_lock
+    _hash_pool = None
+    _hash_pool_lock = threading.Lock()
+    _verify_slots = None
+    _verify_slots_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
+def verify_password(password_hash, password):
+    """
+    Checks a password against its hash. With PASSWORD_VERIFY_THREADS > 0 at
+    most that many checks run at once in this worker; the rest wait their
+    turn, which caps the CPU and scrypt memory a threaded worker spends on logins.
+    """
+    limit = _config().get('PASSWORD_VERIFY_THREADS', 0)
+    if not limit:
+        return check_password_hash(password_hash, password)
+    with _get_verify_slots(limit):
+        return check_password_hash(password_hash, password)
@@ -0,0 +1,224 @@
+import cProfile
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+import logging
+from datetime import datetime, timezone
+from flask import g, request, jsonify, current_app, has_request_context
+from app.utils.sql_timing import subscribe_to_statements
+from app.utils.auth import decode_user
+from app.utils.slow_queries import parameter_shape
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ARG = '_profile'
+PROFILE_ID_PATTERN = re.compile(r'^[0-9TZ]+-[0-9a-f]{8}$')
+
+# Requests being profiled right now in this process; the SQL subscriber returns
+# straight away while it is zero, so unprofiled requests pay one int compare
+_active = 0
+_active_lock = threading.Lock()
+
+
+def _profile_requested():
+    return PROFILE_HEADER in request.headers or PROFILE_ARG in request.args
+
+
+def _requested_mode():
+    return (request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_ARG) or '').lower()
+
+
+def _is_admin():
+    # Same checks as token_required + role_required(['Admin']); a request
+    # from anyone else is served normally, unprofiled
+    user = decode_user(request.headers.get('Authorization', ''))
+    return user is not None and user.role == 'Admin'
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany, start, elapsed, error):
+    if not _active:
+        return
+    profile = g.get('profile') if has_request_context() else None
+    if profile is None:
+        return
+    entry = {
+        'start_ms': round((start - profile['start']) * 1000, 3),
+        'duration_ms': round(elapsed * 1000, 3),
+        'statement': statement,
+        'parameters': parameter_shape(parameters[0] if executemany and parameters else parameters),
+        'executemany': executemany,
+    }
+    if error is not None:
+        entry['error'] = str(error)
+    profile['sql'].append(entry)
+
+
+def _function_stats(profiler, top):
+    stats = pstats.Stats(profiler)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+    rows = []
+    for func in stats.fcn_list[:top]:
+        primitive_calls, calls, total, cumulative, _ = stats.stats[func]
+        filename, line, name = func
+        rows.append({
+            'function': f'{filename}:{line}({name})',
+            'calls': calls,
+            'primitive_calls': primitive_calls,
+            'total_ms': round(total * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3),
+        })
+    return rows
+
+
+def _store(directory, profile_id, profiler, summary, keep):
+    os.makedirs(directory, exist_ok=True)
+    # .prof is a regular pstats dump (snakeviz, `python -m pstats`)
+    profiler.dump_stats(os.path.join(directory, f'{profile_id}.prof'))
+    with open(os.path.join(directory, f'{profile_id}.json'), 'w') as fh:
+        json.dump(summary, fh, default=str)
+
+    # Ids sort by time, so the oldest go first
+    ids = sorted(name[:-5] for name in os.listdir(directory) if name.endswith('.json'))
+    for old_id in ids[:max(len(ids) - keep, 0)]:
+        for suffix in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(directory, old_id + suffix))
+            except OSError:
+                pass
+
+
+def init_profiling(app, db):
+    """
+    Lets admins profile a single request by sending an X-Profile header or a
+    ?_profile query flag. The request runs under cProfile and records its SQL
+    timeline; the result is stored under PROFILE_DIR and its id returned in
+    the X-Profile-Id header (fetch it from /admin/profiles/<id>). With the
+    value 'inline' the profile is returned instead of the response.
+    """
+    if not app.config.get('PROFILING_ENABLED', True):
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            subscribe_to_statements(engine, _record_statement)
+
+    @app.before_request
+    def start_profile():
+        global _active
+        if not _profile_requested() or not _is_admin():
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already running on this thread
+            logger.warning("Profiling skipped for %s: a profiler is already active", request.path)
+            return
+        g.profile = {'profiler': profiler, 'start': time.perf_counter(), 'sql': []}
+        with _active_lock:
+            _active += 1
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        return _finish(profile, response)
+
+    @app.teardown_request
+    def abandon_profile(exc):
+        # after_request doesn't run when the handler raises
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile['profiler'].disable()
+            _deactivate()
+
+
+def _deactivate():
+    global _active
+    with _active_lock:
+        _active -= 1
+
+
+def _finish(profile, response):
+    profiler = profile['profiler']
+    profiler.disable()
+    duration = time.perf_counter() - profile['start']
+    _deactivate()
+
+    config = current_app.config
+    profile_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%fZ}-{uuid.uuid4().hex[:8]}"
+    sql = profile['sql']
+    summary = {
+        'id': profile_id,
+        'at': datetime.now(timezone.utc).isoformat(),
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 3),
+        'sql': {
+            'count': len(sql),
+            'total_ms': round(sum(q['duration_ms'] for q in sql), 3),
+            'timeline': sql,
+        },
+        'functions': _function_stats(profiler, config.get('PROFILE_TOP_FUNCTIONS', 40)),
+    }
+
+    try:
+        _store(config.get('PROFILE_DIR'), profile_id, profiler, summary, config.get('PROFILE_KEEP', 50))
+    except OSError as e:
+        logger.error(f"Could not store profile {profile_id}: {str(e)}")
+        profile_id = None
+
+    if _requested_mode() == 'inline':
+        return jsonify(summary)
+    if profile_id:
+        response.headers['X-Profile-Id'] = profile_id
+    return response
+
+
+def list_profiles(directory, limit=50):
+    """
+    Stored profile summaries without their timelines, newest first
+    """
+    if not directory or not os.path.isdir(directory):
+        return []
+    ids = sorted((name[:-5] for name in os.listdir(directory) if name.endswith('.json')), reverse=True)
+    profiles = []
+    for profile_id in ids[:limit]:
+        summary = load_profile(directory, profile_id)
+        if summary is None:
+            continue
+        profiles.append({
+            key: summary.get(key) for key in ('id', 'at', 'method', 'path', 'endpoint', 'status', 'duration_ms')
+        } | {'sql_count': summary.get('sql', {}).get('count')})
+    return profiles
+
+
+def profile_path(directory, profile_id, suffix):
+    # Ids come from the URL, so only accept the shape we generate
+    if not directory or not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = os.path.join(directory, profile_id + suffix)
+    return path if os.path.exists(path) else None
+
+
+def load_profile(directory, profile_id):
+    path = profile_path(directory, profile_id, '.json')
+    if path is None:
+        return None
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,215 @@
+import math
+import threading
+import time
+import logging
+from collections import OrderedDict
+from functools import wraps
+from flask import request, jsonify, current_app
+from sqlalchemy.exc import IntegrityError
+from app.models import db, RateLimitBucket
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600}
+
+
+def parse_limit(limit):
+    """
+    '10/minute' -> (capacity=10, refill_per_second=10/60)
+    """
+    count, _, period = limit.partition('/')
+    capacity = int(count)
+    seconds = PERIODS[period.strip().rstrip('s')]
+    return capacity, capacity / seconds
+
+
+def _refill(tokens, updated_at, now, capacity, rate):
+    if tokens is None:
+        return float(capacity)
+    return min(float(capacity), tokens + max(0.0, now - updated_at) * rate)
+
+
+def _retry_after(tokens, rate):
+    return max(1, math.ceil((1 - tokens) / rate))
+
+# -----------------------------
+# In-memory buckets (single process / tests)
+# -----------------------------
+class MemoryBucketStore:
+    """
+    Buckets are kept least recently used first. A bucket that has refilled to
+    capacity behaves exactly like a missing one, so full buckets are swept out
+    every sweep_interval_seconds; past max_buckets the least recently used
+    bucket is dropped, so keys sent by a client can't grow memory without bound.
+    """
+    def __init__(self, sweep_interval_seconds=60, max_buckets=10000):
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at, capacity, rate)
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+
+    def take(self, key, capacity, rate):
+        """
+        Takes one token. Returns (allowed, retry_after_seconds).
+        """
+        now = time.time()
+        with self._lock:
+            self._maybe_sweep(now)
+            tokens, updated_at = self._buckets.get(key, (None, now))[:2]
+            tokens = _refill(tokens, updated_at, now, capacity, rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, capacity, rate)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+            return (True, 0) if allowed else (False, _retry_after(tokens, rate))
+
+    def _maybe_sweep(self, now):
+        if now - self._last_sweep < self.sweep_interval_seconds:
+            return
+        self._last_sweep = now
+        for key, (tokens, updated_at, capacity, rate) in list(self._buckets.items()):
+            if _refill(tokens, updated_at, now, capacity, rate) >= capacity:
+                del self._buckets[key]
+
+# -----------------------------
+# Database buckets (default, shared across workers)
+# -----------------------------
+class DatabaseBucketStore:
+    """
+    Buckets live in rate_limit_buckets and are updated on a dedicated connection,
+    so limiter bookkeeping never commits or rolls back the request's session.
+    """
+    def __init__(self, sweep_interval_seconds=600, max_idle_seconds=3600):
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.max_idle_seconds = max_idle_seconds
+        self._last_sweep = time.monotonic()
+
+    def take(self, key, capacity, rate):
+        self._maybe_sweep()
+        for attempt in range(2):
+            try:
+                return self._take(key, capacity, rate)
+            except IntegrityError:
+                # Another worker created the bucket first; retry against its row
+                if attempt:
+                    raise
+
+    def _take(self, key, capacity, rate):
+        table = RateLimitBucket.__table__
+        now = time.time()
+        with db.engine.begin() as conn:
+            row = conn.execute(
+                db.select(table.c.tokens, table.c.updated_at)
+                .where(table.c.key == key)
+                .with_for_update()
+            ).first()
+
+            tokens = _refill(row.tokens if row else None, row.updated_at if row else now, now, capacity, rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+
+            if row is None:
+                conn.execute(db.insert(table).values(key=key, tokens=tokens, updated_at=now))
+            else:
+                conn.execute(db.update(table).where(table.c.key == key).values(tokens=tokens, updated_at=now))
+
+        return (True, 0) if allowed else (False, _retry_after(tokens, rate))
+
+    def _maybe_sweep(self):
+        # A bucket idle longer than any refill period is full again, so its row can go
+        if time.monotonic() - self._last_sweep < self.sweep_interval_seconds:
+            return
+        self._last_sweep = time.monotonic()
+        try:
+            table = RateLimitBucket.__table__
+            with db.engine.begin() as conn:
+                conn.execute(db.delete(table).where(table.c.updated_at < time.time() - self.max_idle_seconds))
+        except Exception as e:
+            logger.warning(f"Rate limit bucket sweep failed: {str(e)}")
+
+
+def get_bucket_store(app=None):
+    """
+    Returns the configured bucket store for the app, creating it on first use
+    """
+    app = app or current_app._get_current_object()
+    store = app.extensions.get('rate_limit_store')
+    if store is None:
+        backend = app.config.get('RATE_LIMIT_STORAGE', 'database')
+        if backend == 'memory':
+            store = MemoryBucketStore()
+        elif backend == 'database':
+            store = DatabaseBucketStore()
+        else:
+            raise RuntimeError(f"Unknown RATE_LIMIT_STORAGE backend: {backend}")
+        app.extensions['rate_limit_store'] = store
+    return store
+
+
+def get_client_ip():
+    """
+    Client IP. With RATE_LIMIT_TRUST_PROXY (set on Render) this is the last
+    X-Forwarded-For entry, the one our proxy appended; earlier entries come
+    from the client and can be forged.
+    """
+    if current_app.config.get('RATE_LIMIT_TRUST_PROXY', False):
+        forwarded = request.headers.get('X-Forwarded-For', '')
+        hops = [hop.strip() for hop in forwarded.split(',') if hop.strip()]
+        if hops:
+            return hops[-1]
+    return request.remote_addr or 'unknown'
+
+# -----------------------------
+# Rate limit decorator
+# -----------------------------
+def rate_limit(route_name, account_field=None):
+    """
+    Decorator applying the RATE_LIMITS[route_name] buckets by client IP and,
+    if account_field is given, by that JSON body field (e.g. email, user_id).
+    Rejects with 429 + Retry-After before the view runs.
+    Example: @rate_limit('login', account_field='email')
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('RATE_LIMIT_ENABLED', True):
+                return f(*args, **kwargs)
+
+            limits = current_app.config.get('RATE_LIMITS', {}).get(route_name, {})
+            keys = []
+            if limits.get('ip'):
+                keys.append((f"{route_name}:ip:{get_client_ip()}", limits['ip']))
+            if account_field and limits.get('account'):
+                data = request.get_json(silent=True) or {}
+                account = str(data.get(account_field) or '').strip().lower()
+                if account:
+                    keys.append((f"{route_name}:account:{account}", limits['account']))
+
+            store = get_bucket_store()
+            for key, limit in keys:
+                capacity, rate = parse_limit(limit)
+                try:
+                    allowed, retry_after = store.take(key, capacity, rate)
+                except Exception as e:
+                    # Fail open: a limiter outage must not lock everyone out
+                    logger.error(f"Rate limiter unavailable for {key}: {str(e)}")
+                    continue
+                if not allowed:
+                    logger.warning(f"Rate limit exceeded for {key}")
+                    response = jsonify({'message': 'Too many attempts. Please try again later.'})
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(retry_after)
+                    return response
+
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
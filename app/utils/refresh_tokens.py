@@ -0,0 +1,115 @@
+import hashlib
+import secrets
+import logging
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from app.models import db, RefreshToken
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token is unknown, expired, revoked or reused"""
+
+
+def hash_refresh_token(token):
+    """
+    SHA-256 of the raw token; tokens are random so no salt/stretching is needed
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_refresh_token(user_id, family_id=None):
+    """
+    Creates a refresh token for the user and returns the raw value.
+    Only its hash is stored. Pass family_id when rotating an existing token.
+    Does not commit.
+    """
+    now = datetime.now(timezone.utc)
+    token = secrets.token_urlsafe(48)
+
+    # Housekeeping on the indexed user_id: drop this user's dead tokens
+    db.session.execute(
+        db.delete(RefreshToken).where(
+            RefreshToken.user_id == user_id,
+            RefreshToken.expires_at <= now
+        )
+    )
+    db.session.add(RefreshToken(
+        user_id=user_id,
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or secrets.token_hex(16),
+        expires_at=now + timedelta(days=current_app.config.get('REFRESH_TOKEN_DAYS', 14))
+    ))
+    return token
+
+
+def rotate_refresh_token(token):
+    """
+    Consumes a refresh token and issues its replacement in the same family.
+    Returns (user_id, new_token). Presenting an already-rotated token revokes
+    the whole family, since it means the token was copied.
+    """
+    now = datetime.now(timezone.utc)
+    token_hash = hash_refresh_token(token)
+
+    # Single conditional UPDATE so two concurrent refreshes can't both win
+    result = db.session.execute(
+        db.update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now
+        )
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+    stored = db.session.execute(
+        db.select(RefreshToken.user_id, RefreshToken.family_id, RefreshToken.revoked_at)
+        .where(RefreshToken.token_hash == token_hash)
+    ).first()
+
+    if not result.rowcount:
+        if stored and stored.revoked_at is not None:
+            # Committed here, not by the unit of work: the request ends in a 401,
+            # which rolls back, but the revocation must stick
+            revoke_token_family(stored.family_id)
+            db.session.commit()
+            logger.warning(f"Refresh token reuse detected for user {stored.user_id}; family revoked")
+        else:
+            db.session.rollback()
+        raise RefreshTokenError('Invalid or expired refresh token')
+
+    new_token = issue_refresh_token(stored.user_id, family_id=stored.family_id)
+    db.session.flush()
+    return stored.user_id, new_token
+
+
+def revoke_token_family(family_id):
+    """
+    Revokes every live token issued from one login. Does not commit.
+    """
+    db.session.execute(
+        db.update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def revoke_refresh_token(token):
+    """
+    Revokes the token's family (logout). Returns False if the token is unknown.
+    """
+    family_id = db.session.execute(
+        db.select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_refresh_token(token))
+    ).scalar()
+    if not family_id:
+        return False
+    revoke_token_family(family_id)
+    return True
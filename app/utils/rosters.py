@@ -0,0 +1,55 @@
+from app.models import db, User
+from app.utils.pagination import paginate_select
+
+ROSTER_SORT_FIELDS = ('name', 'email', 'id', 'created_at')
+
+
+class RosterSortError(ValueError):
+    """Raised for an unknown ?sort= field"""
+
+
+def roster_page(field, value, request):
+    """
+    One page of the users whose <field> (cohort_id or class_id) equals value,
+    served by the ix_users_<field> index. ?sort=name|email|id|created_at,
+    prefixed with '-' for descending. Returns the paginate_select() dict with
+    serialized items.
+    """
+    sort = request.args.get('sort', 'name')
+    descending = sort.startswith('-')
+    sort_field = sort.lstrip('-')
+    if sort_field not in ROSTER_SORT_FIELDS:
+        raise RosterSortError(f"sort must be one of: {', '.join(ROSTER_SORT_FIELDS)}")
+
+    sort_column = getattr(User, sort_field)
+    order = [sort_column.desc(), User.id.desc()] if descending else [sort_column, User.id]
+    query = (
+        db.select(User.id, User.name, User.email, User.role, User.created_at)
+        .where(getattr(User, field) == value)
+        .order_by(*order)
+    )
+
+    page = paginate_select(db.session, query, request)
+    page['items'] = [{
+        'id': s.id,
+        'name': s.name,
+        'email': s.email,
+        'role': s.role,
+        'created_at': s.created_at.isoformat() if s.created_at else None
+    } for s in page['items']]
+    return page
+
+
+def roster_counts(field, ids):
+    """
+    {id: number of users} for many cohorts/classes in one grouped query
+    """
+    if not ids:
+        return {}
+    column = getattr(User, field)
+    rows = db.session.execute(
+        db.select(column, db.func.count(User.id)).where(column.in_(ids)).group_by(column)
+    ).all()
+    counts = dict.fromkeys(ids, 0)
+    counts.update({group_id: count for group_id, count in rows})
+    return counts
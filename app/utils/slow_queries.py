@@ -0,0 +1,203 @@
+import json
+import os
+import queue
+import re
+import threading
+import time
+import logging
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from logging.handlers import WatchedFileHandler
+from flask import request, has_request_context
+from app.utils.sql_timing import subscribe_to_statements
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Separate logger writing one JSON object per line to SLOW_QUERY_LOG_FILE
+slow_query_log = logging.getLogger('app.slow_queries.file')
+slow_query_log.setLevel(logging.INFO)
+slow_query_log.propagate = False
+
+# Execution option set on the EXPLAIN worker's statements so they aren't recorded
+EXPLAIN_OPTION = 'slow_query_explain'
+EXPLAINABLE_PREFIXES = ('select', 'with')
+WRITE_KEYWORDS = re.compile(r'\b(insert|update|delete|merge|for\s+update|for\s+share)\b')
+
+
+def parameter_shape(parameters):
+    """
+    Types of the bound parameters, never their values,
+    e.g. {'email_1': 'str', 'param_1': 'int'}
+    """
+    if parameters is None:
+        return None
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _route():
+    if not has_request_context():
+        return None
+    return {'endpoint': request.endpoint, 'method': request.method, 'path': request.path}
+
+
+def _is_explainable(statement):
+    # EXPLAIN ANALYZE executes the statement, so only plain reads qualify
+    text = statement.lstrip().lower()
+    return text.startswith(EXPLAINABLE_PREFIXES) and not WRITE_KEYWORDS.search(text)
+
+
+class ExplainWorker:
+    """
+    Captures EXPLAIN (ANALYZE, BUFFERS) plans for slow statements on a
+    background thread with its own connection, then writes the record.
+    Each distinct statement is explained at most once per `interval` seconds;
+    only the `max_statements` most recently explained ones are remembered.
+    """
+    def __init__(self, engine, interval=300, max_pending=100, max_statements=1000):
+        self.engine = engine
+        self.interval = interval
+        self.max_statements = max_statements
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._last_explained = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='slow-query-explain', daemon=True)
+        self._thread.start()
+
+    def submit(self, record, parameters):
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_explained.get(record['statement'])
+            if last is not None and now - last < self.interval:
+                return False
+            self._last_explained[record['statement']] = now
+            self._last_explained.move_to_end(record['statement'])
+            while len(self._last_explained) > self.max_statements:
+                self._last_explained.popitem(last=False)
+        try:
+            self._pending.put_nowait((record, parameters))
+            return True
+        except queue.Full:
+            return False
+
+    def _run(self):
+        while True:
+            record, parameters = self._pending.get()
+            try:
+                with self.engine.connect() as conn:
+                    # An execution option, not conn.info: info outlives this checkout on the pooled connection
+                    conn.execution_options(**{EXPLAIN_OPTION: True})
+                    try:
+                        rows = conn.exec_driver_sql(
+                            'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ' + record['statement'], parameters
+                        ).scalar()
+                        record['plan'] = rows if not isinstance(rows, str) else json.loads(rows)
+                    finally:
+                        conn.rollback()
+            except Exception as e:
+                record['plan_error'] = str(e)
+            _write(record)
+
+
+def _write(record):
+    slow_query_log.info(json.dumps(record, default=str))
+
+
+_explain_worker = None
+_explain_lock = threading.Lock()
+
+
+def _get_explain_worker(engine, interval):
+    global _explain_worker
+    if _explain_worker is None:
+        with _explain_lock:
+            if _explain_worker is None:
+                _explain_worker = ExplainWorker(engine, interval)
+    return _explain_worker
+
+
+def _reset_after_fork():
+    # The EXPLAIN thread doesn't survive fork(); each worker starts its own on first use
+    global _explain_worker, _explain_lock
+    _explain_worker = None
+    _explain_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def init_slow_query_log(app, db):
+    """
+    Records statements slower than SLOW_QUERY_THRESHOLD_MS, with the calling
+    route and parameter types, to a JSON-lines file. On PostgreSQL,
+    SLOW_QUERY_EXPLAIN adds an EXPLAIN (ANALYZE, BUFFERS) plan for reads.
+    Every gunicorn worker appends to the same file, so it is rotated
+    externally (logrotate); the handler reopens it when it is moved.
+    """
+    threshold = app.config.get('SLOW_QUERY_THRESHOLD_MS', 0) / 1000
+    if threshold <= 0:
+        return
+
+    path = app.config.get('SLOW_QUERY_LOG_FILE')
+    if not any(getattr(h, 'baseFilename', None) == os.path.abspath(path) for h in slow_query_log.handlers):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        handler = WatchedFileHandler(path)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        slow_query_log.addHandler(handler)
+
+    explain = app.config.get('SLOW_QUERY_EXPLAIN', False)
+    explain_interval = app.config.get('SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS', 300)
+
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    for engine in engines:
+        can_explain = explain and engine.dialect.name == 'postgresql'
+
+        def record_if_slow(conn, cursor, statement, parameters, context, executemany, start, elapsed, error,
+                           engine=engine, can_explain=can_explain):
+            if error is not None or elapsed < threshold:
+                return
+            if context is not None and context.execution_options.get(EXPLAIN_OPTION):
+                return
+
+            record = {
+                'at': datetime.now(timezone.utc).isoformat(),
+                'duration_ms': round(elapsed * 1000, 2),
+                'route': _route(),
+                'statement': statement,
+                'executemany': executemany,
+                'parameters': parameter_shape(parameters[0] if executemany and parameters else parameters),
+                'rowcount': cursor.rowcount,
+            }
+            if can_explain and not executemany and _is_explainable(statement):
+                if _get_explain_worker(engine, explain_interval).submit(record, parameters):
+                    return
+            _write(record)
+
+        subscribe_to_statements(engine, record_if_slow)
+
+
+def read_slow_queries(path, limit=100):
+    """
+    The newest `limit` records from the current log file, newest first
+    """
+    if not path or not os.path.exists(path):
+        return []
+    with open(path) as fh:
+        lines = deque(fh, maxlen=limit)
+    records = []
+    for line in reversed(lines):
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
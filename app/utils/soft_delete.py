@@ -0,0 +1,240 @@
+import atexit
+import os
+import threading
+import logging
+from datetime import datetime, timedelta, timezone
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event
+from sqlalchemy.orm import Session, with_loader_criteria
+from app.models import (
+    db, SoftDeleteMixin, User, Project, Cohort, ProjectMember, Task,
+    ActivityLog, TwoFactorCode, RefreshToken
+)
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Execution option that lets a query see soft-deleted rows
+INCLUDE_DELETED = 'include_deleted'
+
+
+def _hide_soft_deleted(execute_state):
+    if not execute_state.is_select or execute_state.execution_options.get(INCLUDE_DELETED, False):
+        return
+    # Also applies to relationship lazy loads and to refreshes of expired
+    # objects, so a soft-deleted row looks gone everywhere in the ORM
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(SoftDeleteMixin, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+    )
+
+
+def init_soft_delete(app):
+    """
+    Hides soft-deleted users, projects and cohorts from every ORM SELECT.
+    Pass .execution_options(include_deleted=True) to see them.
+    """
+    if not event.contains(Session, 'do_orm_execute', _hide_soft_deleted):
+        event.listen(Session, 'do_orm_execute', _hide_soft_deleted)
+
+
+def soft_delete(obj):
+    """
+    Marks a user, project or cohort deleted. Reads stop returning it at once;
+    the purge job removes it and its dependents later. Does not commit.
+    """
+    obj.deleted_at = datetime.now(timezone.utc)
+
+    if isinstance(obj, User):
+        # Cheap per-user set operations done now so nothing still points at a hidden user:
+        # memberships are listed with the member's name, refresh tokens could mint new JWTs
+        db.session.execute(db.delete(ProjectMember).where(ProjectMember.user_id == obj.id))
+        db.session.execute(
+            db.update(RefreshToken)
+            .where(RefreshToken.user_id == obj.id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=obj.deleted_at)
+            .execution_options(synchronize_session=False)
+        )
+    elif isinstance(obj, Project):
+        # Pending invitations would still be listed, and could be accepted, for a hidden project.
+        # Its tasks stay until the purge; task reads join the project so they are hidden now
+        db.session.execute(db.delete(ProjectMember).where(ProjectMember.project_id == obj.id))
+    db.session.flush()
+    # Refreshes of already-loaded objects bypass the read filter, so drop it
+    # from the identity map; later lookups in this session then miss too
+    db.session.expunge(obj)
+    schedule_purge()
+
+# -----------------------------
+# Purge (set-based, chunked)
+# -----------------------------
+def _chunk(model, criteria, chunk_size):
+    return db.session.execute(
+        db.select(model.id).where(*criteria).order_by(model.id).limit(chunk_size)
+        .execution_options(**{INCLUDE_DELETED: True})
+    ).scalars().all()
+
+
+def _delete_where(model, criteria, chunk_size):
+    total = 0
+    while True:
+        ids = _chunk(model, criteria, chunk_size)
+        if not ids:
+            return total
+        db.session.execute(
+            db.delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        total += len(ids)
+
+
+def _nullify_where(model, column, parent_ids, chunk_size):
+    total = 0
+    while True:
+        ids = _chunk(model, [column.in_(parent_ids)], chunk_size)
+        if not ids:
+            return total
+        db.session.execute(
+            db.update(model).where(model.id.in_(ids)).values({column.key: None})
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        total += len(ids)
+
+
+def _purge_users(ids, chunk_size):
+    # Same outcome as the ORM cascades on User: assigned tasks and memberships go,
+    # owned projects and past activity are kept without an owner/actor
+    _delete_where(ProjectMember, [ProjectMember.user_id.in_(ids)], chunk_size)
+    _delete_where(Task, [Task.assignee_id.in_(ids)], chunk_size)
+    _delete_where(TwoFactorCode, [TwoFactorCode.user_id.in_(ids)], chunk_size)
+    _delete_where(RefreshToken, [RefreshToken.user_id.in_(ids)], chunk_size)
+    _nullify_where(Project, Project.owner_id, ids, chunk_size)
+    _nullify_where(ActivityLog, ActivityLog.user_id, ids, chunk_size)
+
+
+def _purge_projects(ids, chunk_size):
+    _delete_where(Task, [Task.project_id.in_(ids)], chunk_size)
+    _delete_where(ProjectMember, [ProjectMember.project_id.in_(ids)], chunk_size)
+
+
+def _purge_cohorts(ids, chunk_size):
+    _nullify_where(User, User.cohort_id, ids, chunk_size)
+    _nullify_where(Project, Project.cohort_id, ids, chunk_size)
+
+
+PURGE_ORDER = (
+    (Project, _purge_projects),
+    (Cohort, _purge_cohorts),
+    (User, _purge_users),
+)
+
+
+def purge_deleted(chunk_size=None, delay_seconds=None):
+    """
+    Permanently removes users, projects and cohorts soft-deleted more than
+    delay_seconds ago. Dependents are deleted or detached chunk_size rows at a
+    time, each chunk in its own short transaction. Safe to re-run after an
+    interruption. Returns {table: rows purged}.
+    """
+    config = current_app.config
+    chunk_size = chunk_size or config.get('SOFT_DELETE_PURGE_CHUNK_SIZE', 1000)
+    if delay_seconds is None:
+        delay_seconds = config.get('SOFT_DELETE_PURGE_DELAY_SECONDS', 0)
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=delay_seconds)
+
+    purged = {}
+    for model, purge_dependents in PURGE_ORDER:
+        criteria = [model.deleted_at.is_not(None), model.deleted_at <= cutoff]
+        purged[model.__tablename__] = 0
+        while True:
+            ids = _chunk(model, criteria, chunk_size)
+            if not ids:
+                break
+            purge_dependents(ids, chunk_size)
+            db.session.execute(
+                db.delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            purged[model.__tablename__] += len(ids)
+
+    if any(purged.values()):
+        logger.info(f"Purged soft-deleted rows: {purged}")
+    return purged
+
+# -----------------------------
+# Background purge job
+# -----------------------------
+class PurgeJob:
+    """
+    Runs purge_deleted() every `interval` seconds in a daemon thread
+    """
+    def __init__(self, app, interval):
+        self.app = app
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='soft-delete-purge', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    purge_deleted()
+            except Exception as e:
+                logger.error(f"Soft-delete purge failed: {str(e)}")
+
+
+_job = None
+_job_lock = threading.Lock()
+
+
+def schedule_purge():
+    """
+    Starts this process's purge job on first use, unless
+    SOFT_DELETE_PURGE_INTERVAL_SECONDS is 0 (purge from cron instead)
+    """
+    global _job
+    interval = current_app.config.get('SOFT_DELETE_PURGE_INTERVAL_SECONDS', 300)
+    if _job is not None or not interval:
+        return
+    with _job_lock:
+        if _job is None:
+            _job = PurgeJob(current_app._get_current_object(), interval)
+            atexit.register(_job.stop)
+
+
+def _reset_job_after_fork():
+    # The purge thread doesn't survive fork(); each worker starts its own on first delete
+    global _job, _job_lock
+    _job = None
+    _job_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_job_after_fork)
+
+# -----------------------------
+# CLI: flask deleted purge
+# -----------------------------
+@click.group('deleted')
+def deleted_cli():
+    """Manage soft-deleted users, projects and cohorts."""
+
+
+@deleted_cli.command('purge')
+@click.option('--chunk-size', type=int, default=None, help='Defaults to SOFT_DELETE_PURGE_CHUNK_SIZE.')
+@click.option('--delay-seconds', type=int, default=None, help='Defaults to SOFT_DELETE_PURGE_DELAY_SECONDS.')
+@with_appcontext
+def purge_command(chunk_size, delay_seconds):
+    """Permanently delete soft-deleted rows and their dependents."""
+    purged = purge_deleted(chunk_size, delay_seconds)
+    for table, count in purged.items():
+        click.echo(f"{table}: {count} purged")
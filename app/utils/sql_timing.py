@@ -0,0 +1,61 @@
+import time
+import weakref
+from sqlalchemy import event
+
+# Start times of the statements running on a connection (a stack, innermost last)
+START_TIMES_KEY = 'sql_timing_start'
+
+# Engine -> callbacks subscribed to its statements
+_subscribers = weakref.WeakKeyDictionary()
+
+
+def subscribe_to_statements(engine, callback):
+    """
+    Times every statement run through `engine` with one shared pair of cursor
+    listeners and then calls
+
+        callback(conn, cursor, statement, parameters, context, executemany, start, elapsed, error)
+
+    `start` is the time.perf_counter() value when the statement was sent,
+    `elapsed` its duration in seconds and `error` the DBAPI exception when it
+    failed (None otherwise). Subscribing the same callback twice is a no-op.
+    """
+    callbacks = _subscribers.get(engine)
+    if callbacks is None:
+        callbacks = _subscribers[engine] = []
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+    if callback not in callbacks:
+        callbacks.append(callback)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(START_TIMES_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(START_TIMES_KEY)
+    if not starts:
+        return
+    start = starts.pop()
+    elapsed = time.perf_counter() - start
+    for callback in _subscribers.get(conn.engine, ()):
+        callback(conn, cursor, statement, parameters, context, executemany, start, elapsed, None)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; pop its start time
+    # here too, or the stack grows by one entry per error
+    conn = exception_context.connection
+    starts = conn.info.get(START_TIMES_KEY) if conn is not None else None
+    if not starts:
+        return
+    start = starts.pop()
+    elapsed = time.perf_counter() - start
+    context = exception_context.execution_context
+    cursor = context.cursor if context is not None else None
+    executemany = bool(context is not None and context.executemany)
+    for callback in _subscribers.get(exception_context.engine, ()):
+        callback(conn, cursor, exception_context.statement, exception_context.parameters,
+                 context, executemany, start, elapsed, exception_context.original_exception)
@@ -0,0 +1,79 @@
+import hmac
+import io
+import time
+import pyotp
+from flask import current_app
+from app.models import db, User
+
+
+def generate_totp_secret():
+    """
+    Generates a new base32 secret for an authenticator app
+    """
+    return pyotp.random_base32()
+
+
+def get_provisioning_uri(user, secret):
+    """
+    Builds the otpauth:// URI encoded in the setup QR code
+    """
+    issuer = current_app.config.get('TOTP_ISSUER', 'Moringa Project Planner')
+    return pyotp.TOTP(secret).provisioning_uri(name=user.email, issuer_name=issuer)
+
+
+def render_qr_png(data):
+    """
+    Renders data as a QR code and returns the PNG bytes
+    """
+    # Imported lazily: only needed on the setup path. PyPNG avoids a Pillow dependency.
+    import qrcode
+    from qrcode.image.pure import PyPNGImage
+
+    buffer = io.BytesIO()
+    qrcode.make(data, image_factory=PyPNGImage).save(buffer)
+    return buffer.getvalue()
+
+
+def match_totp_step(secret, code, window=None, now=None):
+    """
+    Returns the time step the code is valid for (within the drift window), or None
+    """
+    if window is None:
+        window = current_app.config.get('TOTP_VALID_WINDOW', 1)
+    code = str(code).strip()
+    if not code.isdigit():
+        return None
+
+    totp = pyotp.TOTP(secret)
+    current_step = int((now if now is not None else time.time()) // totp.interval)
+    for step in range(current_step - window, current_step + window + 1):
+        if hmac.compare_digest(totp.generate_otp(step), code):
+            return step
+    return None
+
+
+def verify_totp(user, code, secret=None):
+    """
+    Verifies a TOTP code for the user entirely in-process.
+    A code is accepted only if its time step is newer than the last accepted one;
+    the conditional UPDATE makes this hold even for concurrent requests.
+    Commits with the request's unit of work.
+    """
+    secret = secret or user.two_factor_secret
+    if not secret:
+        return False
+
+    step = match_totp_step(secret, code)
+    if step is None:
+        return False
+
+    result = db.session.execute(
+        db.update(User)
+        .where(
+            User.id == user.id,
+            db.or_(User.totp_last_step.is_(None), User.totp_last_step < step)
+        )
+        .values(totp_last_step=step)
+        .execution_options(synchronize_session=False)
+    )
+    return bool(result.rowcount)
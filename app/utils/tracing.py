@@ -0,0 +1,441 @@
+import atexit
+import contextvars
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.request
+import logging
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, request
+from app.utils.sql_timing import subscribe_to_statements
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# W3C trace context: version-trace_id-parent_id-flags
+TRACEPARENT_PATTERN = re.compile(r'^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+MAX_STATEMENT_LENGTH = 2000
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+# Current "span" of a request that wasn't sampled: nothing below it is recorded
+NOT_SAMPLED = object()
+_processor = None
+
+
+class Span:
+    """
+    One timed operation. Spans of the same request share a trace_id and
+    point at their parent through parent_span_id.
+    """
+    __slots__ = ('trace_id', 'span_id', 'parent_span_id', 'name', 'kind',
+                 'start_ns', 'end_ns', 'attributes', 'status', 'status_message')
+
+    def __init__(self, name, kind='internal', trace_id=None, parent_span_id=None, attributes=None, start_ns=None):
+        self.trace_id = trace_id or f'{random.getrandbits(128):032x}'
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = 'unset'
+        self.status_message = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_exception(self, exc):
+        self.status = 'error'
+        self.status_message = str(exc)
+        self.attributes['exception.type'] = type(exc).__name__
+        self.attributes['exception.message'] = str(exc)
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if _processor is not None:
+                _processor.add(self)
+
+    @property
+    def traceparent(self):
+        return f'00-{self.trace_id}-{self.span_id}-01'
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_span_id': self.parent_span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'start_unix_nano': self.start_ns,
+            'end_unix_nano': self.end_ns,
+            'duration_ms': round((self.end_ns - self.start_ns) / 1e6, 3),
+            'status': self.status,
+            'status_message': self.status_message,
+            'attributes': self.attributes,
+        }
+
+
+# -----------------------------
+# Exporters
+# -----------------------------
+class SpanExporter:
+    """
+    Receives finished spans in batches from the background processor.
+    Subclass and override export() to send spans somewhere else.
+    """
+    def export(self, spans):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+
+class JsonLinesExporter(SpanExporter):
+    """
+    Appends one JSON object per span to a local file for offline analysis
+    """
+    def __init__(self, path, service_name):
+        self.path = path
+        self.service_name = service_name
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def export(self, spans):
+        lines = ''.join(
+            json.dumps(dict(span.to_dict(), service=self.service_name), default=str) + '\n' for span in spans
+        )
+        with open(self.path, 'a') as fh:
+            fh.write(lines)
+
+
+OTLP_KINDS = {'internal': 1, 'server': 2, 'client': 3}
+OTLP_STATUS = {'unset': 0, 'ok': 1, 'error': 2}
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class OTLPHttpExporter(SpanExporter):
+    """
+    Posts spans as OTLP/HTTP JSON (POST <endpoint>, default /v1/traces on an
+    OpenTelemetry collector), so any OTLP backend can ingest them.
+    """
+    def __init__(self, endpoint, service_name, headers=None, timeout=5):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.headers = dict(headers or {}, **{'Content-Type': 'application/json'})
+        self.timeout = timeout
+
+    def encode(self, spans):
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': _otlp_attributes({'service.name': self.service_name})},
+                'scopeSpans': [{
+                    'scope': {'name': __name__},
+                    'spans': [{
+                        'traceId': span.trace_id,
+                        'spanId': span.span_id,
+                        'parentSpanId': span.parent_span_id or '',
+                        'name': span.name,
+                        'kind': OTLP_KINDS.get(span.kind, 1),
+                        'startTimeUnixNano': str(span.start_ns),
+                        'endTimeUnixNano': str(span.end_ns),
+                        'attributes': _otlp_attributes(span.attributes),
+                        'status': {'code': OTLP_STATUS[span.status], 'message': span.status_message or ''},
+                    } for span in spans],
+                }],
+            }]
+        }
+
+    def export(self, spans):
+        body = json.dumps(self.encode(spans)).encode()
+        req = urllib.request.Request(self.endpoint, data=body, headers=self.headers, method='POST')
+        with urllib.request.urlopen(req, timeout=self.timeout) as response:
+            response.read()
+
+
+class BatchSpanProcessor:
+    """
+    Buffers finished spans and hands them to the exporter from a background
+    thread every `flush_interval` seconds or `batch_size` spans, so requests
+    never wait on the exporter. Spans beyond `max_queue` are dropped.
+    """
+    def __init__(self, exporter, batch_size=512, flush_interval=2.0, max_queue=10000):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._start()
+
+    def _start(self):
+        self._spans = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+        self._thread.start()
+
+    def add(self, span):
+        with self._lock:
+            if len(self._spans) >= self.max_queue:
+                self.dropped += 1
+                return
+            self._spans.append(span)
+            full = len(self._spans) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                spans, self._spans = self._spans, []
+            for i in range(0, len(spans), self.batch_size):
+                try:
+                    self.exporter.export(spans[i:i + self.batch_size])
+                except Exception as e:
+                    logger.error(f"Failed to export {len(spans[i:i + self.batch_size])} spans: {str(e)}")
+            return len(spans)
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+        self.flush()
+        self.exporter.shutdown()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+def _restart_processor_after_fork():
+    # The export thread doesn't survive fork(); spans buffered in the parent
+    # belong to the parent
+    if _processor is not None:
+        _processor._start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_processor_after_fork)
+
+
+def build_exporter(config):
+    kind = config.get('TRACING_EXPORTER', 'jsonl')
+    service_name = config.get('TRACING_SERVICE_NAME', 'projectx-api')
+    if kind == 'jsonl':
+        return JsonLinesExporter(config.get('TRACING_FILE'), service_name)
+    if kind == 'otlp':
+        return OTLPHttpExporter(config.get('TRACING_OTLP_ENDPOINT'), service_name)
+    raise ValueError(f"Unknown TRACING_EXPORTER '{kind}' (expected 'jsonl' or 'otlp')")
+
+
+# -----------------------------
+# Span API
+# -----------------------------
+def current_span():
+    span = _current_span.get()
+    return span if span is not NOT_SAMPLED else None
+
+
+def current_traceparent():
+    """
+    traceparent header value for outgoing HTTP calls, or None outside a trace
+    """
+    span = current_span()
+    return span.traceparent if span is not None else None
+
+
+@contextmanager
+def start_span(name, kind='internal', attributes=None):
+    """
+    Times the block as a child of the current span. Outside a request a new
+    trace is started. A no-op when tracing is off.
+    """
+    parent = _current_span.get()
+    if _processor is None or parent is NOT_SAMPLED:
+        yield None
+        return
+    span = Span(
+        name, kind,
+        trace_id=parent.trace_id if parent else None,
+        parent_span_id=parent.span_id if parent else None,
+        attributes=attributes
+    )
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def traced(name, kind='internal', **attributes):
+    """
+    Decorator: runs the function inside start_span(name)
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if _processor is None:
+                return f(*args, **kwargs)
+            with start_span(name, kind, dict(attributes, **{'code.function': f.__qualname__})):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_exception(exc):
+    """
+    Marks the current span as failed, for code that handles its own errors
+    """
+    span = current_span()
+    if span is not None:
+        span.record_exception(exc)
+
+
+def parse_traceparent(header):
+    """
+    (trace_id, parent_span_id, sampled) from a W3C traceparent header, or None
+    """
+    match = TRACEPARENT_PATTERN.match((header or '').strip().lower())
+    if not match:
+        return None
+    version, trace_id, parent_id, flags = match.groups()
+    if version == 'ff' or trace_id == '0' * 32 or parent_id == '0' * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+# -----------------------------
+# SQL spans
+# -----------------------------
+def _record_statement(conn, cursor, statement, parameters, context, executemany, start, elapsed, error):
+    # Built once the statement is done, back-dated by its duration
+    parent = _current_span.get()
+    if parent is None or parent is NOT_SAMPLED or _processor is None:
+        return
+    span = Span(
+        statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'SQL', 'client',
+        trace_id=parent.trace_id, parent_span_id=parent.span_id,
+        attributes={
+            'db.system': conn.dialect.name,
+            'db.statement': statement[:MAX_STATEMENT_LENGTH],
+            'db.executemany': executemany,
+        },
+        start_ns=time.time_ns() - int(elapsed * 1e9)
+    )
+    if error is not None:
+        span.record_exception(error)
+    else:
+        span.set_attribute('db.rowcount', cursor.rowcount)
+    span.end()
+
+
+def init_tracing(app, db):
+    """
+    Produces a span per request (continuing an incoming W3C traceparent), per
+    SQL statement and per traced() call (email sends, image uploads, activity
+    logging), exported in the background as JSON lines (TRACING_FILE) or
+    OTLP/HTTP (TRACING_OTLP_ENDPOINT). Off unless TRACING_ENABLED.
+    """
+    global _processor
+    if not app.config.get('TRACING_ENABLED', False):
+        return
+
+    if _processor is None:
+        _processor = BatchSpanProcessor(
+            build_exporter(app.config),
+            batch_size=app.config.get('TRACING_BATCH_SIZE', 512),
+            flush_interval=app.config.get('TRACING_FLUSH_INTERVAL', 2.0)
+        )
+        atexit.register(_processor.stop)
+    sample_rate = app.config.get('TRACING_SAMPLE_RATE', 1.0)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            subscribe_to_statements(engine, _record_statement)
+
+    @app.before_request
+    def start_request_span():
+        incoming = parse_traceparent(request.headers.get('traceparent'))
+        if incoming:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id, sampled = None, None, random.random() < sample_rate
+        # The caller's sampling decision wins, so a trace is never half-recorded
+        if not sampled:
+            g.trace_token = _current_span.set(NOT_SAMPLED)
+            return
+
+        rule = request.url_rule.rule if request.url_rule else None
+        span = Span(
+            f'{request.method} {rule}' if rule else request.method, 'server',
+            trace_id=trace_id, parent_span_id=parent_id,
+            attributes={
+                'http.request.method': request.method,
+                'http.route': rule,
+                'url.path': request.path,
+                'flask.endpoint': request.endpoint,
+            }
+        )
+        g.trace_span = span
+        g.trace_token = _current_span.set(span)
+
+    @app.after_request
+    def add_trace_header(response):
+        span = g.get('trace_span')
+        if span is not None:
+            span.set_attribute('http.response.status_code', response.status_code)
+            if response.status_code >= 500:
+                span.status = 'error'
+            # W3C trace context level 2: lets the caller find this trace
+            response.headers['traceresponse'] = span.traceparent
+        return response
+
+    @app.teardown_request
+    def end_request_span(exc):
+        # Teardown runs after every after_request hook (and the commit) and
+        # also when the handler raised
+        token = g.pop('trace_token', None)
+        if token is not None:
+            _current_span.reset(token)
+        span = g.pop('trace_span', None)
+        if span is None:
+            return
+        if exc is not None:
+            span.record_exception(exc)
+        span.end()
+
+
+def flush_traces():
+    """
+    Exports buffered spans now (e.g. from gunicorn's worker_exit hook)
+    """
+    if _processor is not None:
+        return _processor.flush()
+    return 0
@@ -0,0 +1,150 @@
+import hashlib
+import hmac
+import threading
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from app.models import db, TwoFactorCode
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Results returned by CodeStore.consume()
+CODE_OK = 'ok'
+CODE_MISSING = 'missing'
+CODE_EXPIRED = 'expired'
+CODE_INVALID = 'invalid'
+
+
+def hash_code(code):
+    """
+    Keyed hash of a 2FA code so raw codes are never persisted
+    """
+    secret_key = current_app.config.get('SECRET_KEY', '')
+    return hmac.new(secret_key.encode(), str(code).encode(), hashlib.sha256).hexdigest()
+
+# -----------------------------
+# In-memory store (tests / single process)
+# -----------------------------
+class MemoryCodeStore:
+    """
+    Process-local store. Only safe with a single worker.
+    """
+    def __init__(self):
+        self._codes = {}
+        self._lock = threading.Lock()
+
+    def save(self, user_id, code, ttl_minutes):
+        expiry = datetime.now(timezone.utc) + timedelta(minutes=ttl_minutes)
+        with self._lock:
+            self._codes[user_id] = {'code_hash': hash_code(code), 'expiry': expiry}
+
+    def consume(self, user_id, code):
+        code_hash = hash_code(code)
+        with self._lock:
+            stored = self._codes.get(user_id)
+            if not stored:
+                return CODE_MISSING
+            if datetime.now(timezone.utc) > stored['expiry']:
+                del self._codes[user_id]
+                return CODE_EXPIRED
+            if not hmac.compare_digest(stored['code_hash'], code_hash):
+                return CODE_INVALID
+            del self._codes[user_id]
+            return CODE_OK
+
+    def sweep(self):
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            expired = [uid for uid, stored in self._codes.items() if now > stored['expiry']]
+            for uid in expired:
+                del self._codes[uid]
+        return len(expired)
+
+# -----------------------------
+# Database store (default, shared across workers)
+# -----------------------------
+class DatabaseCodeStore:
+    """
+    Stores hashed codes in two_factor_codes so any worker can verify them.
+    Consumption is a single conditional DELETE, so a code can only be used once
+    even when two requests race.
+    """
+    def __init__(self, sweep_interval_seconds=300):
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._last_sweep = 0.0
+
+    def save(self, user_id, code, ttl_minutes):
+        self._maybe_sweep()
+        expiry = datetime.now(timezone.utc) + timedelta(minutes=ttl_minutes)
+        # A new login replaces any code still pending for this user
+        db.session.execute(db.delete(TwoFactorCode).where(TwoFactorCode.user_id == user_id))
+        db.session.add(TwoFactorCode(user_id=user_id, code_hash=hash_code(code), expires_at=expiry))
+        db.session.flush()
+
+    def consume(self, user_id, code):
+        now = datetime.now(timezone.utc)
+        result = db.session.execute(
+            db.delete(TwoFactorCode).where(
+                TwoFactorCode.user_id == user_id,
+                TwoFactorCode.code_hash == hash_code(code),
+                TwoFactorCode.expires_at > now
+            )
+        )
+        if result.rowcount:
+            return CODE_OK
+
+        # Work out why it failed so the caller can return the right message
+        live = db.session.execute(
+            db.select(db.func.count(TwoFactorCode.id)).where(
+                TwoFactorCode.user_id == user_id,
+                TwoFactorCode.expires_at > now
+            )
+        ).scalar()
+        if live:
+            return CODE_INVALID
+
+        expired = db.session.execute(
+            db.delete(TwoFactorCode).where(TwoFactorCode.user_id == user_id)
+        ).rowcount
+        return CODE_EXPIRED if expired else CODE_MISSING
+
+    def sweep(self):
+        # Own connection: sweeping must not commit the request's unit of work
+        with db.engine.begin() as conn:
+            deleted = conn.execute(
+                db.delete(TwoFactorCode).where(TwoFactorCode.expires_at <= datetime.now(timezone.utc))
+            ).rowcount
+        self._last_sweep = time.monotonic()
+        if deleted:
+            logger.info(f"Swept {deleted} expired 2FA codes")
+        return deleted
+
+    def _maybe_sweep(self):
+        if time.monotonic() - self._last_sweep >= self.sweep_interval_seconds:
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning(f"2FA code sweep failed: {str(e)}")
+
+
+def get_code_store(app=None):
+    """
+    Returns the configured 2FA code store for the app, creating it on first use
+    """
+    app = app or current_app._get_current_object()
+    store = app.extensions.get('two_fa_code_store')
+    if store is None:
+        backend = app.config.get('TWO_FA_CODE_STORE', 'database')
+        if backend == 'memory':
+            store = MemoryCodeStore()
+        elif backend == 'database':
+            store = DatabaseCodeStore(app.config.get('TWO_FA_SWEEP_INTERVAL_SECONDS', 300))
+        else:
+            raise RuntimeError(f"Unknown TWO_FA_CODE_STORE backend: {backend}")
+        app.extensions['two_fa_code_store'] = store
+    return store
@@ -0,0 +1,91 @@
+import logging
+from flask import jsonify, has_request_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models import db
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Session.info key holding callbacks that wait for the transaction to commit
+ON_COMMIT_KEY = 'on_commit_callbacks'
+
+
+def on_commit(callback):
+    """
+    Runs callback() once the current session transaction commits, and never if
+    it rolls back: for side effects that must not outlive a failed request
+    (buffered activity rows, emails). Outside a request, with no transaction
+    in progress, it runs at once.
+    """
+    session = db.session()
+    if not has_request_context() and not session.in_transaction():
+        callback()
+        return
+    session.info.setdefault(ON_COMMIT_KEY, []).append(callback)
+
+
+def _run_on_commit_callbacks(session):
+    # after_commit also fires when a savepoint is released; wait for the real commit
+    if session.in_nested_transaction():
+        return
+    for callback in session.info.pop(ON_COMMIT_KEY, []):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"on_commit callback failed: {str(e)}")
+
+
+def _discard_on_commit_callbacks(session, transaction):
+    # Ends after the commit callbacks ran, or after a rollback: either way nothing is left to run
+    if transaction.parent is None:
+        session.info.pop(ON_COMMIT_KEY, None)
+
+
+def init_unit_of_work(app):
+    """
+    One transaction per request: route handlers and helpers only flush,
+    and the session is committed once when the response is ready.
+    Error responses (status >= 400) and unhandled exceptions roll back.
+
+    Register after CORS so a failed commit's 500 still gets CORS headers.
+    """
+    if not event.contains(Session, 'after_commit', _run_on_commit_callbacks):
+        event.listen(Session, 'after_commit', _run_on_commit_callbacks)
+        event.listen(Session, 'after_transaction_end', _discard_on_commit_callbacks)
+
+    @app.after_request
+    def commit_unit_of_work(response):
+        if response.status_code >= 400:
+            db.session.rollback()
+            return response
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Commit failed at end of request: {str(e)}")
+            response = jsonify({'message': 'Failed to save changes'})
+            response.status_code = 500
+        return response
+
+    @app.teardown_request
+    def rollback_unit_of_work(exc):
+        if exc is not None:
+            db.session.rollback()
+
+
+def savepoint():
+    """
+    Savepoint inside the request transaction, for batches where one item may fail:
+
+        for item in items:
+            try:
+                with savepoint():
+                    ...
+            except SQLAlchemyError:
+                ...  # only this item's changes are rolled back
+    """
+    return db.session.begin_nested()
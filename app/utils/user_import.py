@@ -0,0 +1,184 @@
+import csv
+import io
+import json
+import os
+import logging
+from flask import current_app
+from app.models import db, User, Cohort, Class
+from app.utils.passwords import hash_passwords, password_hash_seconds
+from app.utils.activity_log import log_activities
+
+# -----------------------------
+# Configure logger
+# -----------------------------
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+IMPORT_FIELDS = ('name', 'email', 'password', 'role', 'cohort_id', 'class_id')
+MAX_IMPORT_ROWS = 5000
+
+
+class UserImportError(ValueError):
+    """Raised when the uploaded payload can't be read as a list of users"""
+
+
+def parse_import_rows(request):
+    """
+    Reads import rows from a JSON list (or {"users": [...]}), a text/csv body,
+    or a multipart upload named "file". Returns a list of dicts.
+    """
+    upload = request.files.get('file')
+    if upload is not None:
+        text = upload.read().decode('utf-8-sig')
+        if upload.filename.lower().endswith('.json'):
+            return _rows_from_json(text)
+        return _rows_from_csv(text)
+
+    if request.is_json:
+        return _rows_from_json(request.get_data(as_text=True))
+    if request.mimetype == 'text/csv':
+        return _rows_from_csv(request.get_data(as_text=True))
+    raise UserImportError('Send a JSON list, a text/csv body or a "file" upload')
+
+
+def _rows_from_json(text):
+    try:
+        data = json.loads(text)
+    except ValueError:
+        raise UserImportError('Invalid JSON')
+    if isinstance(data, dict):
+        data = data.get('users')
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise UserImportError('Expected a list of user objects')
+    return data
+
+
+def _rows_from_csv(text):
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or not {'name', 'email', 'password'} <= {f.strip() for f in reader.fieldnames}:
+        raise UserImportError('CSV header must include name, email and password')
+    return [{(k or '').strip(): v for k, v in row.items()} for row in reader]
+
+
+def _clean_row(raw):
+    """
+    Normalizes one row; returns (row, errors)
+    """
+    row = {field: raw.get(field) for field in IMPORT_FIELDS}
+    for field in ('name', 'email', 'role'):
+        if row[field] is not None:
+            row[field] = str(row[field]).strip()
+    row['role'] = row['role'] or 'Student'
+
+    errors = []
+    for field in ('name', 'email', 'password'):
+        if not row[field]:
+            errors.append(f'{field} is required')
+    if row['email'] and ('@' not in row['email'] or len(row['email']) > 150):
+        errors.append('email is invalid')
+    if row['name'] and len(row['name']) > 150:
+        errors.append('name is too long')
+    if len(row['role']) > 50:
+        errors.append('role is too long')
+    for field in ('cohort_id', 'class_id'):
+        if row[field] in (None, ''):
+            row[field] = None
+            continue
+        try:
+            row[field] = int(row[field])
+        except (TypeError, ValueError):
+            errors.append(f'{field} must be an integer')
+    return row, errors
+
+
+def max_import_rows():
+    """
+    USER_IMPORT_MAX_ROWS, or as many rows as can be hashed within
+    USER_IMPORT_TIME_BUDGET_SECONDS with the configured policy and pool size
+    """
+    config = current_app.config
+    if config.get('USER_IMPORT_MAX_ROWS'):
+        return config['USER_IMPORT_MAX_ROWS']
+    budget = config.get('USER_IMPORT_TIME_BUDGET_SECONDS', 15)
+    workers = max(min(config.get('USER_IMPORT_HASH_WORKERS', 0), os.cpu_count() or 1), 1)
+    return max(min(int(budget / password_hash_seconds() * workers), MAX_IMPORT_ROWS), 1)
+
+
+def import_users(rows, actor_id):
+    """
+    Validates and inserts users in bulk. Existing emails, cohorts and classes
+    are each resolved with one query, passwords are hashed in a process pool
+    and users are inserted in batches of USER_IMPORT_BATCH_SIZE. Does not commit.
+    Returns a per-row report in input order.
+    """
+    config = current_app.config
+    report = []
+    cleaned = []
+    for index, raw in enumerate(rows, start=1):
+        row, errors = _clean_row(raw)
+        report.append({'row': index, 'email': row['email'], 'status': 'error' if errors else 'pending', 'errors': errors})
+        cleaned.append(row)
+
+    pending = [i for i, entry in enumerate(report) if entry['status'] == 'pending']
+    emails = {cleaned[i]['email'] for i in pending}
+    cohort_ids = {cleaned[i]['cohort_id'] for i in pending} - {None}
+    class_ids = {cleaned[i]['class_id'] for i in pending} - {None}
+
+    # Soft-deleted users still hold their email until purged
+    existing = set(db.session.execute(
+        db.select(User.email).where(User.email.in_(emails)).execution_options(include_deleted=True)
+    ).scalars()) if emails else set()
+    cohorts = set(db.session.execute(db.select(Cohort.id).where(Cohort.id.in_(cohort_ids))).scalars()) if cohort_ids else set()
+    classes = set(db.session.execute(db.select(Class.id).where(Class.id.in_(class_ids))).scalars()) if class_ids else set()
+
+    seen = set()
+    to_create = []
+    for i in pending:
+        row, entry = cleaned[i], report[i]
+        if row['email'] in existing:
+            entry.update(status='skipped', errors=['email already exists'])
+        elif row['email'] in seen:
+            entry.update(status='skipped', errors=['duplicate email in import'])
+        elif row['cohort_id'] is not None and row['cohort_id'] not in cohorts:
+            entry.update(status='error', errors=['cohort not found'])
+        elif row['class_id'] is not None and row['class_id'] not in classes:
+            entry.update(status='error', errors=['class not found'])
+        else:
+            seen.add(row['email'])
+            to_create.append(i)
+
+    hashes = hash_passwords(
+        (str(cleaned[i]['password']) for i in to_create),
+        workers=config.get('USER_IMPORT_HASH_WORKERS', 0)
+    )
+
+    batch_size = config.get('USER_IMPORT_BATCH_SIZE', 500)
+    created_ids = {}
+    for start in range(0, len(to_create), batch_size):
+        batch = to_create[start:start + batch_size]
+        values = [{
+            'name': cleaned[i]['name'],
+            'email': cleaned[i]['email'],
+            'password_hash': hashes[start + offset],
+            'role': cleaned[i]['role'],
+            'cohort_id': cleaned[i]['cohort_id'],
+            'class_id': cleaned[i]['class_id']
+        } for offset, i in enumerate(batch)]
+        result = db.session.execute(db.insert(User).returning(User.id, User.email), values)
+        created_ids.update({r.email: r.id for r in result})
+
+    entries = []
+    for i in to_create:
+        user_id = created_ids[cleaned[i]['email']]
+        report[i].update(status='created', id=user_id)
+        entries.append({
+            'action': f"Imported user: {cleaned[i]['email']}",
+            'entity_type': 'user',
+            'entity_id': user_id,
+            'verb': 'created',
+            'details': {'role': cleaned[i]['role'], 'import': True}
+        })
+    log_activities(actor_id, entries)
+
+    logger.info(f"Imported {len(to_create)} of {len(rows)} users")
+    return report
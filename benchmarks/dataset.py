@@ -0,0 +1,217 @@
+"""
+Synthetic dataset for the endpoint benchmarks
+
+At scale 1.0: 6 classes, 50 cohorts, 10k users, 20k projects, ~60k project
+members, 200k tasks and 1M activity rows. Rows are generated from a seeded
+random.Random, so the same (scale, seed) always gives the same data, and are
+inserted in batches with explicit ids (COPY on PostgreSQL, multi-row
+INSERTs elsewhere). Every user shares one password hash.
+
+Used by seed.py --scale and the benchmarks.
+"""
+import csv
+import io
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import insert, text
+
+BASE_COUNTS = {
+    'cohorts': 50,
+    'users': 10_000,
+    'projects': 20_000,
+    'tasks': 200_000,
+    'activity_logs': 1_000_000,
+}
+CLASS_NAMES = ['Fullstack Web', 'Android Development', 'Data Science', 'DevOps Track', 'Product Design', 'Cyber Security']
+PROJECT_STATUSES = ['In Progress', 'In Progress', 'Completed', 'On Hold']
+TASK_STATUSES = ['To Do', 'In Progress', 'Done']
+VERBS = ['created', 'updated', 'updated', 'updated', 'invited', 'deleted']
+BATCH_SIZE = 5000
+
+ADMIN_EMAIL = 'admin@bench.local'
+PASSWORD = 'benchpass'
+
+
+def scaled_counts(scale, overrides=None):
+    counts = {name: max(1, round(count * scale)) for name, count in BASE_COUNTS.items()}
+    counts.update({name: count for name, count in (overrides or {}).items() if count is not None})
+    return counts
+
+
+def student_email(user_id):
+    return f'student{user_id}@bench.local'
+
+
+def _skewed(rng, n):
+    # Low ids come up far more often, so a few projects/users are busy and most are quiet
+    return int(n * rng.random() ** 2) + 1
+
+
+def generate(counts, seed, password_hash, now=None):
+    """
+    Yields (table name, list of row dicts) batches in foreign-key order
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2025, 1, 1, tzinfo=timezone.utc)
+    n_classes = len(CLASS_NAMES)
+
+    yield 'classes', [
+        {'id': i + 1, 'name': name, 'created_at': now - timedelta(days=730)}
+        for i, name in enumerate(CLASS_NAMES)
+    ]
+
+    cohorts = []
+    for i in range(1, counts['cohorts'] + 1):
+        start = date(2020, 1, 1) + timedelta(days=30 * i)
+        cohorts.append({
+            'id': i, 'name': f'Cohort {i}', 'start_date': start, 'end_date': start + timedelta(days=180),
+            'created_at': now - timedelta(days=730 - i)
+        })
+    yield 'cohorts', cohorts
+
+    users = []
+    for i in range(1, counts['users'] + 1):
+        admin = i == 1
+        users.append({
+            'id': i,
+            'name': 'Bench Admin' if admin else f'Student {i}',
+            'email': ADMIN_EMAIL if admin else student_email(i),
+            'password_hash': password_hash,
+            'role': 'Admin' if admin else 'Student',
+            'cohort_id': None if admin else rng.randint(1, counts['cohorts']),
+            'class_id': None if admin else rng.randint(1, n_classes),
+            'two_factor_enabled': False,
+            'created_at': now - timedelta(seconds=rng.randint(0, 365 * 86400)),
+        })
+        if len(users) == BATCH_SIZE:
+            yield 'users', users
+            users = []
+    yield 'users', users
+
+    projects, members = [], []
+    member_id = 0
+    for i in range(1, counts['projects'] + 1):
+        owner_id = rng.randint(2, counts['users']) if counts['users'] > 1 else 1
+        created = now - timedelta(seconds=rng.randint(0, 365 * 86400))
+        projects.append({
+            'id': i, 'name': f'Project {i}', 'description': f'Synthetic project {i} for benchmarks',
+            'owner_id': owner_id, 'class_id': rng.randint(1, n_classes), 'cohort_id': rng.randint(1, counts['cohorts']),
+            'github_link': f'https://github.com/bench/project-{i}', 'status': rng.choice(PROJECT_STATUSES),
+            'created_at': created, 'updated_at': created,
+        })
+        for user_id in {_skewed(rng, counts['users']) for _ in range(rng.randint(1, 5))} - {owner_id}:
+            member_id += 1
+            members.append({
+                'id': member_id, 'project_id': i, 'user_id': user_id,
+                'status': 'pending' if rng.random() < 0.2 else 'accepted', 'role': 'collaborator',
+                'created_at': created,
+            })
+        if len(projects) == BATCH_SIZE:
+            yield 'projects', projects
+            yield 'project_members', members
+            projects, members = [], []
+    yield 'projects', projects
+    yield 'project_members', members
+
+    tasks = []
+    for i in range(1, counts['tasks'] + 1):
+        tasks.append({
+            'id': i, 'title': f'Task {i}', 'description': None,
+            'project_id': _skewed(rng, counts['projects']),
+            'assignee_id': rng.randint(1, counts['users']) if rng.random() < 0.7 else None,
+            'status': rng.choice(TASK_STATUSES),
+            'created_at': now - timedelta(seconds=rng.randint(0, 365 * 86400)),
+        })
+        if len(tasks) == BATCH_SIZE:
+            yield 'tasks', tasks
+            tasks = []
+    yield 'tasks', tasks
+
+    activities = []
+    for i in range(1, counts['activity_logs'] + 1):
+        entity_id = rng.randint(1, counts['projects'])
+        verb = rng.choice(VERBS)
+        activities.append({
+            'id': i, 'user_id': _skewed(rng, counts['users']),
+            'action': f'{verb.capitalize()} project: Project {entity_id}',
+            'entity_type': 'project', 'entity_id': entity_id, 'verb': verb, 'details': None,
+            'created_at': now - timedelta(seconds=rng.randint(0, 365 * 86400)),
+        })
+        if len(activities) == BATCH_SIZE:
+            yield 'activity_logs', activities
+            activities = []
+    yield 'activity_logs', activities
+
+
+def _copy_rows(conn, table_name, rows):
+    # COPY ... FROM STDIN (CSV): unquoted empty fields load as NULL
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+    sql = f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):  # psycopg2
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def clear(db):
+    """
+    Empties every table, children first
+    """
+    with db.engine.begin() as conn:
+        if conn.dialect.name == 'postgresql':
+            names = ', '.join(table.name for table in db.metadata.sorted_tables)
+            conn.execute(text(f'TRUNCATE TABLE {names} RESTART IDENTITY CASCADE'))
+        else:
+            for table in reversed(db.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+def populate(db, scale=1.0, seed=1234, password=PASSWORD, overrides=None, log=print):
+    """
+    Fills the (empty) tables of the current app's database. `overrides` sets
+    individual table sizes, e.g. {'activity_logs': 5_000_000}. Returns the
+    row count per table.
+    """
+    from app.models import User
+
+    counts = scaled_counts(scale, overrides)
+    # Hashing is deliberately slow, so it is done once and shared by every user
+    hasher = User()
+    hasher.set_password(password)
+    tables = db.metadata.tables
+    written = {}
+
+    with db.engine.begin() as conn:
+        use_copy = conn.dialect.name == 'postgresql'
+        for table_name, rows in generate(counts, seed, hasher.password_hash):
+            if not rows:
+                continue
+            start = time.perf_counter()
+            if use_copy:
+                _copy_rows(conn, table_name, rows)
+            else:
+                conn.execute(insert(tables[table_name]), rows)
+            written[table_name] = written.get(table_name, 0) + len(rows)
+            if log and written[table_name] % (BATCH_SIZE * 20) == 0:
+                log(f"  {table_name}: {written[table_name]:,} rows ({(time.perf_counter() - start) * 1000:.0f} ms/batch)")
+
+        if conn.dialect.name == 'postgresql':
+            # Ids were given explicitly, so move each sequence past them
+            for table_name in written:
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table_name}))"
+                ))
+    return written
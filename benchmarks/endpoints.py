@@ -0,0 +1,265 @@
+"""
+Endpoint latency and SQL statement counts on a production-sized dataset
+
+Builds the synthetic dataset from benchmarks/dataset.py (50 cohorts, 10k
+users, 20k projects, 200k tasks, 1M activity rows at --scale 1), then times
+each endpoint through the Flask test client and counts the SQL statements
+it runs. Results (pytest-benchmark style stats plus query counts and the git
+commit) are written as JSON so runs can be compared across commits.
+
+Without --database-url a SQLite file in the temp directory is used and kept
+between runs of the same scale, seed and schema, so only the first run pays
+for generating the data.
+
+Usage:
+    python benchmarks/endpoints.py
+    python benchmarks/endpoints.py --scale 0.1 --iterations 20 --only list_projects --only login
+    python benchmarks/endpoints.py --database-url postgresql://localhost/projectx_bench --output results.json
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from benchmarks import dataset  # noqa: E402
+
+Case = namedtuple('Case', 'name method path body auth')
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples_ms):
+    """
+    pytest-benchmark's stats (in ms) plus p95 / p99
+    """
+    quartiles = statistics.quantiles(samples_ms, n=4) if len(samples_ms) > 1 else [samples_ms[0]] * 3
+    mean = statistics.mean(samples_ms)
+    return {
+        'min': min(samples_ms),
+        'max': max(samples_ms),
+        'mean': mean,
+        'stddev': statistics.stdev(samples_ms) if len(samples_ms) > 1 else 0.0,
+        'median': statistics.median(samples_ms),
+        'iqr': quartiles[2] - quartiles[0],
+        'p95': percentile(samples_ms, 95),
+        'p99': percentile(samples_ms, 99),
+        'ops': 1000 / mean if mean else 0.0,
+        'rounds': len(samples_ms),
+    }
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True)
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        return commit.stdout.strip(), bool(status.stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def schema_fingerprint():
+    # A cached dataset is only reused while the models it was built from are unchanged
+    with open(os.path.join(ROOT, 'app', 'models.py'), 'rb') as fh:
+        return hashlib.sha1(fh.read()).hexdigest()[:10]
+
+
+class StatementCounter:
+    """
+    Counts every statement sent to the database through `engine`
+    """
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def pick_targets(db):
+    """
+    The rows to benchmark against: the project with the most tasks and the
+    student with the most pending invitations, i.e. the heaviest real pages
+    """
+    from sqlalchemy import func, select
+    from app.models import Task, ProjectMember
+
+    project_id = db.session.execute(
+        select(Task.project_id).group_by(Task.project_id).order_by(func.count().desc(), Task.project_id).limit(1)
+    ).scalar()
+    student_id = db.session.execute(
+        select(ProjectMember.user_id).where(ProjectMember.status == 'pending', ProjectMember.user_id != 1)
+        .group_by(ProjectMember.user_id).order_by(func.count().desc(), ProjectMember.user_id).limit(1)
+    ).scalar()
+    return {'project_id': project_id, 'student_email': dataset.student_email(student_id)}
+
+
+def build_cases(targets):
+    project_id = targets['project_id']
+    return [
+        Case('list_projects', 'GET', '/projects?page=1&per_page=20', None, 'student'),
+        Case('get_project', 'GET', f'/projects/{project_id}', None, 'student'),
+        Case('get_tasks_by_project', 'GET', f'/tasks/project/{project_id}', None, None),
+        Case('get_pending_invitations', 'GET', '/members/invitations/pending', None, 'student'),
+        Case('list_activities', 'GET', '/activities/activities?page=1&per_page=20', None, 'admin'),
+        Case('login', 'POST', '/auth/login', {'email': targets['student_email'], 'password': dataset.PASSWORD}, None),
+    ]
+
+
+def login(client, email):
+    res = client.post('/auth/login', json={'email': email, 'password': dataset.PASSWORD})
+    if res.status_code != 200:
+        raise RuntimeError(f"Login as {email} failed with {res.status_code}: {res.get_json()}")
+    return {'Authorization': f"Bearer {res.get_json()['token']}"}
+
+
+def run_case(client, counter, case, headers, iterations, warmup):
+    def call():
+        res = client.open(case.path, method=case.method, json=case.body, headers=headers.get(case.auth, {}))
+        if res.status_code >= 400:
+            raise RuntimeError(f"{case.name}: {case.method} {case.path} returned {res.status_code}")
+
+    for _ in range(warmup):
+        call()
+
+    samples, queries = [], []
+    for _ in range(iterations):
+        before = counter.count
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count - before)
+
+    return {
+        'name': case.name,
+        'method': case.method,
+        'path': case.path,
+        'stats': summarize(samples),
+        'queries': {'median': statistics.median(queries), 'max': max(queries)},
+    }
+
+
+def run_benchmarks(scale=1.0, seed=1234, iterations=30, warmup=3, only=None, database_url=None, reuse=False,
+                   log=print):
+    """
+    Runs the suite and returns the results document (see --output)
+    """
+    if not database_url:
+        path = os.path.join(tempfile.gettempdir(), f'projectx-bench-{scale:g}-{seed}-{schema_fingerprint()}.db')
+        database_url = f'sqlite:///{path}'
+        reuse = True
+    # Config is read from the environment when the app package is imported
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['RATE_LIMIT_ENABLED'] = 'false'  # the login case would be throttled
+
+    from run import create_app
+    from app.models import db, User
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        existing = db.session.execute(db.select(db.func.count()).select_from(User)).scalar()
+        if existing and not reuse:
+            raise SystemExit("The database already has users; pass --reuse to benchmark its data as-is")
+        if not existing:
+            log(f"Generating dataset (scale {scale:g}, seed {seed})...")
+            start = time.perf_counter()
+            dataset.populate(db, scale, seed, log=log)
+            log(f"Dataset ready in {time.perf_counter() - start:.0f}s")
+
+        counts = {
+            table.name: db.session.execute(db.select(db.func.count()).select_from(table)).scalar()
+            for table in db.metadata.sorted_tables
+            if table.name in ('cohorts', 'users', 'projects', 'project_members', 'tasks', 'activity_logs')
+        }
+        targets = pick_targets(db)
+        counter = StatementCounter(db.engine)
+        db.session.remove()
+
+    log(format_header())
+    client = app.test_client()
+    headers = {'admin': login(client, dataset.ADMIN_EMAIL), 'student': login(client, targets['student_email'])}
+
+    results = []
+    for case in build_cases(targets):
+        if only and case.name not in only:
+            continue
+        results.append(run_case(client, counter, case, headers, iterations, warmup))
+        log(format_row(results[-1]))
+
+    commit, dirty = git_commit()
+    return {
+        'meta': {
+            'commit': commit,
+            'dirty': dirty,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': database_url.split(':', 1)[0],
+            'scale': scale,
+            'seed': seed,
+            'iterations': iterations,
+            'warmup': warmup,
+            'counts': counts,
+            'targets': targets,
+        },
+        'benchmarks': results,
+    }
+
+
+def format_header():
+    return f"{'endpoint':<26}{'median ms':>11}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>9}{'queries':>9}"
+
+
+def format_row(result):
+    s = result['stats']
+    return (f"{result['name']:<26}{s['median']:>11.2f}{s['p95']:>10.2f}{s['p99']:>10.2f}"
+            f"{s['ops']:>9.1f}{result['queries']['median']:>9g}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1.0, help='dataset size relative to the defaults above')
+    parser.add_argument('--seed', type=int, default=1234, help='random seed for the dataset')
+    parser.add_argument('--iterations', type=int, default=30, help='timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=3, help='untimed requests per endpoint first')
+    parser.add_argument('--only', action='append', help='endpoint name to run, repeatable')
+    parser.add_argument('--database-url', help='benchmark this database instead of a temp SQLite file')
+    parser.add_argument('--reuse', action='store_true', help='use the data already in --database-url')
+    parser.add_argument('--output', help='results file (default benchmarks/results/<commit>.json)')
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.scale, args.seed, args.iterations, args.warmup, args.only,
+                            args.database_url, args.reuse, log=lambda line: print(line, flush=True))
+
+    output = args.output or os.path.join(
+        ROOT, 'benchmarks', 'results', f"{(report['meta']['commit'] or 'unknown')[:12]}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\nResults written to {os.path.relpath(output)}")
+
+
+if __name__ == '__main__':
+    main()
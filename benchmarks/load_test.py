@@ -0,0 +1,295 @@
+"""
+Mixed-workload load generator for a running server
+
+Each virtual user (a thread with its own keep-alive connection) logs in as a
+different seeded student and then loops over weighted user journeys until
+--duration runs out:
+
+    dashboard     GET /projects, GET /members/invitations/pending
+    board         GET /projects/<id>, GET /tasks/project/<id>
+    move_task     GET /tasks/project/<id>, PUT /tasks/<id> (next status)
+    invitations   POST /members/projects/<own id>/invite, then accept a
+                  pending invitation if there is one
+
+Reports throughput, p50/p95/p99 latency and error rate per route. Uses only
+the standard library.
+
+The server must hold the synthetic dataset (seed.py --scale, or
+benchmarks/endpoints.py) at the --scale given here, and should run with
+RATE_LIMIT_ENABLED=false, since every virtual user logs in from one IP:
+
+    RATE_LIMIT_ENABLED=false gunicorn -c gunicorn.conf.py wsgi:app
+
+Usage:
+    python benchmarks/load_test.py --concurrency 16 --duration 60
+    python benchmarks/load_test.py --base-url http://127.0.0.1:5000 --mix dashboard=5,board=3,move_task=1
+    python benchmarks/load_test.py --concurrency 32 --ramp-up 10 --json load.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from benchmarks import dataset  # noqa: E402
+from benchmarks.endpoints import percentile  # noqa: E402
+
+DEFAULT_MIX = {'dashboard': 5, 'board': 3, 'move_task': 2, 'invitations': 1}
+NEXT_STATUS = {'To Do': 'In Progress', 'In Progress': 'Done', 'Done': 'To Do'}
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = defaultdict(int)
+        self.errors = 0
+
+
+class VirtualUser(threading.Thread):
+    """
+    One simulated student. Keeps its results in its own dict so threads
+    never contend on a lock; they are merged after the run.
+    """
+    def __init__(self, index, args, counts, deadline, start_at):
+        super().__init__(name=f'vu-{index}', daemon=True)
+        self.args = args
+        self.counts = counts
+        self.deadline = deadline
+        self.start_at = start_at
+        self.rng = random.Random(args.seed + index)
+        # Students are users 2..N; spread the virtual users over them
+        self.user_id = 2 + (index * 7919) % max(counts['users'] - 1, 1)
+        self.token = None
+        self.own_project_id = None
+        self.stats = defaultdict(RouteStats)
+        self.journeys = defaultdict(int)
+        url = urlsplit(args.base_url)
+        self.conn_args = (url.hostname, url.port or (443 if url.scheme == 'https' else 80))
+        self.https = url.scheme == 'https'
+        self.conn = None
+
+    # -----------------------------
+    # HTTP
+    # -----------------------------
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        self.conn = cls(*self.conn_args, timeout=self.args.timeout)
+
+    def request(self, label, method, path, body=None, expected=(200,)):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        payload = json.dumps(body).encode() if body is not None else None
+        stats = self.stats[label]
+
+        start = time.perf_counter()
+        try:
+            if self.conn is None:
+                self._connect()
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            raw = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            stats.errors += 1
+            stats.statuses['exception'] += 1
+            if self.conn is not None:
+                self.conn.close()
+            self.conn = None
+            return None, None
+        stats.latencies.append((time.perf_counter() - start) * 1000)
+        stats.statuses[status] += 1
+        if status not in expected:
+            stats.errors += 1
+        if status == 401 and self.token:
+            # Access token expired: log in again before the next journey
+            self.token = None
+        try:
+            data = json.loads(raw) if raw else None
+        except ValueError:
+            data = None
+        return status, data
+
+    def login(self):
+        self.token = None
+        status, data = self.request('POST /auth/login', 'POST', '/auth/login', {
+            'email': dataset.student_email(self.user_id), 'password': dataset.PASSWORD
+        })
+        if status == 200:
+            self.token = data['token']
+        return self.token is not None
+
+    # -----------------------------
+    # Journeys
+    # -----------------------------
+    def random_project(self):
+        return self.rng.randint(1, self.counts['projects'])
+
+    def dashboard(self):
+        page = self.rng.randint(1, 5)
+        self.request('GET /projects', 'GET', f'/projects?page={page}&per_page=20')
+        self.request('GET /members/invitations/pending', 'GET', '/members/invitations/pending')
+
+    def board(self):
+        project_id = self.random_project()
+        self.request('GET /projects/<id>', 'GET', f'/projects/{project_id}', expected=(200, 404))
+        self.request('GET /tasks/project/<id>', 'GET', f'/tasks/project/{project_id}')
+
+    def move_task(self):
+        project_id = self.random_project()
+        data = self.request('GET /tasks/project/<id>', 'GET', f'/tasks/project/{project_id}')[1]
+        tasks = (data or {}).get('tasks') or []
+        if tasks:
+            task = self.rng.choice(tasks)
+            self.request('PUT /tasks/<id>', 'PUT', f"/tasks/{task['id']}",
+                         {'status': NEXT_STATUS.get(task['status'], 'To Do')})
+
+    def invitations(self):
+        if self.own_project_id is None:
+            status, data = self.request('POST /projects', 'POST', '/projects', {
+                'name': f'Load test project {self.user_id}', 'class_id': 1, 'cohort_id': 1
+            }, expected=(201,))
+            if status != 201:
+                return
+            self.own_project_id = data['id']
+        invitee = self.rng.randint(2, max(self.counts['users'], 2))
+        # 400: that student is already a member or invited
+        self.request('POST /members/projects/<id>/invite', 'POST', f'/members/projects/{self.own_project_id}/invite',
+                     {'email': dataset.student_email(invitee)}, expected=(201, 400))
+
+        _, pending = self.request('GET /members/invitations/pending', 'GET', '/members/invitations/pending')
+        if pending:
+            self.request('POST /members/projects/<id>/respond', 'POST',
+                         f"/members/projects/{pending[0]['project_id']}/respond", {'action': 'accept'},
+                         expected=(200, 404))
+
+    def run(self):
+        time.sleep(max(self.start_at - time.time(), 0))
+        names = list(self.args.mix)
+        weights = [self.args.mix[name] for name in names]
+        while time.time() < self.deadline:
+            if not self.token and not self.login():
+                time.sleep(1)
+                continue
+            journey = self.rng.choices(names, weights)[0]
+            getattr(self, journey)()
+            self.journeys[journey] += 1
+            if self.args.think_time:
+                time.sleep(self.rng.expovariate(1000 / self.args.think_time))
+        if self.conn is not None:
+            self.conn.close()
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown journey '{name}' (choose from {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def merge(users):
+    routes = defaultdict(RouteStats)
+    journeys = defaultdict(int)
+    for user in users:
+        for label, stats in user.stats.items():
+            merged = routes[label]
+            merged.latencies.extend(stats.latencies)
+            merged.errors += stats.errors
+            for status, n in stats.statuses.items():
+                merged.statuses[status] += n
+        for name, n in user.journeys.items():
+            journeys[name] += n
+    return routes, journeys
+
+
+def summarize(routes, elapsed):
+    summary = {}
+    for label, stats in sorted(routes.items()):
+        total = sum(stats.statuses.values())
+        summary[label] = {
+            'requests': total,
+            'throughput': total / elapsed,
+            'p50': percentile(stats.latencies, 50) if stats.latencies else None,
+            'p95': percentile(stats.latencies, 95) if stats.latencies else None,
+            'p99': percentile(stats.latencies, 99) if stats.latencies else None,
+            'max': max(stats.latencies) if stats.latencies else None,
+            'errors': stats.errors,
+            'error_rate': stats.errors / total if total else 0.0,
+            'statuses': {str(k): v for k, v in sorted(stats.statuses.items(), key=lambda item: str(item[0]))},
+        }
+    return summary
+
+
+def ms(value):
+    return f'{value:.1f}' if value is not None else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000', help='server to load')
+    parser.add_argument('--concurrency', type=int, default=8, help='virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to run after ramp-up starts')
+    parser.add_argument('--ramp-up', type=float, default=0, help='seconds over which virtual users start')
+    parser.add_argument('--think-time', type=float, default=0, help='mean pause between journeys, ms')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='journey weights, e.g. dashboard=5,board=3,move_task=2,invitations=1')
+    parser.add_argument('--scale', type=float, default=1.0, help='scale the server\'s dataset was seeded with')
+    parser.add_argument('--seed', type=int, default=1234, help='random seed for the virtual users')
+    parser.add_argument('--timeout', type=float, default=30, help='per-request timeout, seconds')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    counts = dataset.scaled_counts(args.scale)
+    start = time.time()
+    deadline = start + args.duration
+    users = [
+        VirtualUser(i, args, counts, deadline, start + args.ramp_up * i / args.concurrency)
+        for i in range(args.concurrency)
+    ]
+    print(f"{args.concurrency} virtual users against {args.base_url} for {args.duration:g}s...", flush=True)
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    elapsed = time.time() - start
+
+    routes, journeys = merge(users)
+    summary = summarize(routes, elapsed)
+    total = sum(r['requests'] for r in summary.values())
+    errors = sum(r['errors'] for r in summary.values())
+
+    print(f"\n{'route':<40}{'reqs':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>9}")
+    for label, r in summary.items():
+        print(f"{label:<40}{r['requests']:>8}{r['throughput']:>9.1f}{ms(r['p50']):>9}{ms(r['p95']):>9}"
+              f"{ms(r['p99']):>9}{r['error_rate'] * 100:>8.1f}%")
+    print(f"\n{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s, "
+          f"{errors / total * 100 if total else 0:.2f}% errors")
+    print("Journeys: " + ', '.join(f'{name} {n}' for name, n in sorted(journeys.items())))
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump({
+                'config': {k: v for k, v in vars(args).items() if k != 'json'},
+                'elapsed': elapsed,
+                'requests': total,
+                'throughput': total / elapsed,
+                'errors': errors,
+                'journeys': dict(journeys),
+                'routes': summary,
+            }, fh, indent=2)
+    return 1 if total == 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
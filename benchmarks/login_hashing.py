@@ -0,0 +1,122 @@
+"""
+Login latency per password hashing setting
+
+Runs /auth/login against a throwaway SQLite database for each hashing policy
+and reports mean / p50 / p95 latency, sequentially and with concurrent logins.
+
+Usage:
+    python benchmarks/login_hashing.py
+    python benchmarks/login_hashing.py --requests 20 --concurrency 8 --verify-threads 2
+    python benchmarks/login_hashing.py --setting pbkdf2:sha256:300000 --setting scrypt:16384
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+DEFAULT_SETTINGS = [
+    'scrypt:16384',
+    'scrypt:32768',
+    'scrypt:65536',
+    'pbkdf2:sha256:100000',
+    'pbkdf2:sha256:300000',
+    'pbkdf2:sha256:600000',
+]
+
+
+def parse_setting(setting):
+    """'scrypt:32768' -> ('scrypt', 32768); 'pbkdf2:sha256:600000' -> ('pbkdf2:sha256', 600000)"""
+    algorithm, _, iterations = setting.rpartition(':')
+    return algorithm, int(iterations)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed_login(app):
+    client = app.test_client()
+    start = time.perf_counter()
+    res = client.post('/auth/login', json={'email': 'bench@example.com', 'password': 'benchpass'})
+    elapsed = (time.perf_counter() - start) * 1000
+    if res.status_code != 200:
+        raise RuntimeError(f"Login failed with {res.status_code}: {res.get_json()}")
+    return elapsed
+
+
+def run_setting(create_app, db, User, setting, requests, concurrency, verify_threads):
+    algorithm, iterations = parse_setting(setting)
+    with contextlib.redirect_stdout(io.StringIO()):
+        app = create_app()
+    app.config.update({
+        'PASSWORD_HASH_ALGORITHM': algorithm,
+        'PASSWORD_HASH_ITERATIONS': iterations,
+        'PASSWORD_VERIFY_THREADS': verify_threads,
+    })
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(name='Bench', email='bench@example.com', role='Student')
+        start = time.perf_counter()
+        user.set_password('benchpass')
+        hash_ms = (time.perf_counter() - start) * 1000
+        db.session.add(user)
+        db.session.commit()
+
+    timed_login(app)  # warm up
+    sequential = [timed_login(app) for _ in range(requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        concurrent = list(pool.map(lambda _: timed_login(app), range(requests)))
+    wall = time.perf_counter() - start
+
+    return {
+        'setting': setting,
+        'hash_ms': hash_ms,
+        'mean': statistics.mean(sequential),
+        'p50': percentile(sequential, 50),
+        'p95': percentile(sequential, 95),
+        'concurrent_p95': percentile(concurrent, 95),
+        'throughput': requests / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--setting', action='append', help='algorithm:iterations, repeatable')
+    parser.add_argument('--requests', type=int, default=10, help='logins per setting')
+    parser.add_argument('--concurrency', type=int, default=4, help='threads for the concurrent run')
+    parser.add_argument('--verify-threads', type=int, default=0, help='PASSWORD_VERIFY_THREADS for the run (0 = unbounded)')
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_file.name}"
+    os.environ['RATE_LIMIT_ENABLED'] = 'false'  # every login comes from one client
+
+    from run import create_app
+    from app.models import db, User
+
+    print(f"{'setting':<24}{'hash ms':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'conc p95':>10}{'logins/s':>10}")
+    try:
+        for setting in args.setting or DEFAULT_SETTINGS:
+            r = run_setting(create_app, db, User, setting, args.requests, args.concurrency, args.verify_threads)
+            print(f"{r['setting']:<24}{r['hash_ms']:>10.1f}{r['mean']:>10.1f}{r['p50']:>10.1f}"
+                  f"{r['p95']:>10.1f}{r['concurrent_p95']:>10.1f}{r['throughput']:>10.1f}")
+    finally:
+        os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
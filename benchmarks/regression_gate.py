@@ -0,0 +1,168 @@
+"""
+Fail when an endpoint gets slower or runs more SQL than the committed baseline
+
+Runs benchmarks/endpoints.py with the scale, seed and iteration count
+recorded in the baseline (or reads an existing results file with
+--results), compares each endpoint's latency percentiles and SQL statement
+count against benchmarks/baseline.json and prints a table. Exits 1 when
+any endpoint regressed, 2 when the results can't be compared.
+
+An endpoint regresses when a percentile exceeds the baseline by more than
+--latency-tolerance (relative) AND --min-latency-delta-ms (absolute, so
+sub-millisecond noise never fails the gate), or when its median statement
+count exceeds the baseline by more than --query-tolerance. Per-endpoint
+overrides go in the baseline's "tolerances" object, e.g.
+    "tolerances": {"login": {"latency": 1.0}, "list_projects": {"queries": 2}}
+
+Latency baselines are only meaningful on the machine that recorded them;
+query counts are deterministic. Refresh the baseline after an intended
+change with --update-baseline and commit it.
+
+Usage:
+    python benchmarks/regression_gate.py
+    python benchmarks/regression_gate.py --results benchmarks/results/abc123.json
+    python benchmarks/regression_gate.py --latency-tolerance 0.5 --percentile median --percentile p99
+    python benchmarks/regression_gate.py --update-baseline
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+COMPARABLE_META = ('database', 'scale', 'seed')
+
+OK, FAIL, NEW, MISSING = 'ok', 'REGRESSED', 'new', 'MISSING'
+
+
+def load(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def tolerance_for(baseline, name, args):
+    override = baseline.get('tolerances', {}).get(name, {})
+    return {
+        'latency': override.get('latency', args.latency_tolerance),
+        'min_delta_ms': override.get('min_delta_ms', args.min_latency_delta_ms),
+        'queries': override.get('queries', args.query_tolerance),
+    }
+
+
+def compare(baseline, current, args):
+    """
+    One row per endpoint: (name, metric comparisons, status)
+    """
+    base_by_name = {b['name']: b for b in baseline['benchmarks']}
+    current_by_name = {b['name']: b for b in current['benchmarks']}
+    rows = []
+
+    for name, result in current_by_name.items():
+        base = base_by_name.get(name)
+        if base is None:
+            rows.append((name, [], NEW))
+            continue
+        tol = tolerance_for(baseline, name, args)
+        checks = []
+        for pct in args.percentile:
+            before, after = base['stats'][pct], result['stats'][pct]
+            limit = max(before * (1 + tol['latency']), before + tol['min_delta_ms'])
+            checks.append((f'{pct} ms', before, after, after > limit))
+        before, after = base['queries']['median'], result['queries']['median']
+        checks.append(('queries', before, after, after > before + tol['queries']))
+        rows.append((name, checks, FAIL if any(c[3] for c in checks) else OK))
+
+    for name in base_by_name:
+        if name not in current_by_name:
+            rows.append((name, [], MISSING))
+    return rows
+
+
+def change(before, after):
+    if not before:
+        return '' if not after else '+inf'
+    return f'{(after - before) / before * 100:+.0f}%'
+
+
+def format_table(rows):
+    lines = [f"{'endpoint':<26}{'metric':<12}{'baseline':>10}{'current':>10}{'change':>9}  status"]
+    for name, checks, status in rows:
+        if not checks:
+            lines.append(f"{name:<26}{'':<12}{'':>10}{'':>10}{'':>9}  {status}")
+            continue
+        for i, (metric, before, after, failed) in enumerate(checks):
+            lines.append(
+                f"{name if i == 0 else '':<26}{metric:<12}{before:>10.2f}{after:>10.2f}{change(before, after):>9}  "
+                f"{FAIL if failed else OK}"
+            )
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline results file')
+    parser.add_argument('--results', help='compare this results file instead of running the benchmarks')
+    parser.add_argument('--latency-tolerance', type=float, default=0.5,
+                        help='allowed relative latency increase (0.5 = +50%%)')
+    parser.add_argument('--min-latency-delta-ms', type=float, default=5.0,
+                        help='latency increases below this many ms never fail')
+    parser.add_argument('--query-tolerance', type=int, default=0, help='allowed extra SQL statements per request')
+    parser.add_argument('--percentile', action='append', choices=['median', 'mean', 'p95', 'p99'],
+                        help='latency statistic to compare, repeatable (default: median and p95)')
+    parser.add_argument('--update-baseline', action='store_true', help='write the new results as the baseline')
+    args = parser.parse_args()
+    args.percentile = args.percentile or ['median', 'p95']
+
+    baseline = load(args.baseline) if os.path.exists(args.baseline) else None
+
+    if args.results:
+        current = load(args.results)
+    else:
+        from benchmarks.endpoints import run_benchmarks
+        meta = (baseline or {}).get('meta', {})
+        current = run_benchmarks(
+            scale=meta.get('scale', 0.1), seed=meta.get('seed', 1234),
+            iterations=meta.get('iterations', 30), warmup=meta.get('warmup', 3),
+            log=lambda line: print(line, file=sys.stderr, flush=True)
+        )
+
+    if args.update_baseline:
+        if baseline and 'tolerances' in baseline:
+            current['tolerances'] = baseline['tolerances']
+        with open(args.baseline, 'w') as fh:
+            json.dump(current, fh, indent=2)
+            fh.write('\n')
+        print(f"Baseline written to {os.path.relpath(args.baseline)}")
+        return 0
+
+    if baseline is None:
+        print(f"No baseline at {os.path.relpath(args.baseline)}; create one with --update-baseline")
+        return 2
+
+    mismatched = [
+        f"{key}: baseline {baseline['meta'].get(key)!r}, current {current['meta'].get(key)!r}"
+        for key in COMPARABLE_META if baseline['meta'].get(key) != current['meta'].get(key)
+    ]
+    if mismatched:
+        print("Results were produced under different conditions than the baseline:\n  " + '\n  '.join(mismatched))
+        return 2
+
+    rows = compare(baseline, current, args)
+    print(f"Baseline {(baseline['meta'].get('commit') or 'unknown')[:12]} vs "
+          f"current {(current['meta'].get('commit') or 'unknown')[:12]}"
+          f"{' (uncommitted changes)' if current['meta'].get('dirty') else ''}\n")
+    print(format_table(rows))
+
+    failed = [name for name, _, status in rows if status in (FAIL, MISSING)]
+    if failed:
+        print(f"\n{len(failed)} endpoint(s) regressed: {', '.join(failed)}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+App startup time and per-worker memory
+
+Measures, in fresh interpreters, how long `import run` and `create_app()` take,
+the resident memory afterwards and the slowest top-level imports. With
+--gunicorn it also boots gunicorn.conf.py with and without preload_app and
+reports boot time plus RSS / PSS per worker (PSS counts shared pages
+fractionally, so it shows what copy-on-write sharing saves). Linux only for
+the memory figures.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 5 --top 15
+    python benchmarks/startup.py --gunicorn --workers 4
+"""
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+PROBE = r"""
+import contextlib, io, json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import run
+imported = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    run.create_app()
+created = time.perf_counter()
+rss_kb = 0
+with open('/proc/self/status') as fh:
+    for line in fh:
+        if line.startswith('VmRSS:'):
+            rss_kb = int(line.split()[1])
+print(json.dumps({{'import_ms': (imported - start) * 1000, 'create_ms': (created - imported) * 1000, 'rss_kb': rss_kb}}))
+"""
+
+
+def bench_env():
+    env = dict(os.environ)
+    env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.gettempdir(), 'startup_bench.db')}")
+    return env
+
+
+def probe_once(env):
+    out = subprocess.run(
+        [sys.executable, '-c', PROBE.format(root=ROOT)],
+        capture_output=True, text=True, env=env, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def slowest_imports(env, top):
+    """
+    Top-level packages by cumulative import time, from python -X importtime
+    """
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import run'],
+        capture_output=True, text=True, env=env, cwd=ROOT
+    ).stderr
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        # Indented two spaces per nesting level; level 1 is what run.py imports directly
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        if level == 1:
+            package = name.strip().split('.')[0]
+            totals[package] = totals.get(package, 0) + int(cumulative)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def read_memory_kb(pid):
+    memory = {'rss': 0, 'pss': 0}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as fh:
+            for line in fh:
+                if line.startswith('Rss:'):
+                    memory['rss'] = int(line.split()[1])
+                elif line.startswith('Pss:'):
+                    memory['pss'] = int(line.split()[1])
+    except OSError:
+        pass
+    return memory
+
+
+def child_pids(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as fh:
+            return [int(p) for p in fh.read().split()]
+    except OSError:
+        return []
+
+
+def bench_gunicorn(env, workers, preload, port):
+    env = dict(env, WEB_CONCURRENCY=str(workers), PORT=str(port), GUNICORN_PRELOAD=str(preload).lower())
+    cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            if len(child_pids(proc.pid)) >= workers:
+                try:
+                    urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1).read()
+                    break
+                except OSError:
+                    pass
+            time.sleep(0.05)
+        else:
+            raise RuntimeError('gunicorn did not come up within 60s')
+        boot_ms = (time.perf_counter() - start) * 1000
+        time.sleep(1)  # let every worker finish booting
+
+        return {
+            'preload': preload,
+            'boot_ms': boot_ms,
+            'master': read_memory_kb(proc.pid),
+            'workers': [read_memory_kb(pid) for pid in child_pids(proc.pid)],
+        }
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters to time')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports to list')
+    parser.add_argument('--gunicorn', action='store_true', help='also boot gunicorn with and without preload_app')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers for --gunicorn')
+    parser.add_argument('--port', type=int, default=8765, help='port for --gunicorn')
+    args = parser.parse_args()
+
+    env = bench_env()
+    runs = [probe_once(env) for _ in range(args.runs)]
+    print(f"{'import run':<20}{statistics.median(r['import_ms'] for r in runs):>10.0f} ms (median of {args.runs})")
+    print(f"{'create_app()':<20}{statistics.median(r['create_ms'] for r in runs):>10.0f} ms")
+    print(f"{'RSS after startup':<20}{statistics.median(r['rss_kb'] for r in runs) / 1024:>10.1f} MB")
+
+    print("\nSlowest imports (cumulative):")
+    for package, micros in slowest_imports(env, args.top):
+        print(f"  {package:<28}{micros / 1000:>8.1f} ms")
+
+    if args.gunicorn:
+        print(f"\n{'preload':<10}{'boot ms':>10}{'master RSS':>12}{'worker RSS':>12}{'worker PSS':>12}{'total PSS':>12}")
+        for preload in (False, True):
+            r = bench_gunicorn(env, args.workers, preload, args.port)
+            worker_rss = statistics.mean(w['rss'] for w in r['workers']) / 1024
+            worker_pss = statistics.mean(w['pss'] for w in r['workers']) / 1024
+            total_pss = (r['master']['pss'] + sum(w['pss'] for w in r['workers'])) / 1024
+            print(f"{str(preload):<10}{r['boot_ms']:>10.0f}{r['master']['rss'] / 1024:>10.1f}MB"
+                  f"{worker_rss:>10.1f}MB{worker_pss:>10.1f}MB{total_pss:>10.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Gunicorn settings for production (render.yaml: gunicorn -c gunicorn.conf.py wsgi:app)
+
+preload_app imports the app once in the master and forks workers from it, so
+imported modules are shared copy-on-write instead of loaded once per worker.
+Everything that must not cross a fork (DB connections, writer/purge threads,
+thread pools) is reset in the child by os.register_at_fork hooks in app/utils.
+"""
+import gc
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Each worker writes its metric values to files here and /metrics merges them.
+# Must be set before prometheus_client is imported, i.e. before the app loads.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'projectx-metrics'))
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    # Values left by a previous master would be counted again
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's reach: otherwise the
+    # first GC pass in each worker touches (and so copies) every shared page
+    gc.freeze()
+
+
+def worker_exit(server, worker):
+    # Write out activity logs and spans still buffered in this worker
+    from app.utils.activity_log import flush_activity_logs
+    from app.utils.tracing import flush_traces
+    flush_activity_logs()
+    flush_traces()
+
+
+def child_exit(server, worker):
+    # Drop the dead worker's live-gauge files; its counters stay in the totals
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
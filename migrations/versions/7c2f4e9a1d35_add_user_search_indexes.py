@@ -0,0 +1,51 @@
+"""add user search indexes
+
+Revision ID: 7c2f4e9a1d35
+Revises: 0b8b3371672e
+Create Date: 2026-10-19 06:41:18.902114
+
+Expression indexes backing the admin user directory search on lower(name)
+and lower(email). On PostgreSQL with pg_trgm available they are GIN trigram
+indexes, which serve both prefix and substring LIKE; otherwise they are
+b-tree indexes, which serve prefix search only.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2f4e9a1d35'
+down_revision = '0b8b3371672e'
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = ('name', 'email')
+
+
+def _has_trgm(bind):
+    return bool(bind.execute(sa.text(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+    )).scalar())
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql' and _has_trgm(bind):
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for column in SEARCH_COLUMNS:
+            op.execute(f"CREATE INDEX ix_users_{column}_trgm ON users USING gin (lower({column}) gin_trgm_ops)")
+        return
+
+    # text_pattern_ops lets LIKE 'abc%' use the index under non-C collations
+    opclass = ' text_pattern_ops' if bind.dialect.name == 'postgresql' else ''
+    for column in SEARCH_COLUMNS:
+        op.execute(f"CREATE INDEX ix_users_{column}_lower ON users (lower({column}){opclass})")
+
+
+def downgrade():
+    # The extension is left installed; other objects may depend on it
+    for column in SEARCH_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS ix_users_{column}_trgm")
+        op.execute(f"DROP INDEX IF EXISTS ix_users_{column}_lower")
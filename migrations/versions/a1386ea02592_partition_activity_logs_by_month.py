@@ -0,0 +1,105 @@
+"""partition activity_logs by month
+
+Revision ID: a1386ea02592
+Revises: bc455a9acfcf
+Create Date: 2026-10-19 06:02:11.532907
+
+On PostgreSQL activity_logs becomes a table RANGE-partitioned by month on
+created_at (plus a DEFAULT partition), with existing rows copied across.
+Other databases (SQLite in development) keep a plain table and only get the
+created_at index.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1386ea02592'
+down_revision = 'bc455a9acfcf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('activity_logs', schema=None) as batch_op:
+            batch_op.alter_column('created_at',
+                   existing_type=sa.DateTime(timezone=True),
+                   nullable=False)
+            batch_op.create_index(batch_op.f('ix_activity_logs_created_at'), ['created_at'], unique=False)
+        return
+
+    op.execute("ALTER TABLE activity_logs RENAME TO activity_logs_legacy")
+    op.execute("ALTER TABLE activity_logs_legacy RENAME CONSTRAINT activity_logs_pkey TO activity_logs_legacy_pkey")
+    op.execute("ALTER SEQUENCE activity_logs_id_seq OWNED BY NONE")
+
+    # The partition key must be part of the primary key
+    op.execute("""
+        CREATE TABLE activity_logs (
+            id INTEGER NOT NULL DEFAULT nextval('activity_logs_id_seq'),
+            user_id INTEGER REFERENCES users (id),
+            action VARCHAR(255) NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("CREATE TABLE activity_logs_default PARTITION OF activity_logs DEFAULT")
+
+    # One partition per month from the oldest row through three months ahead
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start date := date_trunc('month', COALESCE((SELECT min(created_at) FROM activity_logs_legacy), now()));
+            last_month date := date_trunc('month', now() + interval '3 months');
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF activity_logs FOR VALUES FROM (%L) TO (%L)',
+                    'activity_logs_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM'),
+                    month_start,
+                    month_start + interval '1 month'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$;
+    """)
+
+    # B-tree rather than BRIN: list_activities does ORDER BY created_at DESC LIMIT n,
+    # which a b-tree serves per partition through a merge append
+    op.execute("CREATE INDEX ix_activity_logs_created_at ON activity_logs (created_at)")
+
+    op.execute("""
+        INSERT INTO activity_logs (id, user_id, action, created_at)
+        SELECT id, user_id, action, COALESCE(created_at, now()) FROM activity_logs_legacy
+    """)
+    op.execute("DROP TABLE activity_logs_legacy")
+    op.execute("ALTER SEQUENCE activity_logs_id_seq OWNED BY activity_logs.id")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('activity_logs', schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f('ix_activity_logs_created_at'))
+            batch_op.alter_column('created_at',
+                   existing_type=sa.DateTime(timezone=True),
+                   nullable=True)
+        return
+
+    op.execute("ALTER SEQUENCE activity_logs_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE activity_logs RENAME TO activity_logs_partitioned")
+    op.execute("""
+        CREATE TABLE activity_logs (
+            id INTEGER NOT NULL DEFAULT nextval('activity_logs_id_seq'),
+            user_id INTEGER REFERENCES users (id),
+            action VARCHAR(255) NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT activity_logs_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("""
+        INSERT INTO activity_logs (id, user_id, action, created_at)
+        SELECT id, user_id, action, created_at FROM activity_logs_partitioned
+    """)
+    op.execute("DROP TABLE activity_logs_partitioned CASCADE")
+    op.execute("ALTER SEQUENCE activity_logs_id_seq OWNED BY activity_logs.id")
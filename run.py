@@ -2,27 +2,54 @@ import os
 from flask import Flask, request
 from flask_migrate import Migrate
 from flask_cors import CORS
-from flasgger import Swagger
 from app.config import Config
 from app.models import db
+from app.utils.db_engine import build_engine_options, init_engine
+from app.utils.profiling import init_profiling
+from app.utils.tracing import init_tracing
+from app.utils.metrics import init_metrics
+from app.utils.slow_queries import init_slow_query_log
+from app.utils.unit_of_work import init_unit_of_work
+from app.utils.pagination import init_pagination
+from app.utils.passwords import get_password_hash_method
+from app.utils.activity_partitions import activity_logs_cli
+from app.utils.soft_delete import init_soft_delete, deleted_cli
 
-# Import blueprints
-from app.routes.auth_routes import auth_routes
-from app.routes.user_routes import user_routes
-from app.routes.project_routes import project_routes
-from app.routes.cohort_routes import cohort_routes
-from app.routes.member_routes import member_routes
-from app.routes.activity_routes import activity_routes
-from app.routes.task_routes import task_bp
-from app.routes.class_routes import class_bp
+
+def register_blueprints(app):
+    # Imported here so `import run` stays cheap for tooling and the CLI
+    from app.routes.auth_routes import auth_routes
+    from app.routes.user_routes import user_routes
+    from app.routes.project_routes import project_routes
+    from app.routes.cohort_routes import cohort_routes
+    from app.routes.member_routes import member_routes
+    from app.routes.activity_routes import activity_routes
+    from app.routes.task_routes import task_bp
+    from app.routes.class_routes import class_bp
+    from app.routes.admin_routes import admin_routes
+
+    app.register_blueprint(auth_routes)
+    app.register_blueprint(user_routes)
+    app.register_blueprint(project_routes)
+    app.register_blueprint(cohort_routes)
+    app.register_blueprint(member_routes)
+    app.register_blueprint(activity_routes)
+    app.register_blueprint(task_bp)
+    app.register_blueprint(class_bp)
+    app.register_blueprint(admin_routes)
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    # Fail at startup, not on the first login, when the hashing policy is invalid
+    get_password_hash_method(app.config)
 
-    # Swagger setup
-    Swagger(app)
+    # Swagger setup: flasgger builds the spec on the first /apispec_1.json
+    # request and caches it. SWAGGER_ENABLED=false skips importing it at all.
+    if app.config.get('SWAGGER_ENABLED', True):
+        from flasgger import Swagger
+        Swagger(app)
 
     # ✅ Define base allowed origins (local + main production)
     allowed_origins = {
@@ -42,8 +69,8 @@ def create_app():
         supports_credentials=True,
         origins=list(allowed_origins) + ["*"],  # allow all temporarily
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-        allow_headers=["Content-Type", "Authorization"],
-        expose_headers=["Content-Type", "Authorization"],
+        allow_headers=["Content-Type", "Authorization", "X-Profile", "traceparent", "tracestate"],
+        expose_headers=["Content-Type", "Authorization", "X-Profile-Id", "traceresponse"],
     )
 
     # ✅ Optionally handle wildcard manually (for Vercel previews)
@@ -56,30 +83,49 @@ def create_app():
         return response
 
     # Initialize DB + migrations
+    # Pool sizing, pre-ping, recycle and timeouts come from the DB_* settings
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', build_engine_options(app.config))
     db.init_app(app)
+    init_engine(app, db)
     Migrate(app, db)
 
+    # Request / SQL / email / upload spans with W3C traceparent propagation;
+    # first in so the request span covers every other hook and the commit
+    init_tracing(app, db)
+
+    # Admin-only per-request profiling (X-Profile header / ?_profile); ahead of
+    # the hooks below so the profile covers them and the commit
+    init_profiling(app, db)
+
+    # Prometheus metrics at /metrics; registered before the unit of work so
+    # the recorded latency and status include the commit
+    init_metrics(app, db)
+
+    # Statements over SLOW_QUERY_THRESHOLD_MS go to the slow query log
+    init_slow_query_log(app, db)
+
+    # One transaction per request, committed once after the handler returns
+    init_unit_of_work(app)
+
+    # Soft-deleted users, projects and cohorts are hidden from ORM reads
+    init_soft_delete(app)
+
+    # Non-integer ?page / ?per_page answer 400
+    init_pagination(app)
+
+    # CLI: flask activity-logs ensure-partitions / archive, flask deleted purge
+    app.cli.add_command(activity_logs_cli)
+    app.cli.add_command(deleted_cli)
+
     # Register blueprints
-    app.register_blueprint(auth_routes)
-    app.register_blueprint(user_routes)
-    app.register_blueprint(project_routes)
-    app.register_blueprint(cohort_routes)
-    app.register_blueprint(member_routes)
-    app.register_blueprint(activity_routes)
-    app.register_blueprint(task_bp)
-    app.register_blueprint(class_bp)
+    register_blueprints(app)
 
     # Health check endpoint
     @app.route("/health")
     def health():
         return {"status": "ok"}
 
-    with app.app_context():
-        print("\n🚀 Registered Flask Routes:")
-        for rule in app.url_map.iter_rules():
-            methods = ",".join(rule.methods)
-            print(f"{rule.endpoint:30s} {methods:20s} {rule}")
-
+    # Startup stays quiet in every worker; list routes with `flask routes`
     return app
 
 
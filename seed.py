@@ -1,4 +1,18 @@
+"""
+Seeds the database.
+
+    python seed.py                      # a handful of demo and pytest accounts
+    python seed.py --scale 1            # synthetic load-test dataset: 10k users, 20k projects,
+                                        # 200k tasks, 1M activity rows (scales linearly)
+    python seed.py --scale 0.5 --activity-logs 5000000 --seed 7
+
+--scale wipes every table, then bulk loads deterministic rows (same --seed,
+same data) with COPY on PostgreSQL and one shared password hash; see
+benchmarks/dataset.py. Every account's password is --password.
+"""
+import argparse
 import os
+import time
 from datetime import datetime, date
 from app.models import db, User, Cohort, Project, ProjectMember, ActivityLog, Task, Class
 from run import create_app
@@ -10,11 +24,36 @@ from sqlalchemy import text
 ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD", "adminpass")
 STUDENT_PASSWORD = os.environ.get("STUDENT_PASSWORD", "studentpass")
 
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--scale', type=float, help='bulk load the synthetic dataset at this scale instead')
+parser.add_argument('--seed', type=int, default=1234, help='random seed for --scale')
+parser.add_argument('--activity-logs', type=int, help='activity rows for --scale (default 1M x scale)')
+parser.add_argument('--password', default='benchpass', help='password of every --scale account')
+args = parser.parse_args()
+
 # -----------------------------
 # Initialize app context
 # -----------------------------
 app = create_app()
 
+# -----------------------------
+# Bulk synthetic dataset (--scale)
+# -----------------------------
+if args.scale:
+    from benchmarks import dataset
+
+    with app.app_context():
+        print("⚠️ Clearing all tables...")
+        dataset.clear(db)
+        print(f"⚡ Bulk loading synthetic dataset (scale {args.scale:g}, seed {args.seed})...")
+        start = time.perf_counter()
+        written = dataset.populate(db, args.scale, args.seed, password=args.password,
+                                   overrides={'activity_logs': args.activity_logs})
+        print(f"🎉 Loaded {sum(written.values()):,} rows in {time.perf_counter() - start:.0f}s: "
+              + ', '.join(f"{name} {count:,}" for name, count in written.items()))
+        print(f"Admin: {dataset.ADMIN_EMAIL}; students: student<id>@bench.local; password: {args.password}")
+    raise SystemExit(0)
+
 with app.app_context():
     # -----------------------------
     # Truncate tables & reset identities
@@ -18,6 +18,10 @@ def app():
         ),
         "SECRET_KEY": "testsecretkey",
         "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        "TWO_FA_CODE_STORE": "memory",
+        "RATE_LIMIT_STORAGE": "memory",
+        "ACTIVITY_LOG_MODE": "sync",
+        "SOFT_DELETE_PURGE_INTERVAL_SECONDS": 0,
     })
 
     with app.app_context():
@@ -63,4 +63,91 @@ def test_list_activities_non_admin_denied(client, app):
 
     res = client.get('/activities/activities', headers=headers)
     assert res.status_code == 403
-    assert res.json['message'] == 'You are not authorized to access this resource.'
\ No newline at end of file
+    assert res.json['message'] == 'You are not authorized to access this resource.'
+
+
+# -----------------------------
+# Test: Project timeline only returns that project's events
+# -----------------------------
+def test_project_activity_timeline(client, app):
+    token = get_admin_token(client, app)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    admin_user = db.session.execute(
+        db.select(User).filter_by(email='admin@test.com')
+    ).scalar_one()
+    db.session.add_all([
+        ActivityLog(user_id=admin_user.id, action="Created project: A", entity_type='project', entity_id=1, verb='created'),
+        ActivityLog(user_id=admin_user.id, action="Created project: B", entity_type='project', entity_id=2, verb='created'),
+        ActivityLog(user_id=admin_user.id, action="Changed status of project A to Completed",
+                    entity_type='project', entity_id=1, verb='status_changed', details={'status': 'Completed'}),
+    ])
+    db.session.commit()
+
+    res = client.get('/projects/1/activity', headers=headers)
+    assert res.status_code == 200
+    assert res.json['total_items'] == 2
+    assert all(a['entity_id'] == 1 for a in res.json['items'])
+    assert {a['verb'] for a in res.json['items']} == {'created', 'status_changed'}
+
+
+# -----------------------------
+# Test: Admin feed filters by user and action prefix, and includes user names
+# -----------------------------
+def test_list_activities_filters(client, app):
+    token = get_admin_token(client, app)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    admin_user = db.session.execute(db.select(User).filter_by(email='admin@test.com')).scalar_one()
+    student = db.session.execute(db.select(User).filter_by(email='student1@example.com')).scalar_one()
+    db.session.add_all([
+        ActivityLog(user_id=admin_user.id, action="Created cohort: Alpha"),
+        ActivityLog(user_id=student.id, action="Joined cohort: Alpha"),
+        ActivityLog(user_id=student.id, action="Created project: X"),
+    ])
+    db.session.commit()
+
+    res = client.get(f'/activities/activities?user_id={student.id}&action=Created', headers=headers)
+    assert res.status_code == 200
+    assert [a['action'] for a in res.json['items']] == ["Created project: X"]
+    assert res.json['items'][0]['user_name'] == student.name
+
+    res = client.get('/activities/activities?since=not-a-date', headers=headers)
+    assert res.status_code == 400
+
+
+# -----------------------------
+# Test: archiving keeps every column
+# -----------------------------
+def test_archive_keeps_every_column(app, tmp_path):
+    import csv
+    import gzip
+    import json
+    from app.utils.activity_partitions import ARCHIVE_COLUMNS, archive_partitions
+
+    admin_user = db.session.execute(db.select(User).filter_by(email='admin@test.com')).scalar_one()
+    created_at = datetime(2020, 3, 15, 12, 30, tzinfo=timezone.utc)
+    log = ActivityLog(
+        user_id=admin_user.id, action="Updated project: Old", entity_type='project', entity_id=42,
+        verb='updated', details={'changes': {'status': ['To Do', 'Done']}}, created_at=created_at
+    )
+    db.session.add(log)
+    db.session.commit()
+    log_id = log.id
+
+    archived = archive_partitions(12, str(tmp_path))
+    assert [count for _, count in archived] == [1]
+
+    with gzip.open(archived[0][0], 'rt', newline='') as fh:
+        rows = list(csv.DictReader(fh))
+    assert list(rows[0]) == ARCHIVE_COLUMNS
+    row = rows[0]
+    assert int(row['id']) == log_id
+    assert int(row['user_id']) == admin_user.id
+    assert row['action'] == "Updated project: Old"
+    assert row['entity_type'] == 'project'
+    assert int(row['entity_id']) == 42
+    assert row['verb'] == 'updated'
+    assert json.loads(row['details']) == {'changes': {'status': ['To Do', 'Done']}}
+    assert datetime.fromisoformat(row['created_at']).replace(tzinfo=timezone.utc) == created_at
+    assert db.session.execute(db.select(ActivityLog.id).filter_by(id=log_id)).first() is None
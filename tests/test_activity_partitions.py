@@ -0,0 +1,131 @@
+import csv
+import gzip
+from datetime import datetime, timezone
+import pytest
+from app.models import User, ActivityLog, db
+from app.utils.activity_partitions import (
+    add_months, archive_partitions, ensure_partitions, month_start, partition_name, _create_partition
+)
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def admin_id():
+    return db.session.execute(db.select(User.id).filter_by(email='admin@test.com')).scalar_one()
+
+
+def add_log(action, created_at):
+    log = ActivityLog(user_id=admin_id(), action=action, created_at=created_at)
+    db.session.add(log)
+    db.session.commit()
+    return log.id
+
+
+def partition_of(log_id):
+    return db.session.execute(
+        db.text("SELECT tableoid::regclass::text FROM activity_logs WHERE id = :id"), {'id': log_id}
+    ).scalar()
+
+
+def read_archive(path):
+    with gzip.open(path, 'rt', newline='') as fh:
+        return list(csv.DictReader(fh))
+
+
+@pytest.fixture
+def partitioned(app):
+    """
+    Replaces the test database's activity_logs with the monthly partitioned
+    layout migration a1386ea02592 builds on PostgreSQL
+    """
+    if db.engine.dialect.name != 'postgresql':
+        pytest.skip('activity_logs is only partitioned on PostgreSQL')
+    db.session.execute(db.text("DROP TABLE activity_logs"))
+    db.session.execute(db.text("""
+        CREATE TABLE activity_logs (
+            id SERIAL,
+            user_id INTEGER REFERENCES users (id),
+            action VARCHAR(255) NOT NULL,
+            entity_type VARCHAR(50),
+            entity_id INTEGER,
+            verb VARCHAR(50),
+            details JSON,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """))
+    db.session.execute(db.text("CREATE TABLE activity_logs_default PARTITION OF activity_logs DEFAULT"))
+    db.session.commit()
+    return app
+
+# -----------------------------
+# Test: ensure-partitions
+# -----------------------------
+def test_ensure_partitions_creates_upcoming_months(partitioned):
+    current = month_start(datetime.now(timezone.utc))
+
+    created = ensure_partitions(months_ahead=2)
+    assert created == [partition_name(add_months(current, offset)) for offset in range(3)]
+    assert ensure_partitions(months_ahead=2) == []
+
+    log_id = add_log("This month", datetime.now(timezone.utc))
+    assert partition_of(log_id) == partition_name(current)
+
+
+def test_ensure_partitions_moves_rows_out_of_default(partitioned):
+    next_month = add_months(month_start(datetime.now(timezone.utc)), 1)
+    log_id = add_log("Ahead of its partition", datetime(next_month.year, next_month.month, 2, tzinfo=timezone.utc))
+    assert partition_of(log_id) == 'activity_logs_default'
+
+    ensure_partitions(months_ahead=1)
+
+    assert partition_of(log_id) == partition_name(next_month)
+    assert db.session.execute(db.text("SELECT count(*) FROM activity_logs_default")).scalar() == 0
+
+# -----------------------------
+# Test: archive
+# -----------------------------
+def test_archive_partitions_exports_then_drops(partitioned, tmp_path):
+    ensure_partitions(months_ahead=0)
+    old_month = add_months(month_start(datetime.now(timezone.utc)), -24)
+    _create_partition(partition_name(old_month), old_month, add_months(old_month, 1))
+    db.session.commit()
+    old_id = add_log("Old", datetime(old_month.year, old_month.month, 10, tzinfo=timezone.utc))
+    recent_id = add_log("Recent", datetime.now(timezone.utc))
+
+    archived = archive_partitions(12, str(tmp_path))
+
+    assert [count for _, count in archived] == [1]
+    assert [int(row['id']) for row in read_archive(archived[0][0])] == [old_id]
+    assert db.session.execute(db.text("SELECT to_regclass(:name)"), {'name': partition_name(old_month)}).scalar() is None
+    assert partition_of(recent_id) is not None
+
+
+def test_archive_partitions_keeps_partition_when_export_fails(partitioned, tmp_path):
+    old_month = add_months(month_start(datetime.now(timezone.utc)), -24)
+    _create_partition(partition_name(old_month), old_month, add_months(old_month, 1))
+    db.session.commit()
+    old_id = add_log("Old", datetime(old_month.year, old_month.month, 10, tzinfo=timezone.utc))
+
+    # A file where the directory should be makes the export fail
+    blocker = tmp_path / 'not-a-dir'
+    blocker.write_text('')
+    with pytest.raises(OSError):
+        archive_partitions(12, str(blocker))
+
+    assert partition_of(old_id) == partition_name(old_month)
+
+
+def test_archive_plain_table(app, tmp_path):
+    # create_all() builds the plain table, as on SQLite
+    assert ensure_partitions() == []
+
+    old_id = add_log("Old", datetime(2020, 1, 5, tzinfo=timezone.utc))
+    recent_id = add_log("Recent", datetime.now(timezone.utc))
+
+    archived = archive_partitions(12, str(tmp_path))
+
+    assert [(path.rsplit('/', 1)[-1], count) for path, count in archived] == [('activity_logs_y2020m01.csv.gz', 1)]
+    assert [int(row['id']) for row in read_archive(archived[0][0])] == [old_id]
+    remaining = db.session.execute(db.select(ActivityLog.id)).scalars().all()
+    assert remaining == [recent_id]
@@ -0,0 +1,49 @@
+import json
+
+
+def admin_headers(client):
+    login = client.post('/auth/login', json={'email': 'admin@test.com', 'password': 'adminpass'})
+    return {'Authorization': f"Bearer {login.json['token']}"}
+
+# -----------------------------
+# Test: admins can read the slow query log, newest first
+# -----------------------------
+def test_slow_queries_view(client, app, tmp_path):
+    log_file = tmp_path / 'slow_queries.jsonl'
+    log_file.write_text('\n'.join(
+        json.dumps({'duration_ms': ms, 'statement': f'SELECT {ms}'}) for ms in (510, 620, 730)
+    ) + '\n')
+    app.config['SLOW_QUERY_LOG_FILE'] = str(log_file)
+
+    res = client.get('/admin/slow-queries?limit=2', headers=admin_headers(client))
+    assert res.status_code == 200
+    assert [q['duration_ms'] for q in res.json['queries']] == [730, 620]
+
+    client.post('/auth/register', json={
+        'name': 'Student', 'email': 'student@test.com', 'password': 'pass123'
+    })
+    login = client.post('/auth/login', json={'email': 'student@test.com', 'password': 'pass123'})
+    res = client.get('/admin/slow-queries', headers={'Authorization': f"Bearer {login.json['token']}"})
+    assert res.status_code == 403
+
+
+# -----------------------------
+# Test: X-Profile profiles a request for admins and stores the result
+# -----------------------------
+def test_profile_request(client, app, tmp_path):
+    app.config['PROFILE_DIR'] = str(tmp_path)
+    headers = admin_headers(client)
+
+    res = client.get('/users/', headers={**headers, 'X-Profile': '1'})
+    assert res.status_code == 200
+    assert 'items' in res.json
+    profile_id = res.headers['X-Profile-Id']
+
+    res = client.get(f'/admin/profiles/{profile_id}', headers=headers)
+    assert res.status_code == 200
+    assert res.json['endpoint'] == 'user_routes.list_users'
+    assert res.json['sql']['count'] >= 1
+    assert res.json['functions']
+
+    # Without the flag nothing is profiled
+    assert 'X-Profile-Id' not in client.get('/users/', headers=headers).headers
@@ -1,4 +1,6 @@
 import pytest
+import pyotp
+from unittest.mock import Mock, patch
 from app.models import User, db
 
 def test_login_seeded_users(client):
@@ -28,3 +30,213 @@ def test_register_new_user(client):
     # Login should fail with 403 (unverified)
     res = client.post('/auth/login', json={'email': email, 'password': password})
     assert res.status_code == 403
+
+def test_2fa_code_is_single_use(client, app):
+    from app.utils.two_fa_store import get_code_store
+
+    user = db.session.execute(
+        db.select(User).filter_by(email='student1@example.com')
+    ).scalar_one()
+    user.two_factor_enabled = True
+    db.session.commit()
+
+    with patch('app.routes.auth_routes.send_2fa_code_email'), \
+            patch('app.routes.auth_routes.generate_2fa_code', return_value='123456'):
+        res = client.post('/auth/login', json={'email': 'student1@example.com', 'password': 'studentpass'})
+    assert res.status_code == 200
+    assert res.json['two_factor_enabled'] is True
+
+    # Codes are stored hashed
+    stored = get_code_store()._codes[user.id]
+    assert stored['code_hash'] != '123456'
+
+    res = client.post('/auth/verify-2fa', json={'user_id': user.id, 'code': '000000'})
+    assert res.status_code == 401
+
+    res = client.post('/auth/verify-2fa', json={'user_id': user.id, 'code': '123456'})
+    assert res.status_code == 200
+    assert 'token' in res.json
+
+    # Second use of the same code is rejected
+    res = client.post('/auth/verify-2fa', json={'user_id': user.id, 'code': '123456'})
+    assert res.status_code == 400
+
+def test_refresh_token_rotation(client):
+    res = client.post('/auth/login', json={'email': 'student1@example.com', 'password': 'studentpass'})
+    assert res.status_code == 200
+    refresh_token = res.json['refresh_token']
+
+    # Refreshing never re-checks the password
+    with patch.object(User, 'check_password', side_effect=AssertionError('password hash checked')):
+        res = client.post('/auth/refresh', json={'refresh_token': refresh_token})
+    assert res.status_code == 200
+    assert res.json['token']
+    rotated = res.json['refresh_token']
+    assert rotated != refresh_token
+
+    # The old token is single-use; reusing it revokes the rotated one too
+    res = client.post('/auth/refresh', json={'refresh_token': refresh_token})
+    assert res.status_code == 401
+    res = client.post('/auth/refresh', json={'refresh_token': rotated})
+    assert res.status_code == 401
+
+def test_login_rate_limited_per_account(client, app):
+    app.config['RATE_LIMITS'] = {'login': {'ip': '100/minute', 'account': '3/minute'}}
+
+    for _ in range(3):
+        res = client.post('/auth/login', json={'email': 'student1@example.com', 'password': 'wrong'})
+        assert res.status_code == 401
+
+    # Rejected before the password is hashed
+    with patch.object(User, 'check_password', side_effect=AssertionError('password hash checked')):
+        res = client.post('/auth/login', json={'email': 'student1@example.com', 'password': 'studentpass'})
+    assert res.status_code == 429
+    assert int(res.headers['Retry-After']) >= 1
+
+def test_login_rate_limit_ignores_spoofed_forwarded_for(client, app):
+    app.config['RATE_LIMIT_TRUST_PROXY'] = True
+    app.config['RATE_LIMITS'] = {'login': {'ip': '2/minute', 'account': '100/minute'}}
+
+    # Only the last hop (added by our proxy) identifies the client
+    for i in range(2):
+        res = client.post('/auth/login', json={'email': 'student1@example.com', 'password': 'wrong'},
+                          headers={'X-Forwarded-For': f'10.0.0.{i}, 203.0.113.7'})
+        assert res.status_code == 401
+    res = client.post('/auth/login', json={'email': 'student1@example.com', 'password': 'wrong'},
+                      headers={'X-Forwarded-For': '10.0.0.99, 203.0.113.7'})
+    assert res.status_code == 429
+
+# -----------------------------
+# Authenticator app (TOTP) 2FA
+# -----------------------------
+T0 = 1_700_000_010  # 10s into a 30s time step
+
+def at(timestamp):
+    """Freezes the clock TOTP codes are checked against"""
+    return patch('app.utils.totp.time', Mock(time=Mock(return_value=timestamp)))
+
+def enroll_totp(client):
+    token = client.post('/auth/login', json={'email': 'student1@example.com', 'password': 'studentpass'}).json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    res = client.post('/auth/2fa/totp/setup?format=json', headers=headers)
+    assert res.status_code == 200
+    secret = res.json['secret']
+    assert res.json['provisioning_uri'].startswith('otpauth://totp/')
+
+    totp = pyotp.TOTP(secret)
+    with at(T0):
+        res = client.post('/auth/2fa/totp/confirm', json={'code': totp.at(T0 + 300)}, headers=headers)
+        assert res.status_code == 401
+        res = client.post('/auth/2fa/totp/confirm', json={'code': totp.at(T0)}, headers=headers)
+    assert res.status_code == 200
+    return totp
+
+def login_with_totp(client):
+    res = client.post('/auth/login', json={'email': 'student1@example.com', 'password': 'studentpass'})
+    assert res.status_code == 200
+    assert res.json['two_factor_method'] == 'totp'
+    return res.json['user_id']
+
+def test_totp_enroll_and_confirm(client):
+    enroll_totp(client)
+
+    user = db.session.execute(db.select(User).filter_by(email='student1@example.com')).scalar_one()
+    assert user.two_factor_enabled is True
+    assert user.two_factor_method == 'totp'
+
+    # Login now asks for an authenticator code instead of issuing a token
+    res = client.post('/auth/login', json={'email': 'student1@example.com', 'password': 'studentpass'})
+    assert res.json['two_factor_method'] == 'totp'
+    assert 'token' not in res.json
+
+def test_totp_login_with_valid_code(client):
+    totp = enroll_totp(client)
+    user_id = login_with_totp(client)
+
+    with at(T0 + 30):
+        res = client.post('/auth/verify-2fa', json={'user_id': user_id, 'code': totp.at(T0 + 30)})
+    assert res.status_code == 200
+    assert res.json['token']
+    assert res.json['refresh_token']
+
+def test_totp_replayed_code_rejected(client):
+    totp = enroll_totp(client)
+    user_id = login_with_totp(client)
+    code = totp.at(T0 + 30)
+
+    with at(T0 + 30):
+        assert client.post('/auth/verify-2fa', json={'user_id': user_id, 'code': code}).status_code == 200
+        assert client.post('/auth/verify-2fa', json={'user_id': user_id, 'code': code}).status_code == 401
+
+    # The code used to confirm enrollment cannot be replayed either
+    with at(T0):
+        res = client.post('/auth/verify-2fa', json={'user_id': user_id, 'code': totp.at(T0)})
+    assert res.status_code == 401
+
+def test_totp_code_outside_window_rejected(client, app):
+    app.config['TOTP_VALID_WINDOW'] = 1
+    totp = enroll_totp(client)
+    user_id = login_with_totp(client)
+
+    now = T0 + 300
+    with at(now):
+        for stale_or_early in (now - 90, now + 90):
+            res = client.post('/auth/verify-2fa', json={'user_id': user_id, 'code': totp.at(stale_or_early)})
+            assert res.status_code == 401
+        # One step of drift is still accepted
+        res = client.post('/auth/verify-2fa', json={'user_id': user_id, 'code': totp.at(now - 30)})
+    assert res.status_code == 200
+
+def test_scrypt_cost_must_be_power_of_two():
+    from app.utils.passwords import get_password_hash_method
+
+    assert get_password_hash_method({'PASSWORD_HASH_ALGORITHM': 'scrypt', 'PASSWORD_HASH_ITERATIONS': 16384}) == 'scrypt:16384:8:1'
+    for bad in (10000, 1):
+        with pytest.raises(ValueError):
+            get_password_hash_method({'PASSWORD_HASH_ALGORITHM': 'scrypt', 'PASSWORD_HASH_ITERATIONS': bad})
+
+def test_password_verifications_bounded(app):
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from app.utils.passwords import verify_password
+
+    app.config['PASSWORD_VERIFY_THREADS'] = 2
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def slow_check(password_hash, password):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return True
+
+    def verify(_):
+        with app.app_context():
+            return verify_password('hash', 'password')
+
+    with patch('app.utils.passwords.check_password_hash', side_effect=slow_check):
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            assert all(pool.map(verify, range(6)))
+    assert peak[0] == 2
+
+def test_memory_rate_limit_buckets_are_pruned():
+    from app.utils.rate_limit import MemoryBucketStore
+
+    with patch('app.utils.rate_limit.time.time', return_value=1000.0):
+        store = MemoryBucketStore(sweep_interval_seconds=60, max_buckets=3)
+        for i in range(5):
+            assert store.take(f'ip:10.0.0.{i}', 2, 2 / 60) == (True, 0)
+    # Never more than max_buckets; the least recently used went first
+    assert list(store._buckets) == ['ip:10.0.0.2', 'ip:10.0.0.3', 'ip:10.0.0.4']
+
+    with patch('app.utils.rate_limit.time.time', return_value=1030.0):
+        store.take('ip:10.0.0.4', 2, 2 / 60)
+        store.take('ip:10.0.0.4', 2, 2 / 60)
+    # A minute on, the buckets that have refilled are swept; 10.0.0.4 is still draining
+    with patch('app.utils.rate_limit.time.time', return_value=1061.0):
+        store.take('ip:10.0.0.9', 2, 2 / 60)
+    assert list(store._buckets) == ['ip:10.0.0.4', 'ip:10.0.0.9']
@@ -0,0 +1,26 @@
+from unittest.mock import patch
+from app.models import User, Class, db
+
+# -----------------------------
+# Test: class detail keeps the embedded roster
+# -----------------------------
+def test_get_class_embeds_first_students(client):
+    cls = Class(name='Roster Class')
+    db.session.add(cls)
+    db.session.flush()
+    for name in ('Carol', 'Alice', 'Bob'):
+        db.session.add(User(name=name, email=f'{name.lower()}@example.com', role='Student',
+                            password_hash='unused', class_id=cls.id))
+    db.session.commit()
+
+    res = client.get(f'/classes/{cls.id}')
+    assert res.status_code == 200
+    assert res.json['student_count'] == 3
+    assert [s['name'] for s in res.json['students']] == ['Alice', 'Bob', 'Carol']
+    assert set(res.json['students'][0]) == {'id', 'name', 'email', 'role'}
+
+    # Capped: larger classes page through /classes/<id>/students
+    with patch('app.routes.class_routes.EMBEDDED_ROSTER_LIMIT', 2):
+        res = client.get(f'/classes/{cls.id}')
+    assert res.json['student_count'] == 3
+    assert [s['name'] for s in res.json['students']] == ['Alice', 'Bob']
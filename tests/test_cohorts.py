@@ -1,5 +1,5 @@
 import pytest
-from app.models import Cohort, db
+from app.models import Cohort, User, db
 
 def test_cohort_crud(client, app):
     # Login admin
@@ -38,4 +38,72 @@ def test_cohort_crud(client, app):
     # Ensure cohort not in list anymore
     res = client.get('/cohorts/', headers=headers)
     cohorts_list = res.json.get('items', [res.json]) if isinstance(res.json, dict) else res.json
-    assert all(c['id'] != cohort_id for c in cohorts_list)
\ No newline at end of file
+    assert all(c['id'] != cohort_id for c in cohorts_list)
+
+
+def test_bulk_assign_cohort(client, app):
+    login = client.post('/auth/login', json={'email': 'admin@test.com', 'password': 'adminpass'})
+    headers = {'Authorization': f"Bearer {login.json['token']}"}
+
+    res = client.post('/cohorts/', json={'name': 'Bulk Cohort'}, headers=headers)
+    cohort_id = res.json['id']
+
+    # Every student moves with one UPDATE
+    res = client.post(f'/cohorts/{cohort_id}/assign', json={'filter': {'role': 'Student'}}, headers=headers)
+    assert res.status_code == 200
+    assert res.json['updated'] >= 1
+    assert all(db.session.get(User, uid).cohort_id == cohort_id for uid in res.json['user_ids'])
+
+    # Users already in the cohort are left alone
+    res = client.post(f'/cohorts/{cohort_id}/assign', json={'user_ids': res.json['user_ids']}, headers=headers)
+    assert res.json['updated'] == 0
+
+    res = client.post(f'/cohorts/{cohort_id}/assign', json={}, headers=headers)
+    assert res.status_code == 400
+
+
+def test_cohort_roster_paginated(client, app):
+    login = client.post('/auth/login', json={'email': 'admin@test.com', 'password': 'adminpass'})
+    headers = {'Authorization': f"Bearer {login.json['token']}"}
+
+    cohort_id = client.post('/cohorts/', json={'name': 'Roster Cohort'}, headers=headers).json['id']
+    user_ids = client.post(f'/cohorts/{cohort_id}/assign', json={'filter': {'role': 'Student'}}, headers=headers).json['user_ids']
+
+    res = client.get(f'/cohorts/{cohort_id}/students?per_page=1&sort=-id', headers=headers)
+    assert res.status_code == 200
+    assert res.json['cohort']['student_count'] == len(user_ids)
+    assert res.json['total_items'] == len(user_ids)
+    assert [s['id'] for s in res.json['items']] == [max(user_ids)]
+
+    res = client.get(f'/cohorts/{cohort_id}/students?sort=password_hash', headers=headers)
+    assert res.status_code == 400
+
+    # Non-integer paging is a client error, not a 500
+    res = client.get(f'/cohorts/{cohort_id}/students?page=abc', headers=headers)
+    assert res.status_code == 400
+
+
+def test_non_integer_pagination_rejected(client):
+    login = client.post('/auth/login', json={'email': 'admin@test.com', 'password': 'adminpass'})
+    headers = {'Authorization': f"Bearer {login.json['token']}"}
+
+    for path in ('/users/?page=abc', '/cohorts/?per_page=ten', '/projects?page=1.5',
+                 '/activities/activities?per_page=x'):
+        res = client.get(path, headers=headers)
+        assert res.status_code == 400, path
+        assert res.json['message'] == 'page and per_page must be integers'
+
+
+def test_bulk_assign_rejects_malformed_filter(client):
+    login = client.post('/auth/login', json={'email': 'admin@test.com', 'password': 'adminpass'})
+    headers = {'Authorization': f"Bearer {login.json['token']}"}
+    cohort_id = client.post('/cohorts/', json={'name': 'Filter Cohort'}, headers=headers).json['id']
+
+    # Rejected before the UPDATE reaches the database
+    for bad in ({'cohort_id': 'abc'}, {'class_id': [1]}, {'role': 5}):
+        res = client.post(f'/cohorts/{cohort_id}/assign', json={'filter': bad}, headers=headers)
+        assert res.status_code == 400, bad
+
+    # A null id still selects unassigned users
+    res = client.post(f'/cohorts/{cohort_id}/assign', json={'filter': {'class_id': None}}, headers=headers)
+    assert res.status_code == 200
@@ -0,0 +1,45 @@
+# -----------------------------
+# Test: /metrics exposes per-endpoint request and SQL metrics
+# -----------------------------
+def test_metrics_endpoint(client):
+    login = client.post('/auth/login', json={'email': 'admin@test.com', 'password': 'adminpass'})
+    headers = {'Authorization': f"Bearer {login.json['token']}"}
+    client.get('/users/', headers=headers)
+
+    res = client.get('/metrics')
+    assert res.status_code == 200
+    body = res.get_data(as_text=True)
+    assert 'http_requests_total{endpoint="user_routes.list_users",method="GET",status="200"}' in body
+    assert 'db_statements_total{endpoint="user_routes.list_users"}' in body
+    assert 'http_request_duration_seconds_bucket' in body
+
+
+def test_metrics_token_required(client, app):
+    app.config['METRICS_TOKEN'] = 'scrape-secret'
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
+
+
+def test_metrics_closed_without_token_outside_testing(client, app):
+    app.config['METRICS_TOKEN'] = None
+    app.testing = False
+    try:
+        assert client.get('/metrics').status_code == 403
+        app.config['METRICS_PUBLIC'] = True
+        assert client.get('/metrics').status_code == 200
+    finally:
+        app.testing = True
+
+
+def test_failed_statements_do_not_leak_timers(app):
+    from sqlalchemy.exc import DBAPIError
+    from app.models import db
+    from app.utils.sql_timing import START_TIMES_KEY
+
+    with db.engine.connect() as conn:
+        for _ in range(3):
+            try:
+                conn.exec_driver_sql('SELECT * FROM no_such_table')
+            except DBAPIError:
+                conn.rollback()
+        assert conn.info.get(START_TIMES_KEY) == []
@@ -96,4 +96,40 @@ def test_project_crud(client):
 
     # Verify deletion
     res = client.get(f'/projects/{project_id}', headers=headers)
-    assert res.status_code == 404
\ No newline at end of file
+    assert res.status_code == 404
+
+
+# -----------------------------
+# Test: a soft-deleted project hides its tasks and invitations
+# -----------------------------
+def test_deleted_project_hides_tasks_and_invitations(client):
+    from app.models import ProjectMember, Task
+
+    owner_token = get_auth_token(client, 'owner@test.com', 'pass')
+    invitee_token = get_auth_token(client, 'invitee@test.com', 'pass')
+    owner = db.session.execute(db.select(User).filter_by(email='owner@test.com')).scalar_one()
+    invitee = db.session.execute(db.select(User).filter_by(email='invitee@test.com')).scalar_one()
+
+    project = Project(name='Doomed', owner_id=owner.id)
+    db.session.add(project)
+    db.session.flush()
+    task = Task(title='Orphan', project_id=project.id)
+    db.session.add(task)
+    db.session.add(ProjectMember(project_id=project.id, user_id=invitee.id, status='pending', role='collaborator'))
+    db.session.commit()
+    project_id, task_id = project.id, task.id
+
+    invitee_headers = {'Authorization': f'Bearer {invitee_token}'}
+    assert [i['project_id'] for i in client.get('/members/invitations/pending', headers=invitee_headers).json] == [project_id]
+
+    res = client.delete(f'/projects/{project_id}', headers={'Authorization': f'Bearer {owner_token}'})
+    assert res.status_code == 200
+
+    assert client.get('/members/invitations/pending', headers=invitee_headers).json == []
+    res = client.post(f'/members/projects/{project_id}/respond', json={'action': 'accept'}, headers=invitee_headers)
+    assert res.status_code == 404
+
+    assert task_id not in [t['id'] for t in client.get('/tasks/').json]
+    assert client.get(f'/tasks/{task_id}').status_code == 404
+    assert client.get(f'/tasks/project/{project_id}').json == {'tasks': []}
+    assert client.put(f'/tasks/{task_id}', json={'status': 'Done'}).status_code == 404
@@ -0,0 +1,81 @@
+from app.utils import tracing
+from app.utils.tracing import parse_traceparent, start_span, OTLPHttpExporter, BatchSpanProcessor, SpanExporter
+
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+# -----------------------------
+# Test: W3C traceparent parsing
+# -----------------------------
+def test_parse_traceparent():
+    trace_id, parent_id, sampled = parse_traceparent('00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01')
+    assert (trace_id, parent_id, sampled) == ('4bf92f3577b34da6a3ce929d0e0e4736', '00f067aa0ba902b7', True)
+    assert parse_traceparent('00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00')[2] is False
+    assert parse_traceparent('00-00000000000000000000000000000000-00f067aa0ba902b7-01') is None
+    assert parse_traceparent('garbage') is None
+
+# -----------------------------
+# Test: nested spans share a trace and export as OTLP JSON
+# -----------------------------
+def test_spans_nest_and_encode(monkeypatch):
+    exporter = ListExporter()
+    processor = BatchSpanProcessor(exporter, flush_interval=60)
+    monkeypatch.setattr(tracing, '_processor', processor)
+
+    with start_span('outer') as outer:
+        with start_span('inner', 'client', {'peer.service': 'sendgrid'}):
+            pass
+    processor.flush()
+
+    inner, finished_outer = exporter.spans
+    assert finished_outer is outer
+    assert inner.trace_id == outer.trace_id
+    assert inner.parent_span_id == outer.span_id
+
+    encoded = OTLPHttpExporter('http://collector/v1/traces', 'projectx-api').encode(exporter.spans)
+    otlp_spans = encoded['resourceSpans'][0]['scopeSpans'][0]['spans']
+    assert otlp_spans[0]['kind'] == 3
+    assert otlp_spans[0]['parentSpanId'] == outer.span_id
+    assert {'key': 'peer.service', 'value': {'stringValue': 'sendgrid'}} in otlp_spans[0]['attributes']
+
+# -----------------------------
+# Test: outbound calls carry the traceparent
+# -----------------------------
+def test_sendgrid_and_cloudinary_calls_propagate_trace(monkeypatch):
+    import cloudinary
+    import sendgrid
+    from app.utils.cloudinary_utils import upload_image
+    from app.utils.email_utils import send_invitation_email
+
+    exporter = ListExporter()
+    processor = BatchSpanProcessor(exporter, flush_interval=60)
+    monkeypatch.setattr(tracing, '_processor', processor)
+    monkeypatch.setenv('SENDGRID_API_KEY', 'SG.' + 'x' * 66)
+    cloudinary.config(cloud_name='demo', api_key='key', api_secret='secret')
+
+    sent_headers = []
+    monkeypatch.setattr(sendgrid.SendGridAPIClient, 'send',
+                        lambda sg, mail: sent_headers.append(dict(sg.client.request_headers)) or type('R', (), {'status_code': 202}))
+    upload_calls = []
+    monkeypatch.setattr('cloudinary.uploader.call_api',
+                        lambda *args, **kwargs: upload_calls.append(kwargs) or {'secure_url': 'https://img'})
+
+    with start_span('request') as root:
+        send_invitation_email('invitee@example.com', 'Tracing')
+        assert upload_image(b'png-bytes') == 'https://img'
+    processor.flush()
+
+    email_span, upload_span = exporter.spans[:2]
+    assert sent_headers[0]['traceparent'] == email_span.traceparent
+    assert upload_calls[0]['extra_headers'] == {'traceparent': upload_span.traceparent}
+    assert email_span.trace_id == upload_span.trace_id == root.trace_id
+
+    # With tracing off no header is added
+    monkeypatch.setattr(tracing, '_processor', None)
+    upload_image(b'png-bytes')
+    assert upload_calls[1]['extra_headers'] is None
@@ -0,0 +1,128 @@
+from unittest.mock import patch
+import pytest
+from flask import jsonify
+from sqlalchemy.exc import SQLAlchemyError
+from app.models import User, Cohort, Project, ProjectMember, db
+from app.utils.activity_log import log_activity
+
+# -----------------------------
+# Helpers
+# -----------------------------
+class ListWriter:
+    """Stands in for the buffered ActivityLogWriter"""
+    def __init__(self):
+        self.rows = []
+
+    def add(self, row):
+        self.rows.append(row)
+
+
+@pytest.fixture
+def writer(app):
+    app.config['ACTIVITY_LOG_MODE'] = 'buffered'
+    writer = ListWriter()
+    with patch('app.utils.activity_log.get_activity_log_writer', return_value=writer):
+        yield writer
+
+
+@pytest.fixture
+def write_route(app):
+    # Writes a cohort and an activity row, then answers with the requested status
+    @app.route('/_test/unit-of-work/<int:status>', methods=['POST'])
+    def write_then_respond(status):
+        db.session.add(Cohort(name=f'Unit of work {status}'))
+        db.session.flush()
+        log_activity(None, f'Unit of work {status}')
+        return jsonify({}), status
+    return app
+
+
+def cohort_exists(name):
+    return db.session.execute(db.select(Cohort.id).filter_by(name=name)).first() is not None
+
+# -----------------------------
+# Test: commit on 2xx, rollback on 4xx
+# -----------------------------
+def test_success_commits_and_queues_activity(client, write_route, writer):
+    res = client.post('/_test/unit-of-work/201')
+    assert res.status_code == 201
+    assert cohort_exists('Unit of work 201')
+    assert [row['action'] for row in writer.rows] == ['Unit of work 201']
+
+
+def test_error_response_rolls_back_and_drops_activity(client, write_route, writer):
+    res = client.post('/_test/unit-of-work/400')
+    assert res.status_code == 400
+    assert not cohort_exists('Unit of work 400')
+    assert writer.rows == []
+
+    # Nothing from the failed request leaks into the next one
+    client.post('/_test/unit-of-work/200')
+    assert [row['action'] for row in writer.rows] == ['Unit of work 200']
+
+# -----------------------------
+# Test: invitation emails wait for the commit
+# -----------------------------
+@pytest.fixture
+def invitation(app):
+    """A project owned by student1 and a user to invite to it"""
+    owner = db.session.execute(db.select(User).filter_by(email='student1@example.com')).scalar_one()
+    invitee = User(name='Invitee', email='invitee@example.com', role='Student')
+    invitee.set_password('pass')
+    project = Project(name='Emails', owner_id=owner.id)
+    db.session.add_all([invitee, project])
+    db.session.commit()
+    return project.id, invitee.id
+
+
+def record_commit_state(project_id, invitee_id, committed_when_sent):
+    def record(*args):
+        # A separate connection only sees the invitation once it is committed
+        with db.engine.connect() as conn:
+            committed_when_sent.append(conn.execute(
+                db.select(ProjectMember.id).filter_by(project_id=project_id, user_id=invitee_id)
+            ).first() is not None)
+    return record
+
+
+def test_edit_project_emails_after_commit(client, invitation):
+    project_id, invitee_id = invitation
+    committed_when_sent = []
+
+    token = client.post('/auth/login', json={'email': 'student1@example.com', 'password': 'studentpass'}).json['token']
+    with patch('app.utils.email_utils.send_invitation_email',
+               side_effect=record_commit_state(project_id, invitee_id, committed_when_sent)):
+        res = client.put(f'/projects/{project_id}', json={'members': ['invitee@example.com']},
+                         headers={'Authorization': f'Bearer {token}'})
+
+    assert res.status_code == 200
+    assert res.json['members_invited'] == ['invitee@example.com']
+    assert committed_when_sent == [True]
+
+
+def test_invite_member_emails_after_commit(client, invitation):
+    project_id, invitee_id = invitation
+    committed_when_sent = []
+
+    token = client.post('/auth/login', json={'email': 'student1@example.com', 'password': 'studentpass'}).json['token']
+    with patch('app.utils.email_utils.send_invitation_email',
+               side_effect=record_commit_state(project_id, invitee_id, committed_when_sent)):
+        res = client.post(f'/members/projects/{project_id}/invite', json={'email': 'invitee@example.com'},
+                          headers={'Authorization': f'Bearer {token}'})
+
+    assert res.status_code == 201
+    assert res.json['email_queued'] is True
+    assert committed_when_sent == [True]
+
+
+def test_invite_member_no_email_when_rolled_back(client, invitation):
+    project_id, _ = invitation
+    token = client.post('/auth/login', json={'email': 'student1@example.com', 'password': 'studentpass'}).json['token']
+
+    with patch('app.utils.email_utils.send_invitation_email') as send, \
+            patch('app.routes.member_routes.log_activity', side_effect=SQLAlchemyError('activity write failed')):
+        res = client.post(f'/members/projects/{project_id}/invite', json={'email': 'invitee@example.com'},
+                          headers={'Authorization': f'Bearer {token}'})
+
+    assert res.status_code == 500
+    send.assert_not_called()
@@ -42,7 +42,18 @@ def test_user_crud(client):
     # -----------------------------
     res = client.get('/users/', headers=headers)
     assert res.status_code == 200
-    assert any(u['id'] == user_id for u in res.json)
+    assert any(u['id'] == user_id for u in res.json['items'])
+
+    # -----------------------------
+    # Search users by email prefix and name substring
+    # -----------------------------
+    res = client.get('/users/?q=student_test', headers=headers)
+    assert res.status_code == 200
+    assert [u['id'] for u in res.json['items']] == [user_id]
+    assert 'password_hash' not in res.json['items'][0]
+
+    res = client.get('/users/?q=test%20stud&match=contains&role=Student', headers=headers)
+    assert any(u['id'] == user_id for u in res.json['items'])
 
     # -----------------------------
     # Get user (admin access)
@@ -95,3 +106,54 @@ def test_non_admin_list_users_denied(client):
     res = client.get('/users/', headers=headers)
     assert res.status_code == 403
     assert 'not authorized' in res.json['message'].lower()
+
+# -----------------------------
+# Test: Bulk import reports each row
+# -----------------------------
+def test_bulk_import_users(client):
+    token = get_token(client, "admin@test.com", "adminpass")
+    headers = {'Authorization': f'Bearer {token}'}
+
+    rows = [
+        {'name': 'Import One', 'email': 'import1@test.com', 'password': 'pass'},
+        {'name': 'Import Two', 'email': 'import2@test.com', 'password': 'pass', 'role': 'Student'},
+        {'name': 'Duplicate', 'email': 'import1@test.com', 'password': 'pass'},
+        {'name': 'Existing', 'email': 'admin@test.com', 'password': 'pass'},
+        {'email': 'missing-fields@test.com'},
+    ]
+    res = client.post('/users/import', json=rows, headers=headers)
+    assert res.status_code == 200
+    assert res.json['summary'] == {'created': 2, 'skipped': 2, 'error': 1}
+    assert [r['status'] for r in res.json['results']] == ['created', 'created', 'skipped', 'skipped', 'error']
+
+    # Imported users can log in
+    get_token(client, 'import2@test.com', 'pass')
+
+# -----------------------------
+# Test: Deleted users vanish at once and are purged later
+# -----------------------------
+def test_soft_delete_and_purge_user(client, app):
+    from app.utils.soft_delete import purge_deleted
+
+    token = get_token(client, "admin@test.com", "adminpass")
+    headers = {'Authorization': f'Bearer {token}'}
+
+    res = client.post('/users/', json={'name': 'Soon Gone', 'email': 'gone@test.com', 'password': 'pass'}, headers=headers)
+    user_id = res.json['id']
+
+    res = client.delete(f'/users/{user_id}', headers=headers)
+    assert res.status_code == 200
+    assert client.get(f'/users/{user_id}', headers=headers).status_code == 404
+    assert client.post('/auth/login', json={'email': 'gone@test.com', 'password': 'pass'}).status_code == 401
+
+    # Row is still there until the purge job runs
+    still_there = db.session.execute(
+        db.select(User.id).filter_by(id=user_id).execution_options(include_deleted=True)
+    ).scalar()
+    assert still_there == user_id
+
+    purged = purge_deleted()
+    assert purged['users'] == 1
+    assert db.session.execute(
+        db.select(User.id).filter_by(id=user_id).execution_options(include_deleted=True)
+    ).scalar() is None